@@ -0,0 +1,137 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+from config import config
+from rest_client import logger, _make_request
+
+# 执行请求的线程池（与同步接口共用http_client连接池和token刷新逻辑）
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# 每个事件循环各自的接口信号量：loop -> {endpoint: Semaphore}
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+# 用于识别接口的URL配置项
+_ENDPOINT_URL_NAMES = ["IPD_TREE_URL", "IPD_LIST_URL", "IPD_DETAIL_URL", "TC_DETAIL_URL", "TC_ALL_URL"]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """获取（必要时创建）异步请求线程池"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=config.ASYNC_MAX_WORKERS,
+                                               thread_name_prefix="async_rest")
+    return _executor
+
+def _get_endpoint(url: str) -> str:
+    """根据URL识别接口名称（详情接口的URL带有issue id，需要按前缀匹配）"""
+    prefixes = [(getattr(config, name), name) for name in _ENDPOINT_URL_NAMES]
+    # 先匹配较长的前缀：IPD_DETAIL_URL是IPD_TREE_URL和IPD_LIST_URL的前缀
+    for prefix, name in sorted(prefixes, key=lambda item: len(item[0]), reverse=True):
+        if prefix and url.startswith(prefix):
+            return name
+
+    parts = urlsplit(url)
+    return parts.netloc + parts.path
+
+def _get_semaphore(endpoint: str) -> asyncio.Semaphore:
+    """获取当前事件循环中某个接口的信号量"""
+    loop = asyncio.get_running_loop()
+    loop_semaphores = _semaphores.setdefault(loop, {})
+    semaphore = loop_semaphores.get(endpoint)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(config.ASYNC_CONCURRENCY_PER_ENDPOINT)
+        loop_semaphores[endpoint] = semaphore
+    return semaphore
+
+async def _async_make_request(method: str, url: str, data: Dict[str, Any] = None,
+                              params: Dict[str, Any] = None, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """异步发送HTTP请求（按接口限制并发数，401时刷新token和响应缓存的行为与同步接口一致）"""
+    semaphore = _get_semaphore(_get_endpoint(url))
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        request = functools.partial(_make_request, method, url, data, params, use_cache=use_cache)
+        try:
+            return await loop.run_in_executor(_get_executor(), request)
+        except Exception as e:
+            logger.error(f"异步请求失败: {e}")
+            return None
+
+async def async_api_get(url: str, params: Dict[str, Any] = None, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """异步发送GET请求"""
+    return await _async_make_request('GET', url, params=params, use_cache=use_cache)
+
+async def async_api_post(url: str, data: Dict[str, Any] = None, params: Dict[str, Any] = None,
+                         use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """异步发送POST请求"""
+    return await _async_make_request('POST', url, data, params, use_cache=use_cache)
+
+async def async_api_post_issue_list_by_ids(issue_ids: List[str], issue_type: str,
+                                           use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """异步按id批量查询需求（一次请求携带多个id）"""
+    data = {
+        "filter": [
+            {
+                "id": {
+                    "values": list(issue_ids),
+                    "operator": "||"
+                }
+            }
+        ]
+    }
+    params = {
+        "issue_type": issue_type
+    }
+    return await async_api_post(config.IPD_LIST_URL, data, params, use_cache=use_cache)
+
+
+
+#TC related function
+
+async def async_api_get_tc_detail_by_number(tc_num: str) -> Optional[Dict[str, Any]]:
+    params = {
+        "testcase_number": tc_num
+    }
+    return await async_api_get(config.TC_DETAIL_URL, params)
+
+
+#SF related function
+async def async_api_get_sf_detail_by_id(issue_id: str) -> Optional[Dict[str, Any]]:
+    url = config.IPD_DETAIL_URL + issue_id
+    params = {
+        "issue_type": "SF"
+    }
+    return await async_api_get(url, params)
+
+
+#IR related function
+async def async_api_get_ir_detail_by_id(issue_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    url = config.IPD_DETAIL_URL + issue_id
+    params = {
+        "issue_type": "IR"
+    }
+    return await async_api_get(url, params, use_cache=use_cache)
+
+
+#SR related function
+async def async_api_get_sr_detail_by_id(issue_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    url = config.IPD_DETAIL_URL + issue_id
+    params = {
+        "issue_type": "SR"
+    }
+    return await async_api_get(url, params, use_cache=use_cache)
+
+
+#AR related function
+async def async_api_get_ar_detail_by_id(issue_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    url = config.IPD_DETAIL_URL + issue_id
+    params = {
+        "issue_type": "AR"
+    }
+    return await async_api_get(url, params, use_cache=use_cache)
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Dict, List
+from config import config
+from rest_client import api_post_ir_list_by_ids, api_post_sr_list_by_ids, api_post_ar_list_by_ids
+from async_rest_client import (async_api_post_issue_list_by_ids, async_api_get_ir_detail_by_id,
+                               async_api_get_sr_detail_by_id, async_api_get_ar_detail_by_id)
+
+# 各层级的批量查询接口
+_LIST_APIS = {
+    "IR": api_post_ir_list_by_ids,
+    "SR": api_post_sr_list_by_ids,
+    "AR": api_post_ar_list_by_ids,
+}
+
+# 各层级的异步详情接口
+_ASYNC_DETAIL_APIS = {
+    "IR": async_api_get_ir_detail_by_id,
+    "SR": async_api_get_sr_detail_by_id,
+    "AR": async_api_get_ar_detail_by_id,
+}
+
+
+def extract_issues(data: dict) -> List[dict]:
+    """从批量查询结果中取出需求列表（兼容result为列表或result.issues两种结构）"""
+    if not data:
+        return []
+
+    result = data.get("result", [])
+    if isinstance(result, dict):
+        result = result.get("issues", [])
+    if not isinstance(result, list):
+        return []
+    return [issue for issue in result if isinstance(issue, dict)]
+
+def _apply_batch(nodes: list, data: dict) -> List[bool]:
+    """把批量查询结果经由各节点的_extract_detail_info映射回对象，返回各节点是否命中"""
+    issues_by_id: Dict[str, dict] = {str(issue.get("id", "")): issue for issue in extract_issues(data)}
+    hits = []
+    for node in nodes:
+        detail = issues_by_id.get(str(node.id))
+        hits.append(detail is not None and node._extract_detail_info({"result": [detail]}))
+    return hits
+
+def _report_fallback(nodes: list, issue_type: str, hits: List[bool]):
+    fallback_count = hits.count(False)
+    if fallback_count:
+        print(f"批量查询{issue_type}: {len(nodes) - fallback_count}/{len(nodes)} 个命中，{fallback_count} 个回退为单个查询")
+
+def load_detail_batch(nodes: list, issue_type: str) -> List[bool]:
+    """
+    通过一次批量查询加载一组同层级节点的详情
+
+    查询结果经由各节点的_extract_detail_info映射回对象，
+    结果中缺失或解析失败的节点回退为逐个GET加载。
+
+    Returns:
+        与nodes一一对应的加载结果列表
+    """
+    if not nodes:
+        return []
+
+    hits = _apply_batch(nodes, _LIST_APIS[issue_type]([node.id for node in nodes]))
+    results = []
+    for node, hit in zip(nodes, hits):
+        if hit:
+            results.append(True)
+            continue
+
+        # 批量结果中没有该节点，回退为单个GET
+        try:
+            results.append(node.load_detail_by_id())
+        except Exception as e:
+            print(f"加载{issue_type} {node.id} 详情出错: {e}")
+            results.append(False)
+
+    _report_fallback(nodes, issue_type, hits)
+    return results
+
+async def async_load_detail(node, issue_type: str) -> bool:
+    """异步加载单个节点的详情"""
+    try:
+        data = await _ASYNC_DETAIL_APIS[issue_type](node.id)
+        return bool(data) and node._extract_detail_info(data)
+    except Exception as e:
+        print(f"加载{issue_type} {node.id} 详情出错: {e}")
+        return False
+
+async def async_load_detail_batch(nodes: list, issue_type: str) -> List[bool]:
+    """load_detail_batch的异步版本：批量查询未命中的节点并发回退为单个查询"""
+    if not nodes:
+        return []
+
+    hits = _apply_batch(nodes, await async_api_post_issue_list_by_ids([node.id for node in nodes], issue_type))
+    fallbacks = [async_load_detail(node, issue_type) for node, hit in zip(nodes, hits) if not hit]
+    fallback_results = iter(await asyncio.gather(*fallbacks))
+    _report_fallback(nodes, issue_type, hits)
+    return [hit or next(fallback_results) for hit in hits]
+
+def load_details_in_batches(nodes: list, issue_type: str, batch_size: int = None) -> int:
+    """按batch_size分批加载节点详情，返回成功数量"""
+    batch_size = batch_size or config.BATCH_QUERY_SIZE
+    success_count = 0
+    for start in range(0, len(nodes), batch_size):
+        batch = nodes[start:start + batch_size]
+        success_count += sum(load_detail_batch(batch, issue_type))
+    return success_count
+
+def load_ir_details_in_batches(irs: list, batch_size: int = None) -> int:
+    """批量加载IR详情"""
+    return load_details_in_batches(irs, "IR", batch_size)
+
+def load_sr_details_in_batches(srs: list, batch_size: int = None) -> int:
+    """批量加载SR详情"""
+    return load_details_in_batches(srs, "SR", batch_size)
+
+def load_ar_details_in_batches(ars: list, batch_size: int = None) -> int:
+    """批量加载AR详情"""
+    return load_details_in_batches(ars, "AR", batch_size)
@@ -0,0 +1,491 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import columnar_store
+from columnar_store import LEVEL_IR, LEVEL_SR, LEVEL_AR, LEVEL_TC
+from models import SF, IR, SR, AR, TestCase, data_registry
+from req_id_parser import SORT_KEY, parse_ar_title, parse_sort_key
+
+# 模拟接口返回的详情（每次用json.loads解析，和真实加载一样得到新的字符串对象）
+_STATUSES = [("新建", "new"), ("开发中", "developing"), ("已完成", "done"), ("已关闭", "closed")]
+_PEOPLE = ["张三", "李四", "王五", "赵六", "钱七", "孙八"]
+_DOMAINS = ["内核", "任务管理", "内存管理", "中断管理"]
+
+
+def _issue_detail(index: int, title: str) -> dict:
+    """IR/SR/AR详情接口返回的一条记录"""
+    status, code = _STATUSES[index % len(_STATUSES)]
+    person = _PEOPLE[index % len(_PEOPLE)]
+    return json.loads(json.dumps({"result": [{
+        "number": f"REQ{index:06d}",
+        "title": title,
+        "category": "Requirement",
+        "status": {"name": status, "code": code},
+        "workload_man_day": "1.5",
+        "sum_workload_man_day": "1.0",
+        "created_by": {"nick_name": person},
+        "business_domain": {"display_value": _DOMAINS[index % len(_DOMAINS)]},
+        "assignee": {"nick_name": _PEOPLE[(index + 1) % len(_PEOPLE)]},
+        "plan_start_date": f"2025-{1 + index % 12:02d}-{1 + index % 28:02d}",
+        "plan_end_date": "2025-01-01",
+        "plan_dev_end_date": "2025-05-31",
+        "plan_test_end_date": "2025-06-15",
+        "description": f"<p>{title}的详细描述</p>"
+    }]}, ensure_ascii=False))
+
+def _test_case_data(index: int, ar: AR) -> dict:
+    """测试用例列表接口返回的一条记录"""
+    return json.loads(json.dumps({
+        "id": f"tc{index}",
+        "number": f"tc_OS_{index:06d}",
+        "name": f"用例{index}",
+        "description": "",
+        "status": {"name": _STATUSES[index % len(_STATUSES)][0]},
+        "execution_type": {"name": "手工"},
+        "test_type": {"name": "功能测试"},
+        "associate_issue_info": {"associate": True, "tracker_name": "AR", "issue_id": ar.id}
+    }, ensure_ascii=False))
+
+def _test_case_detail_data(index: int) -> dict:
+    """测试用例详情接口返回的数据"""
+    return json.loads(json.dumps({
+        "testcase_id": f"tc{index}",
+        "testcase_number": f"tc_OS_{index:06d}",
+        "name": f"用例{index}",
+        "extend_info": {
+            "author": {"name": _PEOPLE[index % len(_PEOPLE)]},
+            "preparation": "系统启动完成",
+            "steps": [{"test_step": f"步骤{step}", "expect_result": f"结果{step}"} for step in range(1, 4)],
+            "description": "",
+            "issue": {"id": "", "name": ""}
+        }
+    }, ensure_ascii=False))
+
+
+def build_tree(irs: int, srs_per_ir: int, ars_per_sr: int) -> SF:
+    """构建一棵加载并规划好路径的合成需求树（与从接口加载的流程相同，但不访问网络）"""
+    sf = SF(id="sf", title="合成SF")
+    sf.plan_sf_html_paths()
+    index = 0
+    for i in range(1, irs + 1):
+        ir = IR(id=f"ir{i}")
+        sf.add_ir(ir)
+        index += 1
+        ir._extract_detail_info(_issue_detail(index, f"IR标题{i}"))
+        ir.plan_ir_html_paths()
+        for j in range(1, srs_per_ir + 1):
+            sr = SR(id=f"sr{i}_{j}")
+            ir.add_sr(sr)
+            index += 1
+            sr._extract_detail_info(_issue_detail(index, f"SR标题{i}-{j}"))
+            sr.plan_sr_html_paths()
+            for k in range(1, ars_per_sr + 1):
+                ar = AR(id=f"ar{i}_{j}_{k}")
+                sr.add_ar(ar)
+                index += 1
+                ar._extract_detail_info(_issue_detail(index, f"LLR_OS_{i:02d}_{j:02d}_{k:02d}功能{i}{j}{k}"))
+                ar.plan_ar_html_paths()
+    return sf
+
+def attach_test_cases(sf: SF, per_ar: int) -> list:
+    """为每个AR添加per_ar个测试用例（含详情）"""
+    test_cases = []
+    for ir in sf.irs:
+        for sr in ir.srs:
+            for ar in sr.ars:
+                for _ in range(per_ar):
+                    index = len(test_cases)
+                    test_case = TestCase()
+                    if test_case.update_from_api_data(_test_case_data(index, ar)):
+                        test_case.test_case_detail._update_from_data(_test_case_detail_data(index))
+                        test_cases.append(test_case)
+    return test_cases
+
+def _traced_bytes() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def bench_memory(args):
+    """需求节点和测试用例的内存占用（tracemalloc统计的保留字节数）"""
+    tracemalloc.start()
+    base = _traced_bytes()
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sf = build_tree(args.irs, args.srs, args.ars)
+    tree_bytes = _traced_bytes() - base
+    node_count = sum(1 + len(ir.srs) + sum(len(sr.ars) for sr in ir.srs) for ir in sf.irs)
+
+    base = _traced_bytes()
+    with contextlib.redirect_stdout(io.StringIO()):
+        test_cases = attach_test_cases(sf, args.test_cases)
+    tc_bytes = _traced_bytes() - base
+    elapsed = time.perf_counter() - start_time
+    tracemalloc.stop()
+
+    print(f"需求节点: {node_count} 个（IR/SR/AR），共 {tree_bytes / 1024 / 1024:.1f} MB，"
+          f"平均每个 {tree_bytes / node_count:.0f} 字节")
+    if test_cases:
+        print(f"测试用例: {len(test_cases)} 个（含详情），共 {tc_bytes / 1024 / 1024:.1f} MB，"
+              f"平均每个 {tc_bytes / len(test_cases):.0f} 字节")
+    ar = sf.irs[0].srs[0].ars[0]
+    instance_dict = sys.getsizeof(ar.__dict__) if hasattr(ar, "__dict__") else 0
+    print(f"单个AR对象: {sys.getsizeof(ar)} 字节，实例字典: {instance_dict} 字节")
+    print(f"构建耗时 {elapsed:.2f} 秒")
+    data_registry.__init__()
+
+
+def _walk_aggregates(sf: SF) -> tuple:
+    """遍历节点对象计算统计（列存储之前的做法），用于对比和校验"""
+    workload_by_ir = {}
+    histogram_by_sr = {}
+    test_case_status = {}
+    for ir in sf.irs:
+        workload_by_ir[ir.req_id or ir.id] = sum(ar.workload for sr in ir.srs for ar in sr.ars)
+        for sr in ir.srs:
+            histogram = histogram_by_sr[sr.req_id or sr.id] = {}
+            for ar in sr.ars:
+                histogram[ar.status or "未知"] = histogram.get(ar.status or "未知", 0) + 1
+                for test_case in ar.test_cases:
+                    status = test_case.status or "未知"
+                    test_case_status[status] = test_case_status.get(status, 0) + 1
+    return workload_by_ir, histogram_by_sr, test_case_status
+
+def _column_aggregates(columns) -> tuple:
+    return (columns.sum_by("workload", LEVEL_IR), columns.status_histogram(LEVEL_SR, LEVEL_AR),
+            columns.status_counts(LEVEL_TC))
+
+def _best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def bench_columns(args):
+    """列存储聚合（每个IR的工时、每个SR的AR状态分布、测试用例状态分布）与遍历对象的耗时对比"""
+    if args.no_numpy:
+        columnar_store.np = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        sf = build_tree(args.irs, args.srs, args.ars)
+        test_cases = attach_test_cases(sf, args.test_cases)
+
+    start_time = time.perf_counter()
+    columns = data_registry.build_columns(sf, test_cases)
+    build_elapsed = time.perf_counter() - start_time
+    if _column_aggregates(columns) != _walk_aggregates(sf):
+        print("错误: 列存储的统计结果与遍历对象的结果不一致")
+        sys.exit(1)
+
+    walk_elapsed = _best_of(lambda: _walk_aggregates(sf), args.repeat)
+    # 每次清空祖先行号缓存，计入分组的计算
+    column_elapsed = _best_of(lambda: (columns._ancestors.clear(), _column_aggregates(columns)), args.repeat)
+    print(f"行数: {len(columns)}（{', '.join(f'{name} {count}' for name, count in columns.level_counts().items())}），"
+          f"{'numpy' if columnar_store.np is not None else '纯Python'}实现")
+    print(f"构建列存储: {build_elapsed * 1000:.1f} ms")
+    print(f"遍历对象聚合: {walk_elapsed * 1000:.1f} ms")
+    print(f"列存储聚合: {column_elapsed * 1000:.1f} ms（{walk_elapsed / column_elapsed:.1f}x）")
+    data_registry.__init__()
+
+
+def bench_query(args):
+    """DataRegistry二级索引查询与遍历全部AR的耗时对比"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        sf = build_tree(args.irs, args.srs, args.ars)
+        attach_test_cases(sf, args.test_cases)
+    # 部分AR没有测试用例
+    for index, ar in enumerate(data_registry.get_all_ar()):
+        if index % 7 == 0:
+            ar.test_cases = []
+
+    queries = [
+        ("处理人", lambda: data_registry.query("AR").where(assignee="李四"),
+         lambda ar: ar.assignee == "李四"),
+        ("状态+处理人", lambda: data_registry.query("AR").where(status="开发中", assignee="张三"),
+         lambda ar: ar.status == "开发中" and ar.assignee == "张三"),
+        ("计划完成日期范围", lambda: data_registry.query("AR").where_range("plan_end_date", end="2025-02-28"),
+         lambda ar: bool(ar.plan_end_date) and ar.plan_end_date[:10] <= "2025-02-28"),
+        ("新建且无测试用例", lambda: data_registry.query("AR").where(status="新建").filter(lambda ar: not ar.test_cases),
+         lambda ar: ar.status == "新建" and not ar.test_cases),
+    ]
+    print(f"AR: {len(data_registry.get_all_ar())} 个")
+    for name, build_query, predicate in queries:
+        query = build_query()
+        expected = [ar for ar in data_registry.get_all_ar() if predicate(ar)]
+        # 范围查询的结果按日期排列，按集合比较
+        if sorted(map(id, query.all())) != sorted(map(id, expected)):
+            print(f"错误: 查询 {name} 的结果与遍历的结果不一致")
+            sys.exit(1)
+        index_elapsed = _best_of(query.all, args.repeat)
+        scan_elapsed = _best_of(lambda: [ar for ar in data_registry.get_all_ar() if predicate(ar)], args.repeat)
+        print(f"  {name}: {len(expected)} 个，索引（{query.plan}） {index_elapsed * 1000:.2f} ms，"
+              f"遍历 {scan_elapsed * 1000:.2f} ms（{scan_elapsed / index_elapsed:.1f}x）")
+    data_registry.__init__()
+
+
+# 压力测试中SR/IR的req_id写入记录（节点id，list.append是原子操作，不需要加锁）
+_req_id_writes: list = []
+# 读到空req_id后的停顿：拉开"检查为空"与"写入"之间的窗口，没有锁保护时同一SR下的多个AR都会补全并注册
+_EMPTY_REQ_ID_DELAY = 0.002
+
+def _contended(cls):
+    """
+    压力测试用的IR/SR子类：req_id为空时读取会停顿_EMPTY_REQ_ID_DELAY，每次写入非空req_id记入_req_id_writes
+
+    register_ar_chain重复补全写入的是相同的值，结果与只写一次相同，只有写入次数能看出检查和写入是否在同一次加锁内完成
+    """
+    slot = cls.__dict__["req_id"]
+
+    def get_req_id(node):
+        value = slot.__get__(node)
+        if not value:
+            time.sleep(_EMPTY_REQ_ID_DELAY)
+        return value
+
+    def set_req_id(node, value):
+        if value:
+            _req_id_writes.append(node.id)
+        slot.__set__(node, value)
+
+    return type(f"Contended{cls.__name__}", (cls,), {"__slots__": (), "req_id": property(get_req_id, set_req_id)})
+
+_ContendedIR = _contended(IR)
+_ContendedSR = _contended(SR)
+
+def _skeleton(irs: int, srs_per_ir: int, ars_per_sr: int) -> tuple:
+    """未加载详情的合成需求树，以及按层级顺序排列的待加载节点 [(节点, 编号, 标题)]"""
+    sf = SF(id="sf", title="合成SF")
+    loads = []
+    index = 0
+    for i in range(1, irs + 1):
+        ir = _ContendedIR(id=f"ir{i}")
+        sf.add_ir(ir)
+        index += 1
+        loads.append((ir, index, f"IR标题{i}"))
+        for j in range(1, srs_per_ir + 1):
+            sr = _ContendedSR(id=f"sr{i}_{j}")
+            ir.add_sr(sr)
+            index += 1
+            loads.append((sr, index, f"SR标题{i}-{j}"))
+            for k in range(1, ars_per_sr + 1):
+                ar = AR(id=f"ar{i}_{j}_{k}")
+                sr.add_ar(ar)
+                index += 1
+                loads.append((ar, index, f"LLR_OS_{i:02d}_{j:02d}_{k:02d}功能{i}{j}{k}"))
+    return sf, loads
+
+def _load_detail(load: tuple):
+    node, index, title = load
+    node._extract_detail_info(_issue_detail(index, title))
+
+def _link_test_case(link: tuple):
+    index, ar = link
+    TestCase().update_from_api_data(_test_case_data(index, ar))
+
+def _load(args, concurrent: bool) -> dict:
+    """加载一棵合成需求树并关联测试用例，返回注册表的签名"""
+    _req_id_writes.clear()
+    sf, loads = _skeleton(args.irs, args.srs, args.ars)
+    ars = [node for node, _, _ in loads if isinstance(node, AR)]
+    links = [(index, ars[index % len(ars)]) for index in range(len(ars) * args.test_cases)]
+    if not concurrent:
+        for load in loads:
+            _load_detail(load)
+        for link in links:
+            _link_test_case(link)
+        return registry_signature(sf)
+
+    # 打乱顺序（AR可能先于所属SR加载），并缩短线程切换间隔以增加交错
+    rng = random.Random(args.seed)
+    rng.shuffle(loads)
+    rng.shuffle(links)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(_load_detail, loads))
+            list(executor.map(_link_test_case, links))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    return registry_signature(sf)
+
+def registry_signature(sf: SF) -> dict:
+    """注册表查找字典、二级索引、req_id链及其写入次数的内容（节点用id表示，与加载顺序无关）"""
+    nodes = [sf] + [node for ir in sf.irs for node in [ir] + [node for sr in ir.srs for node in [sr] + sr.ars]]
+    indexes = {}
+    for (kind, field), index in data_registry.indexes.indexes.items():
+        for value, bucket in index.buckets.items():
+            indexes[(kind, field, value)] = sorted(node.id or node.number for node in bucket.values())
+    return {
+        "ir_by_req_id": {key: node.id for key, node in data_registry.ir_by_req_id.items()},
+        "sr_by_req_id": {key: node.id for key, node in data_registry.sr_by_req_id.items()},
+        "ar_by_id": {key: node.id for key, node in data_registry.ar_by_id.items()},
+        "ar_by_req_id": {key: node.id for key, node in data_registry.ar_by_req_id.items()},
+        "test_case_by_number": {key: (tc.related_ar_req_id, tc.related_sr_req_id, tc.related_ir_req_id)
+                                for key, tc in data_registry.test_case_by_number.items()},
+        "indexes": indexes,
+        "req_ids": {node.id: node.req_id for node in nodes},
+        "req_id_writes": {node_id: _req_id_writes.count(node_id) for node_id in sorted(set(_req_id_writes))},
+        "test_cases": {ar.id: sorted(tc.number for tc in ar.test_cases) for ar in data_registry.ar_by_id.values()},
+    }
+
+
+def _stress_round(args, expected: dict, title: str) -> list:
+    """并发加载一轮，返回与串行加载不一致的签名项"""
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        actual = _load(args, concurrent=True)
+    elapsed = time.perf_counter() - start_time
+    mismatched = [name for name in expected if actual[name] != expected[name]]
+    print(f"{title}（{args.workers}个线程）: 耗时 {elapsed:.2f} 秒，"
+          + (f"不一致: {', '.join(mismatched)}" if mismatched else "与串行加载一致"))
+    args.seed += 1
+    return mismatched
+
+def bench_stress(args):
+    """
+    并发加载与串行加载的注册表一致性检查（查找字典、二级索引、req_id链及写入次数、测试用例关联）
+
+    先按正常加锁并发加载args.rounds轮，应与串行加载一致；再把注册表的锁换成空操作对照一轮，应检测到不一致
+    （同一SR/IR的req_id被补全多次），否则说明本检查发现不了缺少锁的问题。任一预期不满足时以状态1退出。
+    """
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = _load(args, concurrent=False)
+    serial_elapsed = time.perf_counter() - start_time
+    print(f"串行加载: AR {len(expected['ar_by_id'])} 个，测试用例 {len(expected['test_case_by_number'])} 个，"
+          f"索引桶 {len(expected['indexes'])} 个，耗时 {serial_elapsed:.2f} 秒")
+
+    failed = False
+    for round_no in range(1, args.rounds + 1):
+        data_registry.__init__()
+        failed = bool(_stress_round(args, expected, f"第 {round_no} 轮并发加载")) or failed
+
+    if not args.skip_no_lock_check:
+        data_registry.__init__()
+        data_registry.lock = contextlib.nullcontext()
+        if not _stress_round(args, expected, "对照：去掉注册表的锁并发加载"):
+            print("对照失败: 去掉锁后仍与串行加载一致，本检查无法发现缺少锁的问题")
+            failed = True
+    data_registry.__init__()
+    if failed:
+        sys.exit(1)
+
+
+def _legacy_title_req_ids(title: str) -> tuple:
+    """以前AR._extract_req_ids_from_title的做法：查找关键字后按'_'分割"""
+    start_idx = title.find("LLR_OS_")
+    if start_idx == -1:
+        return None, None, None
+    ar_req_id = title[start_idx:start_idx + len("LLR_OS_xx_xx_xx")]
+    parts = ar_req_id.split('_')
+    if len(parts) != 5 or parts[0] != "LLR" or parts[1] != "OS":
+        return None, None, None
+    return ar_req_id, '_'.join(["HLR", "OS", parts[2], parts[3]]), '_'.join(["HLR", "OS", parts[2]])
+
+def _legacy_ar_sort_key(ar) -> tuple:
+    """以前SR.sort_ars_by_req_id的排序键：每次排序都分割字符串"""
+    if not ar or not ar.req_id:
+        return (999, 999, 999, "zzz")
+    parts = ar.req_id.split('_')
+    if len(parts) < 5:
+        return (999, 999, 999, ar.req_id)
+    num1 = int(parts[2]) if parts[2].isdigit() else 0
+    num2 = int(parts[3]) if parts[3].isdigit() else 0
+    num3 = int(parts[4]) if len(parts) > 4 and parts[4].isdigit() else 0
+    return (num1, num2, num3, ar.req_id)
+
+
+def bench_req_ids(args):
+    """req_id解析与排序：预编译解析并缓存排序键 与 每次排序分割字符串 的耗时对比"""
+    rng = random.Random(args.seed)
+    titles = [f"LLR_OS_{rng.randint(1, 99):02d}_{rng.randint(1, 99):02d}_{rng.randint(1, 99):02d}功能{index}"
+              for index in range(args.count)]
+
+    parsed_ids = [parse_ar_title(title) for title in titles]
+    if parsed_ids != [_legacy_title_req_ids(title) for title in titles]:
+        print("错误: 标题解析结果与以前的做法不一致")
+        sys.exit(1)
+
+    ars = [AR(id=f"ar{index}", req_id=req_ids[0]) for index, req_ids in enumerate(parsed_ids)]
+    start_time = time.perf_counter()
+    for ar in ars:
+        ar.sort_key = parse_sort_key(ar.req_id)
+    key_elapsed = time.perf_counter() - start_time
+
+    legacy_parse = _best_of(lambda: [_legacy_title_req_ids(title) for title in titles], args.repeat)
+    parse_elapsed = _best_of(lambda: [parse_ar_title(title) for title in titles], args.repeat)
+    legacy_sort = _best_of(lambda: sorted(ars, key=_legacy_ar_sort_key), args.repeat)
+    cached_sort = _best_of(lambda: sorted(ars, key=SORT_KEY), args.repeat)
+    if sorted(ars, key=SORT_KEY) != sorted(ars, key=_legacy_ar_sort_key):
+        print("错误: 排序结果与以前的做法不一致")
+        sys.exit(1)
+
+    print(f"{args.count} 个AR编号:")
+    print(f"  从标题提取req_id: 以前 {legacy_parse * 1000:.1f} ms，预编译正则 {parse_elapsed * 1000:.1f} ms")
+    print(f"  计算排序键（注册时一次）: {key_elapsed * 1000:.1f} ms")
+    print(f"  排序: 每次分割字符串 {legacy_sort * 1000:.1f} ms，缓存排序键 {cached_sort * 1000:.1f} ms"
+          f"（{legacy_sort / cached_sort:.1f}x）")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成工具的性能基准")
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+
+    memory = subparsers.add_parser("memory", help="需求节点和测试用例的内存占用")
+    memory.add_argument("--irs", type=int, default=20, help="IR数量")
+    memory.add_argument("--srs", type=int, default=20, help="每个IR下的SR数量")
+    memory.add_argument("--ars", type=int, default=25, help="每个SR下的AR数量")
+    memory.add_argument("--test-cases", type=int, default=2, help="每个AR关联的测试用例数量")
+    memory.set_defaults(func=bench_memory)
+
+    columns = subparsers.add_parser("columns", help="列存储聚合与遍历对象的耗时对比")
+    columns.add_argument("--irs", type=int, default=20, help="IR数量")
+    columns.add_argument("--srs", type=int, default=20, help="每个IR下的SR数量")
+    columns.add_argument("--ars", type=int, default=25, help="每个SR下的AR数量")
+    columns.add_argument("--test-cases", type=int, default=2, help="每个AR关联的测试用例数量")
+    columns.add_argument("--repeat", type=int, default=5, help="重复次数（取最快的一次）")
+    columns.add_argument("--no-numpy", action="store_true", help="使用纯Python实现（即使安装了numpy）")
+    columns.set_defaults(func=bench_columns)
+
+    query = subparsers.add_parser("query", help="DataRegistry二级索引查询与遍历的耗时对比")
+    query.add_argument("--irs", type=int, default=20, help="IR数量")
+    query.add_argument("--srs", type=int, default=20, help="每个IR下的SR数量")
+    query.add_argument("--ars", type=int, default=25, help="每个SR下的AR数量")
+    query.add_argument("--test-cases", type=int, default=1, help="每个AR关联的测试用例数量")
+    query.add_argument("--repeat", type=int, default=5, help="重复次数（取最快的一次）")
+    query.set_defaults(func=bench_query)
+
+    stress = subparsers.add_parser("stress", help="多线程并发注册与串行注册的一致性检查")
+    stress.add_argument("--irs", type=int, default=20, help="IR数量")
+    stress.add_argument("--srs", type=int, default=50, help="每个IR下的SR数量")
+    stress.add_argument("--ars", type=int, default=50, help="每个SR下的AR数量")
+    stress.add_argument("--test-cases", type=int, default=1, help="每个AR关联的测试用例数量")
+    stress.add_argument("--workers", type=int, default=64, help="并发线程数")
+    stress.add_argument("--rounds", type=int, default=3, help="并发加载的轮数")
+    stress.add_argument("--seed", type=int, default=1, help="打乱加载顺序的随机种子")
+    stress.add_argument("--skip-no-lock-check", action="store_true",
+                        help="不运行去掉锁的对照轮（对照轮应检测到不一致）")
+    stress.set_defaults(func=bench_stress)
+
+    req_ids = subparsers.add_parser("req-ids", help="req_id解析与排序的耗时对比")
+    req_ids.add_argument("--count", type=int, default=100000, help="合成编号数量")
+    req_ids.add_argument("--repeat", type=int, default=5, help="重复次数（取最快的一次）")
+    req_ids.add_argument("--seed", type=int, default=1, help="随机种子")
+    req_ids.set_defaults(func=bench_req_ids)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
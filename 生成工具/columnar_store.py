@@ -0,0 +1,247 @@
+import array
+import datetime
+import functools
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# level列的取值
+LEVEL_SF, LEVEL_IR, LEVEL_SR, LEVEL_AR, LEVEL_TC = range(5)
+LEVEL_NAMES = ["SF", "IR", "SR", "AR", "TC"]
+
+NO_PARENT = -1
+NO_DATE = 0  # 日期列中表示没有日期（其余取值为date.toordinal()）
+UNKNOWN_STATUS = "未知"
+
+# 按日序号保存的日期列
+DATE_FIELDS = ("plan_start_date", "plan_end_date", "plan_dev_end_date", "plan_test_end_date")
+# 可以求和的数值列
+NUMERIC_FIELDS = ("workload", "act_workload")
+
+
+@functools.lru_cache(maxsize=4096)
+def date_ordinal(value: str) -> int:
+    """'2025-06-30'（可带时间部分）转为日序号，为空或无法解析时返回NO_DATE"""
+    try:
+        return datetime.date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return NO_DATE
+
+def ordinal_date(ordinal: int) -> str:
+    """日序号转回'YYYY-MM-DD'，NO_DATE返回空字符串"""
+    return datetime.date.fromordinal(ordinal).isoformat() if ordinal != NO_DATE else ""
+
+
+class ColumnarStore:
+    """
+    需求列存储 - SF/IR/SR/AR和测试用例按行编号，每个字段一列（array.array或字符串列表）
+
+    列：id、req_id、level、parent（父节点行号）、status（状态字典编码）、workload、act_workload、
+    以及DATE_FIELDS中的日期（日序号）。构建时遍历一次需求树，之后的聚合只读这些列，不访问节点对象；
+    安装了numpy时用bincount等向量运算，否则按列逐行计算。
+    存储是构建时刻的快照，需求树变化后需要重新构建（见DataRegistry.build_columns）。
+    """
+    def __init__(self):
+        self.ids: List[str] = []
+        self.req_ids: List[str] = []
+        self.level = array.array('b')
+        self.parent = array.array('i')
+        self.status = array.array('H')  # status_names中的下标
+        self.status_names: List[str] = []
+        self.workload = array.array('d')
+        self.act_workload = array.array('d')
+        self.dates: Dict[str, array.array] = {name: array.array('i') for name in DATE_FIELDS}
+        self._status_codes: Dict[str, int] = {}
+        self._ancestors: Dict[int, object] = {}  # 层级 -> 每行在该层级的祖先行号
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _status_code(self, status: str) -> int:
+        status = status or UNKNOWN_STATUS
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.status_names)
+            self.status_names.append(status)
+        return code
+
+    def append(self, level: int, node, parent_row: int = NO_PARENT) -> int:
+        """添加一行（节点没有的字段取默认值），返回行号"""
+        row = len(self.ids)
+        self.ids.append(node.id or "")
+        # 测试用例没有req_id，使用用例编号
+        self.req_ids.append((node.number if level == LEVEL_TC else node.req_id) or "")
+        self.level.append(level)
+        self.parent.append(parent_row)
+        self.status.append(self._status_code(node.status))
+        self.workload.append(getattr(node, "workload", 0.0) or 0.0)
+        self.act_workload.append(getattr(node, "act_workload", 0.0) or 0.0)
+        for name, column in self.dates.items():
+            column.append(date_ordinal(getattr(node, name, "")))
+        self._ancestors.clear()
+        return row
+
+    @classmethod
+    def from_tree(cls, sf, test_cases: Optional[list] = None) -> 'ColumnarStore':
+        """
+        从需求树构建列存储（按SF、IR、SR、AR、AR关联测试用例的深度优先顺序编号）
+
+        Args:
+            sf: 需求树的根
+            test_cases: 测试套件中的所有测试用例（未关联AR的测试用例作为没有父节点的行添加）
+        """
+        store = cls()
+        sf_row = store.append(LEVEL_SF, sf)
+        linked = set()
+        for ir in sf.irs:
+            ir_row = store.append(LEVEL_IR, ir, sf_row)
+            for sr in ir.srs:
+                sr_row = store.append(LEVEL_SR, sr, ir_row)
+                for ar in sr.ars:
+                    ar_row = store.append(LEVEL_AR, ar, sr_row)
+                    for test_case in ar.test_cases:
+                        store.append(LEVEL_TC, test_case, ar_row)
+                        linked.add(id(test_case))
+        for test_case in test_cases or []:
+            if id(test_case) not in linked:
+                store.append(LEVEL_TC, test_case)
+        return store
+
+    def label(self, row: int) -> str:
+        """行在聚合结果中的名称：req_id，没有时使用id"""
+        return self.req_ids[row] or self.ids[row]
+
+    def rows(self, level: int) -> List[int]:
+        """某一层级的所有行号"""
+        if np is not None:
+            return np.flatnonzero(np.frombuffer(self.level, dtype=np.int8) == level).tolist()
+        return [row for row, row_level in enumerate(self.level) if row_level == level]
+
+    def ancestors(self, level: int):
+        """每一行在level层级的祖先行号（自身在该层级时为自身，没有时为NO_PARENT），结果按层级缓存"""
+        cached = self._ancestors.get(level)
+        if cached is not None:
+            return cached
+        if np is not None:
+            levels = np.frombuffer(self.level, dtype=np.int8)
+            parents = np.frombuffer(self.parent, dtype=np.int32)
+            # 末尾多一项NO_PARENT，父节点为NO_PARENT的行按下标-1取到它
+            result = np.full(len(self) + 1, NO_PARENT, dtype=np.int32)
+            result[:-1][levels == level] = np.flatnonzero(levels == level)
+            # 父节点总在上一层级，逐层取父节点的结果
+            for deeper in range(level + 1, len(LEVEL_NAMES)):
+                rows = np.flatnonzero(levels == deeper)
+                result[rows] = result[parents[rows]]
+            result = result[:-1]
+        else:
+            result = array.array('i', [NO_PARENT]) * len(self)
+            for row in range(len(self)):
+                # 父节点行号总是小于子节点，按行号顺序计算时父节点的结果已经确定
+                row_level = self.level[row]
+                if row_level == level:
+                    result[row] = row
+                elif row_level > level and self.parent[row] != NO_PARENT:
+                    result[row] = result[self.parent[row]]
+        self._ancestors[level] = result
+        return result
+
+    def level_counts(self) -> Dict[str, int]:
+        """各层级的行数，如 {"SF": 1, "IR": 12, ...}"""
+        if np is not None:
+            counts = np.bincount(np.frombuffer(self.level, dtype=np.int8), minlength=len(LEVEL_NAMES)).tolist()
+        else:
+            counts = [0] * len(LEVEL_NAMES)
+            for row_level in self.level:
+                counts[row_level] += 1
+        return dict(zip(LEVEL_NAMES, counts))
+
+    def status_counts(self, level: int) -> Dict[str, int]:
+        """某一层级的状态分布 {状态: 数量}（按状态首次出现的顺序）"""
+        counts = [0] * len(self.status_names)
+        if np is not None:
+            mask = np.frombuffer(self.level, dtype=np.int8) == level
+            codes = np.frombuffer(self.status, dtype=np.uint16)[mask]
+            counts = np.bincount(codes, minlength=len(self.status_names)).tolist()
+        else:
+            for row_level, code in zip(self.level, self.status):
+                if row_level == level:
+                    counts[code] += 1
+        return {self.status_names[code]: count for code, count in enumerate(counts) if count}
+
+    def sum_by(self, field: str, group_level: int, level: int = LEVEL_AR) -> Dict[str, float]:
+        """
+        按group_level层级的祖先分组，对level层级的行求field列的和（如每个IR下所有AR的计划工时）
+
+        Returns:
+            {分组的req_id: 合计}，包含没有任何行的分组（合计为0），按行号顺序
+        """
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"不能求和的列: {field}，可选: {', '.join(NUMERIC_FIELDS)}")
+        groups = self.rows(group_level)
+        ancestors = self.ancestors(group_level)
+        if np is not None:
+            mask = np.frombuffer(self.level, dtype=np.int8) == level
+            mask &= ancestors != NO_PARENT
+            values = np.frombuffer(getattr(self, field), dtype=np.float64)
+            totals = np.bincount(ancestors[mask], weights=values[mask], minlength=len(self))[groups].tolist()
+        else:
+            by_row = [0.0] * len(self)
+            column = getattr(self, field)
+            for row, row_level in enumerate(self.level):
+                if row_level == level and ancestors[row] != NO_PARENT:
+                    by_row[ancestors[row]] += column[row]
+            totals = [by_row[group] for group in groups]
+        return {self.label(group): total for group, total in zip(groups, totals)}
+
+    def status_histogram(self, group_level: int, level: int = LEVEL_AR) -> Dict[str, Dict[str, int]]:
+        """
+        按group_level层级的祖先分组，统计level层级各状态的数量（如每个SR下AR的状态分布）
+
+        Returns:
+            {分组的req_id: {状态: 数量}}，只包含数量不为0的状态
+        """
+        groups = self.rows(group_level)
+        ancestors = self.ancestors(group_level)
+        status_count = len(self.status_names)
+        if np is not None:
+            mask = np.frombuffer(self.level, dtype=np.int8) == level
+            mask &= ancestors != NO_PARENT
+            # 祖先行号 -> 分组序号，每个分组占status_count个计数
+            positions = np.zeros(len(self), dtype=np.int64)
+            positions[groups] = np.arange(len(groups))
+            keys = positions[ancestors[mask]] * status_count + np.frombuffer(self.status, dtype=np.uint16)[mask]
+            table = np.bincount(keys, minlength=len(groups) * status_count).reshape(len(groups), status_count).tolist()
+        else:
+            counts: Dict[int, List[int]] = {group: [0] * status_count for group in groups}
+            for row, row_level in enumerate(self.level):
+                if row_level == level and ancestors[row] != NO_PARENT:
+                    counts[ancestors[row]][self.status[row]] += 1
+            table = [counts[group] for group in groups]
+        return {
+            self.label(group): {self.status_names[code]: count for code, count in enumerate(row_counts) if count}
+            for group, row_counts in zip(groups, table)
+        }
+
+    def latest_date_by(self, field: str, group_level: int, level: int = LEVEL_AR) -> Dict[str, str]:
+        """按group_level层级的祖先分组，level层级行中field日期的最大值（如每个IR下AR最晚的计划完成时间）"""
+        if field not in self.dates:
+            raise ValueError(f"未知的日期列: {field}，可选: {', '.join(DATE_FIELDS)}")
+        groups = self.rows(group_level)
+        ancestors = self.ancestors(group_level)
+        if np is not None:
+            mask = np.frombuffer(self.level, dtype=np.int8) == level
+            mask &= ancestors != NO_PARENT
+            latest = np.full(len(self), NO_DATE, dtype=np.int32)
+            np.maximum.at(latest, ancestors[mask], np.frombuffer(self.dates[field], dtype=np.int32)[mask])
+            latest = latest[groups].tolist()
+        else:
+            by_row = [NO_DATE] * len(self)
+            column = self.dates[field]
+            for row, row_level in enumerate(self.level):
+                if row_level == level and ancestors[row] != NO_PARENT and column[row] > by_row[ancestors[row]]:
+                    by_row[ancestors[row]] = column[row]
+            latest = [by_row[group] for group in groups]
+        return {self.label(group): ordinal_date(ordinal) for group, ordinal in zip(groups, latest)}
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Dict, Any
+from link_resolver import link_resolver
 
 @dataclass
 class Config:
@@ -16,6 +17,30 @@ class Config:
     # 通用配置
     TIMEOUT: int = 30
 
+    # HTTP连接池配置
+    POOL_CONNECTIONS: int = 10  # 缓存的主机连接池个数
+    POOL_MAXSIZE: int = 200  # 每个主机连接池保持的最大连接数（不小于异步并发数）
+
+    # 异步请求配置
+    ASYNC_CONCURRENCY_PER_ENDPOINT: int = 50  # 每个接口同时在途的最大请求数
+    ASYNC_MAX_WORKERS: int = 200  # 执行异步请求的线程数
+
+    # 磁盘响应缓存配置
+    CACHE_MODE: str = "off"  # off / read_through / write_through / offline
+    CACHE_DIR: str = ".api_cache"
+    CACHE_TTL: int = 24 * 3600  # 缓存有效期（秒），0表示永不过期
+    CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 缓存目录最大容量，超出后按LRU淘汰
+
+    # 需求层级并发加载线程数
+    LOADER_MAX_WORKERS: int = 32
+    # 需求层级加载方式：thread（LOADER_MAX_WORKERS个线程）/ async（事件循环，按接口限制在途请求数，见ASYNC_*）
+    HIERARCHY_LOADER: str = "thread"
+    # 批量查询时每次请求携带的需求id数（1表示逐个GET详情）
+    BATCH_QUERY_SIZE: int = 50
+
+    # 增量同步配置
+    SYNC_STATE_FILE: str = ".sync_state.json"  # 上次同步状态的保存位置
+    SYNC_UPDATE_TIME_FIELD: str = "updated_time"  # 需求数据中的修改时间字段（CodeArts需求接口的updated_time）
     
     # Token相关（运行时设置）
     #token: str = field(default="", init=False)
@@ -32,12 +57,37 @@ class Config:
 
     # 测试用例
     EXECUTION_TYPE_ID: int = 10005
+    TC_DETAIL_WORKERS: int = 16  # 并发加载测试用例详情的线程数
+    TC_DETAIL_RATE: float = 20.0  # 测试用例详情请求的限速（每秒请求数，0表示不限速）
+    TC_DETAIL_BURST: int = 20  # 限速允许的突发请求数
+    TC_PAGE_WORKERS: int = 8  # 并发获取测试用例分页的线程数
+    TC_PAGE_MAX_RETRIES: int = 3  # 单个分页获取失败后的重试次数
+    TC_PAGE_RETRY_BACKOFF: float = 0.5  # 重试的初始等待秒数（之后每次翻倍）
+    TC_PAGE_SIZE_MAX: int = 500  # 自动分页时首次尝试的单页数量
+    TC_PAGE_SIZE_MIN: int = 20  # 自动分页时允许减小到的最小单页数量
     TC_DETAIL_URL: str = "https://codeartstestplan.cn-avicasgt-1.avicasgt.com/v1/projects/6c9fff785268446bab66073c5bc1fa56/testcase"
     TC_ALL_URL: str = "https://codeartstestplan.cn-avicasgt-1.avicasgt.com/v1/6c9fff785268446bab66073c5bc1fa56/testcases/batch-query"
 
     #html文件目录
     BASE_DIR_NAME: str = "verifymaterial"
     REQ_DIR_NAME: str = "requirement"
+    ASSETS_DIR_NAME: str = "assets"  # 共享样式等静态资源目录（位于REQ_DIR_NAME下）
+    THEME_NAME: str = "default"  # 页面样式主题（themes/下的目录名）
+    TEMPLATE_CACHE_DIR: str = ".template_cache"  # 编译后模板的磁盘缓存目录（为空表示不缓存）
+    RENDER_EXECUTOR: str = "process"  # 页面渲染执行方式：process/thread/serial
+    RENDER_WORKERS: int = 0  # 渲染工作进程/线程数（0表示CPU核数）
+    BUILD_MANIFEST_FILE: str = ".build_manifest.json"  # 构建清单文件名（位于BASE_DIR_NAME下）
+    SKIP_UNCHANGED_WRITES: bool = True  # 内容与构建清单中的哈希相同时跳过写入（False时总是重写，仍更新清单）
+    PRECOMPRESS: str = ""  # 为生成的文件写出预压缩文件的格式，逗号分隔：gz,br（为空表示不生成；br需要安装brotli）
+    PRECOMPRESS_MIN_SIZE: int = 1024  # 小于该字节数的文件不预压缩
+    NAVIGATION_MODE: str = "inline"  # 需求导航输出方式：inline（整棵树写入页面）/lazy（外壳页面+按IR分块的数据，展开时加载）
+    NAV_DATA_DIR_NAME: str = "nav_data"  # lazy模式下导航数据块的目录（与需求导航页面同级）
+    SEARCH_INDEX: bool = True  # 是否生成需求搜索页面和搜索索引
+    SEARCH_DATA_DIR_NAME: str = "search_data"  # 搜索索引数据块的目录（与需求搜索页面同级）
+    SEARCH_SHARD_COUNT: int = 0  # 倒排索引分片数（0表示按SEARCH_SHARD_POSTINGS自动确定）
+    SEARCH_SHARD_POSTINGS: int = 20000  # 自动分片时每个分片的倒排记录数
+    SEARCH_DOCS_PER_SHARD: int = 500  # 每个文档数据块包含的需求数
+    TEST_CASE_DIR_NAME: str = "测试用例"  # 测试用例页面的目录（位于所属AR的目录下）
 
 # 全局配置实例
 config = Config()
@@ -46,6 +96,9 @@ def calculate_relative_path(from_path: str, to_path: str) -> str:
     """
     计算两个文件路径之间的相对路径（公共函数）
 
+    由link_resolver计算并缓存：每个页面路径只解析一次，每对目录的相对前缀只计算一次，
+    结果与os.path.relpath相同。
+
     Args:
         from_path: 源文件路径 (通常是一个文件的路径，如 `SF.html`)
         to_path: 目标文件路径 (需要链接到的文件，如 `SF描述.html`)
@@ -57,28 +110,9 @@ def calculate_relative_path(from_path: str, to_path: str) -> str:
         return ""
 
     try:
-        # 1. 确定计算的起始目录
-        # 如果 from_path 看起来像一个文件（有后缀），则取其所在目录[citation:6][citation:7]
-        if os.path.splitext(from_path)[1]:  # 检查是否有文件扩展名
-            start_dir = os.path.dirname(from_path)
-        else:
-            start_dir = from_path
-
-        # 如果目录为空（例如文件在根目录），设为当前目录
-        if not start_dir:
-            start_dir = '.'
-
-        # 2. 使用 os.path.relpath 计算相对路径[citation:1][citation:6][citation:8]
-        # 它能够自动处理需要向上（使用 ".."）导航的情况
-        relative_path = os.path.relpath(to_path, start=start_dir)
-
-        # 3. (可选) 将Windows的反斜杠转换为正斜杠，以适应HTML和跨平台需求
-        relative_path = relative_path.replace('\\', '/')
-
-        return relative_path
-
+        return link_resolver.relative(from_path, to_path)
     except Exception as e:
         # 捕获所有可能的异常，例如路径在不同驱动器上[citation:2]
         print(f"计算相对路径时出错 from='{from_path}', to='{to_path}': {e}")
         # 返回一个安全的回退值，例如目标路径本身或空字符串
-        return ""
\ No newline at end of file
+        return ""
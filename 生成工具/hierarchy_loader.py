@@ -0,0 +1,164 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
+from config import config
+from batch_loader import load_detail_batch, async_load_detail, async_load_detail_batch
+
+# 需求层级的加载方式
+LOADER_THREAD = "thread"  # 线程池（LOADER_MAX_WORKERS个线程）
+LOADER_ASYNC = "async"  # 事件循环 + async_rest_client（按接口限制在途请求数）
+LOADERS = [LOADER_THREAD, LOADER_ASYNC]
+
+
+class HierarchyLoader:
+    """需求层级加载器 - 在线程池上流水线式并发加载SF下所有IR/SR/AR的详情
+
+    每个节点的详情加载完成（children字符串已解析出子节点）后立即提交其子节点，
+    不等待同层其他节点，因此总耗时取决于层级深度而不是节点数量。
+    batch_size大于1时，同一父节点的子节点按batch_size个一组通过批量查询接口加载。
+    """
+    LEVELS = ["IR", "SR", "AR"]
+
+    def __init__(self, sf, max_workers: int = None, batch_size: int = None):
+        self.sf = sf
+        self.max_workers = max_workers or config.LOADER_MAX_WORKERS
+        self.batch_size = batch_size or config.BATCH_QUERY_SIZE
+        self.total: Dict[str, int] = {level: 0 for level in self.LEVELS}
+        self.success: Dict[str, int] = {level: 0 for level in self.LEVELS}
+        self.failed: Dict[str, List[str]] = {level: [] for level in self.LEVELS}
+
+    def load(self) -> bool:
+        """加载整棵需求树，完成后按req_id排序整个层级"""
+        if not self.sf.irs:
+            print(f"SF {self.sf.title} 没有IR需要更新")
+            return True
+
+        print(f"开始并发加载SF '{self.sf.title}' 的IR/SR/AR详情（{self.max_workers}个线程）...")
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            self._submit(executor, pending, self.sf.irs, "IR")
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    nodes, level = pending.pop(future)
+                    for node, loaded in zip(nodes, future.result()):
+                        if loaded:
+                            self.success[level] += 1
+                            self._on_node_loaded(executor, pending, node, level)
+                        else:
+                            self.failed[level].append(node.id)
+
+        self._report(start_time)
+        return self.success["IR"] > 0
+
+    def _report(self, start_time: float):
+        """打印各层级的加载结果，并按req_id排序整个层级"""
+        elapsed = time.time() - start_time
+        for level in self.LEVELS:
+            print(f"{level}详情更新完成: {self.success[level]}/{self.total[level]} 个成功")
+            if self.failed[level]:
+                print(f"  失败的{level}: {', '.join(self.failed[level])}")
+        print(f"需求层级加载耗时: {elapsed:.2f} 秒")
+
+        self.sf._sort_all_hierarchy_after_ars_updated()
+
+    def _submit(self, executor: ThreadPoolExecutor, pending: dict, nodes: list, level: str):
+        """提交一组同层级节点的详情加载任务（批量模式下每batch_size个节点一个任务）"""
+        self.total[level] += len(nodes)
+        step = self.batch_size if self.batch_size > 1 else 1
+        for start in range(0, len(nodes), step):
+            batch = nodes[start:start + step]
+            future = executor.submit(self._load_nodes, batch, level)
+            pending[future] = (batch, level)
+
+    def _load_nodes(self, nodes: list, level: str) -> List[bool]:
+        """在工作线程中加载节点详情（同时解析children创建子节点）"""
+        if len(nodes) > 1:
+            return load_detail_batch(nodes, level)
+
+        results = []
+        for node in nodes:
+            try:
+                results.append(node.load_detail_by_id())
+            except Exception as e:
+                print(f"加载节点 {node.id} 详情出错: {e}")
+                results.append(False)
+        return results
+
+    @staticmethod
+    def _plan_node(node, level: str) -> tuple:
+        """节点加载成功后规划其HTML文件路径，返回 (子节点列表, 子节点层级)，AR没有子节点"""
+        if level == "IR":
+            node.plan_ir_html_paths()
+            return node.srs, "SR"
+        if level == "SR":
+            node.plan_sr_html_paths()
+            return node.ars, "AR"
+        node.plan_ar_html_paths()
+        return [], None
+
+    def _on_node_loaded(self, executor: ThreadPoolExecutor, pending: dict, node, level: str):
+        """节点加载成功后规划其HTML文件路径，并立即提交其子节点"""
+        children, child_level = self._plan_node(node, level)
+        if child_level:
+            self._submit(executor, pending, children, child_level)
+
+
+class AsyncHierarchyLoader(HierarchyLoader):
+    """需求层级加载器的异步版本 - 在一个事件循环中为每个节点（批量模式下每组节点）创建协程
+
+    加载流程与HierarchyLoader相同（节点加载完成后立即加载其子节点），请求经async_rest_client发出：
+    整棵树的请求都可以同时排队，每个接口在途的请求数由ASYNC_CONCURRENCY_PER_ENDPOINT限制，
+    不再受LOADER_MAX_WORKERS个加载线程的限制。
+    """
+    def load(self) -> bool:
+        """加载整棵需求树，完成后按req_id排序整个层级"""
+        if not self.sf.irs:
+            print(f"SF {self.sf.title} 没有IR需要更新")
+            return True
+
+        print(f"开始异步加载SF '{self.sf.title}' 的IR/SR/AR详情"
+              f"（每个接口最多 {config.ASYNC_CONCURRENCY_PER_ENDPOINT} 个在途请求）...")
+        start_time = time.time()
+        asyncio.run(self._load_level(self.sf.irs, "IR"))
+        self._report(start_time)
+        return self.success["IR"] > 0
+
+    async def _load_level(self, nodes: list, level: str):
+        """并发加载一组同层级节点（批量模式下每batch_size个节点一个协程）"""
+        self.total[level] += len(nodes)
+        step = self.batch_size if self.batch_size > 1 else 1
+        await asyncio.gather(*(self._load_nodes_async(nodes[start:start + step], level)
+                               for start in range(0, len(nodes), step)))
+
+    async def _load_nodes_async(self, nodes: list, level: str):
+        """加载节点详情（同时解析children创建子节点），然后加载加载成功的节点的子节点"""
+        if len(nodes) > 1:
+            results = await async_load_detail_batch(nodes, level)
+        else:
+            results = [await async_load_detail(node, level) for node in nodes]
+
+        children_loads = []
+        for node, loaded in zip(nodes, results):
+            if not loaded:
+                self.failed[level].append(node.id)
+                continue
+            self.success[level] += 1
+            children, child_level = self._plan_node(node, level)
+            if child_level:
+                children_loads.append(self._load_level(children, child_level))
+        await asyncio.gather(*children_loads)
+
+
+def create_hierarchy_loader(sf, max_workers: int = None, batch_size: int = None,
+                            loader: str = None) -> HierarchyLoader:
+    """按加载方式（默认config.HIERARCHY_LOADER）创建需求层级加载器"""
+    loader = loader or config.HIERARCHY_LOADER
+    if loader not in LOADERS:
+        raise ValueError(f"未知的加载方式: {loader}，可选: {', '.join(LOADERS)}")
+    loader_class = AsyncHierarchyLoader if loader == LOADER_ASYNC else HierarchyLoader
+    return loader_class(sf, max_workers, batch_size)
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+from config import config
+
+FIXTURE_VERSION = 1
+
+# 可以指向本地回放服务的URL配置项
+URL_CONFIG_NAMES = ["IAM_URL", "IPD_TREE_URL", "IPD_LIST_URL", "IPD_DETAIL_URL", "TC_DETAIL_URL", "TC_ALL_URL"]
+
+
+def make_fixture_key(method: str, path: str, query: Dict[str, Any] = None, body: Any = None) -> str:
+    """
+    计算请求的回放键（只使用路径，不含协议和主机名，回放服务可以运行在任意地址）
+
+    query和body先规范化（参数值统一为字符串，JSON按键排序），
+    保证录制端的params字典和服务端解析出的查询字符串得到相同的键。
+    """
+    query_items = sorted((str(k), str(v)) for k, v in (query or {}).items())
+    body_text = json.dumps(body, sort_keys=True, ensure_ascii=False) if body is not None else ""
+    return json.dumps([method.upper(), path, query_items, body_text], ensure_ascii=False)
+
+
+class FixtureRecorder:
+    """请求录制器 - 记录_send_request的真实请求和响应，保存为回放文件（线程安全）"""
+    def __init__(self, path: str):
+        self.path = path
+        self.exchanges: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, params: Dict[str, Any], data: Any, status: int, body: Any):
+        """记录一次请求（同一个请求多次出现时保留最后一次）"""
+        path = urlsplit(url).path
+        key = make_fixture_key(method, path, params, data)
+        exchange = {
+            "method": method.upper(),
+            "path": path,
+            "params": {str(k): str(v) for k, v in (params or {}).items()},
+            "body": data,
+            "status": status,
+            "response": body
+        }
+        with self._lock:
+            self.exchanges[key] = exchange
+
+    def save(self) -> int:
+        """保存回放文件，返回记录的请求数"""
+        with self._lock:
+            exchanges = list(self.exchanges.values())
+        fixture = {
+            "version": FIXTURE_VERSION,
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "exchanges": exchanges
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"已保存请求回放文件: {self.path}（{len(exchanges)} 个请求）")
+        return len(exchanges)
+
+
+def load_fixture(path: str) -> Dict[str, dict]:
+    """读取回放文件，返回 回放键 -> 请求记录"""
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"回放文件版本不匹配: {fixture.get('version')}，当前版本: {FIXTURE_VERSION}")
+    return {
+        make_fixture_key(item["method"], item["path"], item.get("params"), item.get("body")): item
+        for item in fixture.get("exchanges", [])
+    }
+
+
+class FixtureServer:
+    """本地回放服务 - 用录制的请求替代CodeArts接口，可注入延迟、抖动、错误和token过期
+
+    Args:
+        exchanges: load_fixture返回的回放记录
+        latency: 每个请求的固定延迟（秒）
+        jitter: 在固定延迟上叠加的随机延迟上限（秒）
+        error_rate: 随机返回503的比例（0~1）
+        token_ttl: token有效期（秒），大于0时未签发或已过期的token返回401，0表示不校验token
+        seed: 随机数种子，用于复现同样的延迟和错误序列
+    """
+    def __init__(self, exchanges: Dict[str, dict], host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 token_ttl: float = 0.0, seed: Optional[int] = None):
+        self.exchanges = exchanges
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.iam_path = urlsplit(config.IAM_URL).path
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "errors_injected": 0, "unauthorized": 0, "tokens_issued": 0}
+        self._tokens: Dict[str, float] = {}  # token -> 签发时间
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """在后台线程中启动服务，返回服务地址"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        """在当前线程中运行服务（命令行模式）"""
+        self.httpd.serve_forever()
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _next_random(self) -> Tuple[float, float]:
+        """取出本次请求的抖动和错误判定随机数（random.Random不是线程安全的）"""
+        with self._lock:
+            return self._random.random(), self._random.random()
+
+    def _issue_token(self) -> str:
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens[token] = time.time()
+            self.stats["tokens_issued"] += 1
+        return token
+
+    def _token_valid(self, token: Optional[str]) -> bool:
+        if self.token_ttl <= 0:
+            return True
+        with self._lock:
+            issued_at = self._tokens.get(token or "")
+        return issued_at is not None and time.time() - issued_at <= self.token_ttl
+
+    def handle(self, method: str, raw_path: str, headers, body_bytes: bytes) -> Tuple[int, Dict[str, str], Any]:
+        """处理一个请求，返回(状态码, 响应头, 响应体)"""
+        self._count("requests")
+        jitter_rand, error_rand = self._next_random()
+        delay = self.latency + self.jitter * jitter_rand
+        if delay > 0:
+            time.sleep(delay)
+
+        parts = urlsplit(raw_path)
+        if method == "POST" and parts.path == self.iam_path:
+            return 201, {"X-Subject-Token": self._issue_token()}, {"token": {}}
+
+        if error_rand < self.error_rate:
+            self._count("errors_injected")
+            return 503, {}, {"error": "injected error"}
+
+        if not self._token_valid(headers.get("X-Auth-Token")):
+            self._count("unauthorized")
+            return 401, {}, {"error": "token expired"}
+
+        try:
+            body = json.loads(body_bytes) if body_bytes else None
+        except ValueError:
+            return 400, {}, {"error": "invalid json body"}
+
+        key = make_fixture_key(method, parts.path, dict(parse_qsl(parts.query, keep_blank_values=True)), body)
+        exchange = self.exchanges.get(key)
+        if exchange is None:
+            self._count("misses")
+            return 404, {}, {"error": "fixture not found", "method": method, "path": parts.path}
+
+        self._count("hits")
+        return exchange.get("status", 200), {}, exchange.get("response")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 支持keep-alive，与客户端连接池配合
+
+            def _dispatch(self, method: str):
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                body_bytes = self.rfile.read(length) if length else b""
+                status, headers, body = server.handle(method, self.path, self.headers, body_bytes)
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def log_message(self, format, *args):
+                pass  # 不输出每个请求的访问日志
+
+        return Handler
+
+
+def point_config_at(base_url: str):
+    """把IAM_URL、IPD_*_URL和TC_*_URL的协议和主机替换为base_url（保留原路径，与回放键一致）"""
+    base = urlsplit(base_url)
+    for name in URL_CONFIG_NAMES:
+        parts = urlsplit(getattr(config, name))
+        setattr(config, name, parts._replace(scheme=base.scheme, netloc=base.netloc).geturl())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用录制的请求回放CodeArts接口的本地服务")
+    parser.add_argument("fixture", help="录制的回放文件（main.py --record-fixture 生成）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回503的比例（0~1）")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="token有效期（秒），0表示不校验token")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    args = parser.parse_args(argv)
+
+    exchanges = load_fixture(args.fixture)
+    server = FixtureServer(exchanges, args.host, args.port, args.latency, args.jitter,
+                           args.error_rate, args.token_ttl, args.seed)
+    print(f"回放服务已启动: {server.base_url}（{len(exchanges)} 个请求）")
+    print(f"使用方法: python main.py --api-base {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"回放统计: {server.stats}")
+
+if __name__ == "__main__":
+    main()
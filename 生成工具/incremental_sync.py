@@ -0,0 +1,424 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from config import config
+from batch_loader import extract_issues
+from output_writer import build_manifest, content_hash
+from precompress import COMPRESSORS
+from hierarchy_loader import LOADER_ASYNC
+from rest_client import (api_post_issue_list_by_ids, api_get_ir_detail_by_id, api_get_sr_detail_by_id,
+                         api_get_ar_detail_by_id)
+from async_rest_client import (async_api_post_issue_list_by_ids, async_api_get_ir_detail_by_id,
+                               async_api_get_sr_detail_by_id, async_api_get_ar_detail_by_id)
+
+# 各层级的详情接口
+_DETAIL_APIS = {
+    "IR": api_get_ir_detail_by_id,
+    "SR": api_get_sr_detail_by_id,
+    "AR": api_get_ar_detail_by_id,
+}
+_ASYNC_DETAIL_APIS = {
+    "IR": async_api_get_ir_detail_by_id,
+    "SR": async_api_get_sr_detail_by_id,
+    "AR": async_api_get_ar_detail_by_id,
+}
+
+STATE_VERSION = 1
+
+
+class IncrementalSync:
+    """增量同步 - 根据服务端修改时间只重新获取有变化的需求，并计算需要重新生成的HTML
+
+    上次同步的状态（每个需求的修改时间和原始详情数据）保存在config.SYNC_STATE_FILE中：
+    修改时间未变的需求直接用保存的详情数据重建，修改时间变化或新增的需求重新获取详情。
+    探测修改时间和重新获取详情绕过磁盘响应缓存（read_through下也请求网络），因此不能在offline模式下使用。
+    children/feature2ir列表的变化（新增、删除子需求）会使父需求被重新生成。
+    """
+    LEVELS = ["IR", "SR", "AR"]
+
+    def __init__(self, sf, state_file: str = None, max_workers: int = None, batch_size: int = None):
+        self.sf = sf
+        self.state_file = state_file or config.SYNC_STATE_FILE
+        self.max_workers = max_workers or config.LOADER_MAX_WORKERS
+        self.batch_size = batch_size or config.BATCH_QUERY_SIZE
+        self.old_state = self._load_state()
+        self.new_issues: Dict[str, dict] = {}
+        self.changed_ids: Set[str] = set()  # 修改时间变化或新增的需求
+        self.membership_changed_ids: Set[str] = set()  # 子需求列表有变化的需求
+        self.removed_ids: Set[str] = set()
+        self.probed_children: Dict[str, List[str]] = {}  # 批量查询返回的子需求列表
+        self.reused_count = 0
+        self.fetched_count = 0
+
+    def _load_state(self) -> dict:
+        """读取上次同步的状态"""
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("version") != STATE_VERSION:
+                print(f"同步状态文件版本不匹配，执行全量同步: {self.state_file}")
+                return {}
+            return state
+        except Exception as e:
+            print(f"读取同步状态文件失败，执行全量同步: {e}")
+            return {}
+
+    @property
+    def is_full_sync(self) -> bool:
+        """没有可用的同步状态时为全量同步"""
+        return not self.old_state
+
+    def load(self) -> bool:
+        """增量加载SF下的整棵需求树"""
+        start_time = time.time()
+        print(f"开始{'全量' if self.is_full_sync else '增量'}同步SF '{self.sf.title}' 的需求树...")
+
+        old_issues = self.old_state.get("issues", {})
+        old_sf = self.old_state.get("sf", {})
+        if old_sf.get("children") is not None and old_sf.get("children") != self._children_ids(self.sf.irs):
+            self.membership_changed_ids.add(self.sf.id)
+
+        nodes = list(self.sf.irs)
+        for level in self.LEVELS:
+            if not nodes:
+                break
+            self._sync_level(nodes, level, old_issues)
+            nodes = [child for node in nodes for child in self._children_of(node, level)]
+
+        # 上次存在、本次不再出现在树中的需求
+        self.removed_ids = set(old_issues) - set(self.new_issues)
+        if self.removed_ids:
+            print(f"已删除的需求 ({len(self.removed_ids)} 个): {', '.join(sorted(self.removed_ids))}")
+
+        print(f"需求同步完成: 复用 {self.reused_count} 个，重新获取 {self.fetched_count} 个，"
+              f"耗时 {time.time() - start_time:.2f} 秒")
+        self.sf._sort_all_hierarchy_after_ars_updated()
+        return bool(self.new_issues)
+
+    @staticmethod
+    def _children_of(node, level: str) -> list:
+        """获取节点的子节点列表"""
+        if level == "IR":
+            return node.srs
+        if level == "SR":
+            return node.ars
+        return []
+
+    @staticmethod
+    def _children_ids(children: list) -> List[str]:
+        return [child.id for child in children]
+
+    @staticmethod
+    def _get_update_time(issue: dict) -> str:
+        """从需求数据中取出修改时间（config.SYNC_UPDATE_TIME_FIELD），没有时返回空字符串"""
+        value = issue.get(config.SYNC_UPDATE_TIME_FIELD)
+        return str(value) if value else ""
+
+    @staticmethod
+    def _warn_missing_update_times(level: str, missing: int, total: int, source: str):
+        """
+        提示需求数据中缺少修改时间
+
+        缺少修改时间的需求每次同步都会重新获取详情，全部缺少时增量同步实际上退化为全量同步，
+        通常是config.SYNC_UPDATE_TIME_FIELD与接口返回的字段名不一致
+        """
+        if not missing:
+            return
+        if missing == total:
+            print(f"警告: {source}返回的 {total} 个{level}都没有修改时间字段 '{config.SYNC_UPDATE_TIME_FIELD}'，"
+                  f"增量同步无法判断需求是否变化，这些需求每次都会重新获取详情（退化为全量同步），"
+                  f"请检查config.SYNC_UPDATE_TIME_FIELD")
+        else:
+            print(f"警告: {source}返回的 {total} 个{level}中有 {missing} 个没有修改时间字段 "
+                  f"'{config.SYNC_UPDATE_TIME_FIELD}'，这些需求每次都会重新获取详情")
+
+    @staticmethod
+    def _split_children(issue: dict) -> Optional[List[str]]:
+        """需求数据中children字段的子需求id列表，没有该字段时返回None"""
+        if "children" not in issue:
+            return None
+        return [child_id.strip() for child_id in (issue["children"] or "").split(",") if child_id.strip()]
+
+    def _probe_update_times(self, nodes: list, level: str) -> Dict[str, str]:
+        """
+        通过批量查询接口获取一组需求当前的修改时间（只包含返回了修改时间的需求）
+
+        批量查询返回的子需求列表保存在self.probed_children中，用于发现修改时间未变但增删了子需求的需求
+        """
+        update_times = {}
+        returned = 0
+        batches = [[node.id for node in nodes[start:start + self.batch_size]]
+                   for start in range(0, len(nodes), self.batch_size)]
+        for data in self._query_batches(batches, level):
+            for issue in extract_issues(data):
+                returned += 1
+                issue_id = str(issue.get("id", ""))
+                children = self._split_children(issue)
+                if children is not None:
+                    self.probed_children[issue_id] = children
+                update_time = self._get_update_time(issue)
+                if update_time:
+                    update_times[issue_id] = update_time
+
+        if not returned:
+            print(f"警告: 批量查询没有返回任何{level}的修改时间（接口请求失败或无数据），"
+                  f"将重新获取全部 {len(nodes)} 个{level}详情")
+        else:
+            self._warn_missing_update_times(level, returned - len(update_times), returned, "批量查询")
+            if returned < len(nodes):
+                print(f"批量查询未返回 {len(nodes) - returned} 个{level}，将重新获取其详情")
+        return update_times
+
+    def _sync_level(self, nodes: list, level: str, old_issues: Dict[str, dict]):
+        """同步一个层级：未变化的需求复用保存的详情，其余重新获取"""
+        update_times = self._probe_update_times(nodes, level) if old_issues else {}
+
+        to_fetch = []
+        for node in nodes:
+            old = old_issues.get(node.id)
+            update_time = update_times.get(node.id, "")
+            if old and update_time and old.get("updated") == update_time and not self._children_changed(node.id, old):
+                if node._extract_detail_info({"result": [old["detail"]]}):
+                    self._record(node, level, old["detail"], update_time)
+                    self.reused_count += 1
+                    continue
+            to_fetch.append(node)
+
+        details = self._fetch_details(to_fetch, level)
+
+        fetched = missing_update_time = 0
+        for node, detail in zip(to_fetch, details):
+            if detail is None or not node._extract_detail_info({"result": [detail]}):
+                print(f"获取{level} {node.id} 详情失败")
+                continue
+            fetched += 1
+            update_time = self._get_update_time(detail)
+            if not update_time:
+                missing_update_time += 1
+            self._record(node, level, detail, update_time)
+            self.changed_ids.add(node.id)
+            self.fetched_count += 1
+
+            old = old_issues.get(node.id)
+            if old is not None and old.get("children") != self._children_ids(self._children_of(node, level)):
+                self.membership_changed_ids.add(node.id)
+        # 保存的修改时间为空时下次同步无法复用；全量同步没有探测修改时间，由详情数据提前提示
+        if not old_issues:
+            self._warn_missing_update_times(level, missing_update_time, fetched, "详情接口")
+
+        # 规划已加载节点的HTML文件路径
+        for node in nodes:
+            if node.id not in self.new_issues:
+                continue
+            if level == "IR":
+                node.plan_ir_html_paths()
+            elif level == "SR":
+                node.plan_sr_html_paths()
+            else:
+                node.plan_ar_html_paths()
+
+    def _children_changed(self, issue_id: str, old: dict) -> bool:
+        """
+        批量查询返回的子需求列表与保存的详情不同（增删子需求不一定改变父需求的修改时间）
+
+        保存的详情中的children决定复用时创建哪些子需求，不同时需要重新获取详情；批量查询没有返回children时不比较
+        """
+        children = self.probed_children.get(issue_id)
+        return children is not None and children != (self._split_children(old["detail"]) or [])
+
+    @staticmethod
+    def _query_batches(batches: List[List[str]], level: str) -> list:
+        """
+        按id批量查询各组需求，返回各组的查询结果
+
+        修改时间必须取服务端当前值，不读响应缓存；async加载方式下各组并发查询
+        """
+        if config.HIERARCHY_LOADER == LOADER_ASYNC:
+            async def query_all():
+                return await asyncio.gather(*(async_api_post_issue_list_by_ids(ids, level, use_cache=False)
+                                              for ids in batches))
+            return asyncio.run(query_all())
+        return [api_post_issue_list_by_ids(ids, level, use_cache=False) for ids in batches]
+
+    def _fetch_details(self, nodes: list, level: str) -> List[Optional[dict]]:
+        """并发获取一组节点的原始详情（按config.HIERARCHY_LOADER使用线程池或事件循环）"""
+        if config.HIERARCHY_LOADER == LOADER_ASYNC:
+            async def fetch_all():
+                return await asyncio.gather(*(self._fetch_detail_async(node, level) for node in nodes))
+            return asyncio.run(fetch_all())
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda node: self._fetch_detail(node, level), nodes))
+
+    @staticmethod
+    def _first_result(data: Optional[dict]) -> Optional[dict]:
+        result = data.get("result", []) if data else []
+        return result[0] if result else None
+
+    @classmethod
+    def _fetch_detail(cls, node, level: str) -> Optional[dict]:
+        """通过详情接口获取原始详情数据（不读响应缓存，避免取到修改前缓存的详情）"""
+        try:
+            data = _DETAIL_APIS[level](node.id, use_cache=False)
+        except Exception as e:
+            print(f"获取{level} {node.id} 详情出错: {e}")
+            return None
+        return cls._first_result(data)
+
+    @classmethod
+    async def _fetch_detail_async(cls, node, level: str) -> Optional[dict]:
+        """_fetch_detail的异步版本"""
+        try:
+            data = await _ASYNC_DETAIL_APIS[level](node.id, use_cache=False)
+        except Exception as e:
+            print(f"获取{level} {node.id} 详情出错: {e}")
+            return None
+        return cls._first_result(data)
+
+    def _record(self, node, level: str, detail: dict, update_time: str):
+        """记录节点本次同步的状态"""
+        self.new_issues[node.id] = {
+            "level": level,
+            "updated": update_time,
+            "children": self._children_ids(self._children_of(node, level)),
+            "detail": detail
+        }
+
+    @staticmethod
+    def _test_case_signature(ar) -> List[List[str]]:
+        """AR关联测试用例的签名（用于判断AR及其测试用例页面是否需要重新生成）"""
+        signature = []
+        for test_case in ar.test_cases:
+            detail = test_case.test_case_detail
+            content = "\n".join([test_case.status, test_case.execution_type, test_case.test_type, detail.creator,
+                                 detail.preparation, detail.test_step, detail.expect_result, detail.description])
+            signature.append([test_case.number, test_case.name, content_hash(content)[:16]])
+        return sorted(signature)
+
+    @staticmethod
+    def _output_missing(node) -> bool:
+        """节点的HTML文件不存在或为空（例如标题变化导致输出路径变化）"""
+        html_file = getattr(node, "html_file", "")
+        return not html_file or not os.path.exists(html_file) or os.path.getsize(html_file) == 0
+
+    def compute_targets(self) -> Optional[Set[str]]:
+        """
+        计算需要重新生成HTML的节点id集合，全量同步时返回None（全部生成）
+
+        应在测试用例加载完成后调用，以便检测AR关联测试用例的变化。
+        """
+        if self.is_full_sync:
+            return None
+
+        old_test_cases = self.old_state.get("test_cases", {})
+        dirty = set(self.changed_ids) | set(self.membership_changed_ids)
+
+        for ir in self.sf.irs:
+            for sr in ir.srs:
+                for ar in sr.ars:
+                    if old_test_cases.get(ar.id) != self._test_case_signature(ar) \
+                            or any(self._output_missing(test_case) for test_case in ar.test_cases):
+                        dirty.add(ar.id)
+                    if ar.id in dirty or self._output_missing(ar):
+                        dirty.update([ar.id, sr.id])
+                if sr.id in dirty or self._output_missing(sr):
+                    dirty.update([sr.id, ir.id])
+            if ir.id in dirty or self._output_missing(ir):
+                dirty.update([ir.id, self.sf.id])
+
+        # 导航页包含整棵树，任何变化都需要重新生成SF级页面
+        if dirty or self.removed_ids or self._output_missing(self.sf):
+            dirty.add(self.sf.id)
+
+        print(f"需要重新生成HTML的需求: {len(dirty)} 个")
+        return dirty
+
+    def _tree_nodes(self) -> list:
+        """当前需求树中的所有IR、SR、AR"""
+        return [node for ir in self.sf.irs for node in [ir] + [node for sr in ir.srs for node in [sr] + sr.ars]]
+
+    def _output_files(self) -> Dict[str, List[str]]:
+        """
+        本次同步成功加载的节点生成的页面文件 {需求id: 文件列表}（AR包括其关联测试用例的页面）
+
+        加载失败的节点没有规划页面路径，沿用上次保存的记录，以免其页面被当作已删除
+        """
+        old_outputs = self.old_state.get("outputs", {})
+        outputs = {}
+        for node in self._tree_nodes():
+            if node.id in self.new_issues:
+                files = node.output_files() + [test_case.html_file for test_case in getattr(node, "test_cases", [])
+                                               if test_case.html_file]
+                outputs[node.id] = files
+            elif node.id in old_outputs:
+                outputs[node.id] = old_outputs[node.id]
+        return outputs
+
+    def remove_orphaned_outputs(self):
+        """
+        删除已删除需求的页面：节点页面、子记录页面、需求表和测试用例页面，以及它们的预压缩文件
+
+        页面路径取自上次保存的同步状态，本次生成的文件（如新需求恰好使用了相同路径）不删除；
+        删除的文件从构建清单中移除，清空的目录一并删除。应在本次页面生成之后调用。
+        """
+        old_outputs = self.old_state.get("outputs", {})
+        tree_ids = {node.id for node in self._tree_nodes()}
+        removed_ids = [node_id for node_id in self.removed_ids if node_id not in tree_ids and node_id in old_outputs]
+        if not removed_ids:
+            return
+
+        current = {file for files in self._output_files().values() for file in files}
+        removed_files = 0
+        directories = set()
+        for node_id in removed_ids:
+            for html_file in old_outputs[node_id]:
+                if html_file in current:
+                    continue
+                for path in [html_file] + [f"{html_file}.{ext}" for ext in COMPRESSORS]:
+                    if os.path.exists(path):
+                        os.remove(path)
+                        removed_files += 1
+                    build_manifest.remove(path)
+                directories.add(os.path.dirname(html_file))
+        self._remove_empty_dirs(directories)
+        build_manifest.save()
+        print(f"已删除需求的页面: 删除 {removed_files} 个文件（{len(removed_ids)} 个需求）")
+
+    @staticmethod
+    def _remove_empty_dirs(directories: Set[str]):
+        """删除清空的需求目录（逐级向上，不超出需求目录）"""
+        root = os.path.abspath(os.path.join(config.BASE_DIR_NAME, config.REQ_DIR_NAME))
+        for directory in sorted(directories, key=len, reverse=True):
+            directory = os.path.abspath(directory)
+            while directory.startswith(root + os.sep) and os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+                directory = os.path.dirname(directory)
+
+    def save_state(self):
+        """保存本次同步的状态，供下次增量同步使用"""
+        test_cases = {}
+        for ir in self.sf.irs:
+            for sr in ir.srs:
+                for ar in sr.ars:
+                    test_cases[ar.id] = self._test_case_signature(ar)
+
+        state = {
+            "version": STATE_VERSION,
+            "synced_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "sf": {"id": self.sf.id, "children": self._children_ids(self.sf.irs)},
+            "issues": self.new_issues,
+            "test_cases": test_cases,
+            "outputs": self._output_files()
+        }
+        try:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+            print(f"已保存同步状态: {self.state_file}")
+        except Exception as e:
+            print(f"保存同步状态失败: {e}")
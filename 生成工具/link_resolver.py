@@ -0,0 +1,103 @@
+import os
+from typing import Dict, List, Tuple
+
+
+class LinkResolver:
+    """
+    页面间相对链接的解析器 - 计算结果与os.path.relpath一致，但只对每个路径和每对目录计算一次
+
+    每个出现过的目录分配一个路径id并记录其深度和各级目录名，每个页面记录(所在目录id, 文件名)；
+    两个目录之间的相对前缀（如 ../../IR标题/SR标题/）按(起始目录id, 目标目录id)缓存。
+    一次渲染中同一目录下的页面互相链接的组合很少，之后的查询只是几次字典查找和一次字符串拼接。
+    """
+    def __init__(self):
+        self._dir_ids: Dict[str, int] = {}  # 绝对目录路径 -> 路径id
+        self._dir_paths: List[str] = []  # 路径id -> 绝对目录路径
+        self._dir_parts: List[Tuple[str, ...]] = []  # 路径id -> (盘符, 各级目录名...)，长度即深度
+        self._dir_keys: List[Tuple[str, ...]] = []  # 路径id -> 用于比较的各级目录名（Windows下不区分大小写）
+        self._pages: Dict[str, Tuple[int, str, bool]] = {}  # 目标路径 -> (所在目录id, 文件名, 是否有扩展名)
+        self._starts: Dict[str, int] = {}  # 源路径 -> 起始目录id
+        self._prefixes: Dict[Tuple[int, int], str] = {}  # (起始目录id, 目标目录id) -> 相对前缀
+        self.calls = 0
+
+    def _dir_id(self, directory: str) -> int:
+        """获取目录的路径id（首次出现时分配）"""
+        directory = os.path.abspath(directory)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self._dir_parts)
+            self._dir_ids[directory] = dir_id
+            drive, rest = os.path.splitdrive(directory)
+            parts = (drive,) + tuple(part for part in rest.split(os.sep) if part)
+            self._dir_paths.append(directory)
+            self._dir_parts.append(parts)
+            self._dir_keys.append(tuple(os.path.normcase(part) for part in parts))
+        return dir_id
+
+    def _start_id(self, from_path: str) -> int:
+        """源路径的起始目录：有扩展名时视为文件，取其所在目录"""
+        start_id = self._starts.get(from_path)
+        if start_id is None:
+            start_dir = os.path.dirname(from_path) if os.path.splitext(from_path)[1] else from_path
+            start_id = self._dir_id(start_dir or '.')
+            self._starts[from_path] = start_id
+        return start_id
+
+    def _page(self, to_path: str) -> Tuple[int, str, bool]:
+        """目标路径所在的目录id和文件名"""
+        page = self._pages.get(to_path)
+        if page is None:
+            abs_path = os.path.abspath(to_path)
+            name = os.path.basename(abs_path)
+            page = (self._dir_id(os.path.dirname(abs_path)), name, bool(os.path.splitext(name)[1]))
+            self._pages[to_path] = page
+        return page
+
+    def _prefix(self, start_id: int, target_id: int) -> str:
+        """计算从起始目录到目标目录的相对前缀（以/结尾，同一目录为空字符串）"""
+        start_keys = self._dir_keys[start_id]
+        target_keys = self._dir_keys[target_id]
+        if start_keys[0] != target_keys[0]:
+            raise ValueError(f"路径在不同的驱动器上: {self._dir_paths[start_id]} / {self._dir_paths[target_id]}")
+        common = 0
+        for start_key, target_key in zip(start_keys, target_keys):
+            if start_key != target_key:
+                break
+            common += 1
+        parts = [".."] * (len(start_keys) - common) + list(self._dir_parts[target_id][common:])
+        return "".join(part + "/" for part in parts)
+
+    def relative(self, from_path: str, to_path: str) -> str:
+        """计算从from_path所在页面链接到to_path的相对路径（使用/分隔）"""
+        self.calls += 1
+        start_id = self._start_id(from_path)
+        target_id, name, is_page = self._page(to_path)
+        if not is_page:
+            # 目标可能是起始目录本身或其上级目录，这种情况交给relpath处理
+            start_keys = self._dir_keys[start_id]
+            target_keys = self._dir_keys[target_id] + ((os.path.normcase(name),) if name else ())
+            if start_keys[:len(target_keys)] == target_keys:
+                return os.path.relpath(to_path, start=self._dir_paths[start_id]).replace('\\', '/')
+        key = (start_id, target_id)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            prefix = self._prefix(start_id, target_id)
+            self._prefixes[key] = prefix
+        return prefix + name
+
+    def stats(self) -> dict:
+        """解析统计：调用次数、已登记的目录和页面数、缓存的目录对数"""
+        return {
+            "calls": self.calls,
+            "dirs": len(self._dir_parts),
+            "pages": len(self._pages),
+            "dir_pairs": len(self._prefixes)
+        }
+
+    def clear(self):
+        """清空所有缓存（输出目录或工作目录变化时调用）"""
+        self.__init__()
+
+
+# 全局链接解析器实例
+link_resolver = LinkResolver()
@@ -1,6 +1,26 @@
+import argparse
+import time
 from config import config
-from models import SF, IR, SR, AR,TestCaseDetail,TestCase,TestSuite
-from rest_client import api_get_tc_detail_by_number, api_post_all_tc_with_limit, api_get_sf_detail_by_id,api_post_sf_by_keyword,api_get_ir_detail_by_id,api_post_ir_list_by_id,api_get_sr_detail_by_id,api_post_sr_list_by_id,api_get_ar_detail_by_id
+from response_cache import CACHE_MODES, CACHE_MODE_OFFLINE
+from incremental_sync import IncrementalSync
+from snapshot import save_snapshot, load_snapshot
+from http_fixture import FixtureRecorder, point_config_at
+from template_engine import template_engine
+from render_scheduler import EXECUTORS
+from hierarchy_loader import LOADERS
+from link_resolver import link_resolver
+from models import SF, IR, SR, AR,TestCaseDetail,TestCase,TestSuite, NAVIGATION_MODES, data_registry
+from columnar_store import ColumnarStore, LEVEL_IR, LEVEL_AR
+from rest_client import set_fixture_recorder, get_connection_stats, get_response_cache, api_get_tc_detail_by_number, api_post_all_tc_with_limit, api_get_sf_detail_by_id,api_post_sf_by_keyword,api_get_ir_detail_by_id,api_post_ir_list_by_id,api_get_sr_detail_by_id,api_post_sr_list_by_id,api_get_ar_detail_by_id
+
+def print_workload_summary(columns: ColumnarStore):
+    """按IR打印AR的计划/实际工时合计和AR状态分布（在列存储上计算）"""
+    workload = columns.sum_by("workload", LEVEL_IR)
+    act_workload = columns.sum_by("act_workload", LEVEL_IR)
+    print(f"  AR状态分布: " + "，".join(f"{status} {count}" for status, count in columns.status_counts(LEVEL_AR).items()))
+    print(f"  各IR下AR工时（计划/实际，人天）:")
+    for req_id, total in workload.items():
+        print(f"    {req_id}: {total:.1f} / {act_workload[req_id]:.1f}")
 
 def print_test_cases_summary(test_suite: TestSuite):
     """打印测试用例摘要"""
@@ -66,7 +86,79 @@ def print_hierarchical_data(sf):
                 print(f"\n      [AR层级] {ar.number} - {ar.title}")
                 ar.print_info()
 
-def main():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="从需求管理和测试计划接口生成需求追溯HTML")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default=config.CACHE_MODE,
+                        help="磁盘响应缓存模式（offline表示只从缓存读取，不访问网络）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量同步：只重新获取修改时间变化的需求，只重新生成受影响的HTML（探测和重新获取不读响应缓存）")
+    parser.add_argument("--loader", choices=LOADERS, default=config.HIERARCHY_LOADER,
+                        help="需求层级加载方式（thread线程池，async事件循环，每个接口最多ASYNC_CONCURRENCY_PER_ENDPOINT个在途请求）")
+    parser.add_argument("--save-snapshot", metavar="PATH",
+                        help="数据加载完成后把需求树和测试用例保存为快照文件")
+    parser.add_argument("--from-snapshot", metavar="PATH",
+                        help="不访问接口，直接从快照文件生成HTML")
+    parser.add_argument("--record-fixture", metavar="PATH",
+                        help="把所有接口请求和响应录制到回放文件（供http_fixture.py回放）")
+    parser.add_argument("--api-base", metavar="URL",
+                        help="把IAM/IPD/TC接口地址指向其他服务（例如本地回放服务 http://127.0.0.1:8765）")
+    parser.add_argument("--render-executor", choices=EXECUTORS, default=config.RENDER_EXECUTOR,
+                        help="页面渲染执行方式（进程池/线程池/串行）")
+    parser.add_argument("--render-workers", type=int, default=config.RENDER_WORKERS,
+                        help="渲染工作进程/线程数（0表示CPU核数）")
+    parser.add_argument("--render-timing", metavar="PATH",
+                        help="把每个页面的渲染耗时保存为CSV")
+    parser.add_argument("--navigation-mode", choices=NAVIGATION_MODES, default=config.NAVIGATION_MODE,
+                        help="需求导航输出方式（inline整棵树写入页面，lazy按IR分块在展开时加载）")
+    parser.add_argument("--precompress", metavar="FORMATS", default=config.PRECOMPRESS,
+                        help="为生成的文件写出预压缩文件，逗号分隔的格式：gz,br（br需要安装brotli）")
+    parser.add_argument("--force-write", action="store_true",
+                        help="忽略构建清单，重写所有页面（默认跳过内容未变化的文件）")
+    args = parser.parse_args(argv)
+    if args.incremental and args.cache_mode == CACHE_MODE_OFFLINE:
+        parser.error("--incremental需要访问接口探测修改时间，不能与--cache-mode offline同时使用")
+    return args
+
+def generate_html(sf: SF, args, targets=None):
+    """并发生成所有（或targets中的）页面，按需保存渲染耗时"""
+    scheduler = sf.generate_all_html(targets, args.render_executor, args.render_workers)
+    link_stats = link_resolver.stats()
+    print(f"相对链接解析: {link_stats['calls']} 次，页面 {link_stats['pages']} 个，"
+          f"目录 {link_stats['dirs']} 个，计算的目录对 {link_stats['dir_pairs']} 个")
+    if args.render_timing:
+        scheduler.save_timings(args.render_timing)
+
+def render_from_snapshot(path: str, args):
+    """从快照文件直接生成HTML"""
+    start_time = time.time()
+    sf, test_suite = load_snapshot(path)
+    generate_html(sf, args)
+    print(f"\n从快照生成HTML完成，总耗时 {time.time() - start_time:.2f} 秒")
+
+def main(argv=None):
+    args = parse_args(argv)
+    config.CACHE_MODE = args.cache_mode
+    config.HIERARCHY_LOADER = args.loader
+    config.NAVIGATION_MODE = args.navigation_mode
+    config.PRECOMPRESS = args.precompress
+    if args.force_write:
+        config.SKIP_UNCHANGED_WRITES = False
+
+    # 启动时加载并编译所有页面模板（命中磁盘缓存时直接读取编译结果）
+    template_engine.preload()
+
+    if args.from_snapshot:
+        render_from_snapshot(args.from_snapshot, args)
+        return
+
+    if args.api_base:
+        point_config_at(args.api_base)
+    recorder = None
+    if args.record_fixture:
+        recorder = FixtureRecorder(args.record_fixture)
+        set_fixture_recorder(recorder)
+
     # 创建空的SF实例
     sf = SF()
     
@@ -82,37 +174,30 @@ def main():
     print(f"\n? SF基本信息加载成功")
     print(f"  SF标题: {sf.title} ({sf.number})")
     
-    # 更新SF的所有IR的详细信息
+    # 并发更新SF下所有IR、SR、AR的详细信息
     print("\n" + "="*80)
-    print("开始更新所有IR的详细信息...")
+    print("开始更新所有IR、SR、AR的详细信息...")
     print("="*80)
-    sf.update_all_irs()
-    
-    # 更新所有SR的详细信息
-    print("\n" + "="*80)
-    print("开始更新所有SR的详细信息...")
-    print("="*80)
-    sf.update_all_srs()
-    
-    # 更新所有AR的详细信息
-    print("\n" + "="*80)
-    print("开始更新所有AR的详细信息...")
-    print("="*80)
-    sf.update_all_ars()
+    sync = None
+    if args.incremental:
+        sync = IncrementalSync(sf)
+        sync.load()
+    else:
+        sf.update_all_hierarchy()
     
     # 统计信息
     print("\n" + "="*80)
     print("数据加载完成，统计信息:")
     print("="*80)
     
-    total_irs = len(sf.irs)
-    total_srs = sum(len(ir.srs) for ir in sf.irs)
-    total_ars = sum(len(sr.ars) for sr in [sr for ir in sf.irs for sr in ir.srs])
+    columns = data_registry.build_columns(sf)
+    level_counts = columns.level_counts()
     
     print(f"SF: {sf.title}")
-    print(f"  总IR数量: {total_irs}")
-    print(f"  总SR数量: {total_srs}")
-    print(f"  总AR数量: {total_ars}")
+    print(f"  总IR数量: {level_counts['IR']}")
+    print(f"  总SR数量: {level_counts['SR']}")
+    print(f"  总AR数量: {level_counts['AR']}")
+    print_workload_summary(columns)
     
     # 按层级打印数据
     #print_hierarchical_data(sf)
@@ -125,19 +210,39 @@ def main():
     # 创建测试套件
     test_suite = TestSuite(html_file="test_report.html")
     
-    # 分批获取所有测试用例
-    if test_suite.load_all_test_cases(batch_size=100):
+    # 分批获取所有测试用例（分页大小按服务端上限自动调整）
+    if test_suite.load_all_test_cases(batch_size=None):
         print("\n✓ 测试用例获取成功")
         
         # 打印测试用例摘要
         print("\n 开始对测试用例列表进行排序")
         test_suite.sort_test_cases_by_number()
-        print_test_cases_summary(test_suite)        
+        print_test_cases_summary(test_suite)
+        # 加入测试用例重新构建列存储，测试用例状态分布在列上统计
+        test_suite.print_summary(data_registry.build_columns(sf, test_suite.test_cases))
         
     else:
         print("\n✗ 测试用例获取失败")
 
-    sf.generate_all_html()    
+    if args.save_snapshot:
+        save_snapshot(args.save_snapshot, sf, test_suite)
+
+    # 增量模式下只重新生成受影响的页面
+    targets = sync.compute_targets() if sync else None
+    generate_html(sf, args, targets)
+    if sync:
+        sync.remove_orphaned_outputs()
+        sync.save_state()
+
+    if recorder:
+        recorder.save()
+
+    # 连接复用统计
+    stats = get_connection_stats()
+    print(f"\nHTTP请求数: {stats['requests']}，新建连接数: {stats['new_connections']}，复用连接数: {stats['reused_connections']}")
+    if config.CACHE_MODE != "off":
+        cache_stats = get_response_cache().get_stats()
+        print(f"响应缓存命中: {cache_stats['hits']}，未命中: {cache_stats['misses']}，写入: {cache_stats['writes']}，淘汰: {cache_stats['evictions']}")
     print("\n程序执行完成！")
 if __name__ == "__main__":
     main()
\ No newline at end of file
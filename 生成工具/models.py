@@ -1,11 +1,54 @@
 import time
 import os
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from typing import List, Optional, Union, Dict
 from config import config, calculate_relative_path
+from hierarchy_loader import create_hierarchy_loader
+from rate_limiter import TokenBucket
+from theme import stylesheet_link
+from render_scheduler import RenderJob, RenderScheduler, render_now
+from output_writer import build_manifest
+from precompress import COMPRESSORS
+from search_index import build_search_jobs
+from columnar_store import ColumnarStore, LEVEL_TC
+from registry_index import RegistryIndexes, RegistryQuery
+from req_id_parser import SORT_KEY, UNPARSED_KEY, parse_ar_title, parse_sort_key
 from rest_client import api_get_tc_detail_by_number, api_post_all_tc_with_limit, api_get_sf_detail_by_id, api_post_sf_by_keyword, api_get_ir_detail_by_id, api_post_ir_list_by_id, api_get_sr_detail_by_id, api_post_sr_list_by_id, api_get_ar_detail_by_id
 
 
+# 需求导航的输出方式
+NAVIGATION_INLINE = "inline"  # 整棵IR/SR/AR树写入需求导航页面
+NAVIGATION_LAZY = "lazy"  # 外壳页面 + 每个IR一个数据块，展开节点时加载
+NAVIGATION_MODES = [NAVIGATION_INLINE, NAVIGATION_LAZY]
+NAV_CHUNK_LABEL = "需求导航数据"  # 导航数据块渲染任务的页面类型
+
+# 在大量节点间取值重复的字段（状态、人员、领域、类别、用例类型），加载后驻留为共享的字符串对象
+INTERNED_FIELDS = ("category", "status", "status_value", "creator", "assignee", "domain_value",
+                   "execution_type", "test_type")
+
+
+def intern_fields(obj):
+    """把对象中INTERNED_FIELDS字段的字符串驻留（sys.intern），取值相同的节点共享同一个字符串"""
+    for name in INTERNED_FIELDS:
+        value = getattr(obj, name, None)
+        if type(value) is str and value:
+            setattr(obj, name, sys.intern(value))
+
+
+def _nav_key(level: str, node) -> str:
+    """
+    懒加载需求导航中节点的key（IR的数据块名、URL中#open=保存的展开状态）：层级_需求id
+
+    使用需求id而不是在列表中的位置，需求增删或重新排序后key不变；id中文件名和URL不安全的字符替换为_
+    """
+    return f"{level}_" + re.sub(r"[^0-9A-Za-z_-]", "_", node.id or node.req_id or "")
+
+
 class SF: pass
 class IR: pass
 class SR: pass
@@ -24,22 +67,79 @@ class DataRegistry:
         
         # 测试用例按number作为键
         self.test_case_by_number: Dict[str, TestCase] = {}
+
+        # 二级索引（状态、处理人、领域、创建人、计划日期），注册时维护，供query()使用
+        self.indexes = RegistryIndexes()
+        # 注册、req_id链补全、索引更新与查询互斥：线程池加载和异步请求的回调都在线程中注册，
+        # 临界区只有字典和索引操作，一把可重入锁即可（查询持锁时调用get_all_*）
+        self.lock = threading.RLock()
+
+        # 需求树的列存储（用于统计聚合，build_columns构建）
+        self.columns: Optional[ColumnarStore] = None
+
+    def _is_registered(self, kind: str, node) -> bool:
+        """节点是否仍被某个查找字典引用"""
+        if kind == "IR":
+            return self.ir_by_req_id.get(node.req_id) is node
+        if kind == "SR":
+            return self.sr_by_req_id.get(node.req_id) is node
+        if kind == "AR":
+            return self.ar_by_id.get(node.id) is node or self.ar_by_req_id.get(node.req_id) is node
+        return self.test_case_by_number.get(node.number) is node
+
+    @staticmethod
+    def _sort_key(kind: str, node):
+        """节点的排序键（测试用例按number，需求按req_id）"""
+        return parse_sort_key(node.number if kind == "TC" else node.req_id)
+
+    def _index(self, kind: str, node, sort_key, replaced=()):
+        """
+        设置节点的排序键并（重新）索引，移除被同一键替换、不再注册的旧节点
+
+        调用方持有锁；排序键由调用方在加锁前解析好传入，锁内只做赋值和字典、索引操作
+        """
+        for old in replaced:
+            if old is not None and old is not node and not self._is_registered(kind, old):
+                self.indexes.unindex(old)
+        node.sort_key = sort_key
+        self.indexes.index(kind, node)
     
     def register_ir(self, ir: 'IR'):
         """注册IR（使用req_id）"""
         if ir and ir.req_id:
-            self.ir_by_req_id[ir.req_id] = ir
+            sort_key = parse_sort_key(ir.req_id)
+            with self.lock:
+                self._register_ir(ir, sort_key)
+
+    def _register_ir(self, ir: 'IR', sort_key):
+        replaced = self.ir_by_req_id.get(ir.req_id)
+        self.ir_by_req_id[ir.req_id] = ir
+        self._index("IR", ir, sort_key, (replaced,))
     
     def register_sr(self, sr: 'SR'):
         """注册SR（使用req_id）"""
         if sr and sr.req_id:
-            self.sr_by_req_id[sr.req_id] = sr
+            sort_key = parse_sort_key(sr.req_id)
+            with self.lock:
+                self._register_sr(sr, sort_key)
+
+    def _register_sr(self, sr: 'SR', sort_key):
+        replaced = self.sr_by_req_id.get(sr.req_id)
+        self.sr_by_req_id[sr.req_id] = sr
+        self._index("SR", sr, sort_key, (replaced,))
     
     def register_ar(self, ar: 'AR'):
         """注册AR（同时使用id和req_id）"""
         if not ar:
             return
         
+        sort_key = parse_sort_key(ar.req_id)
+        with self.lock:
+            self._register_ar(ar, sort_key)
+
+    def _register_ar(self, ar: 'AR', sort_key):
+        replaced = (self.ar_by_id.get(ar.id), self.ar_by_req_id.get(ar.req_id))
+
         # 按id注册
         if ar.id:
             self.ar_by_id[ar.id] = ar
@@ -47,11 +147,81 @@ class DataRegistry:
         # 按req_id注册（如果存在）
         if ar.req_id:
             self.ar_by_req_id[ar.req_id] = ar
+
+        if ar.id or ar.req_id:
+            self._index("AR", ar, sort_key, replaced)
+    
+    def register_ar_chain(self, ar: 'AR', ar_req_id: str, sr_req_id: str, ir_req_id: str):
+        """
+        设置AR的req_id并注册，父级SR/IR的req_id为空时补全并注册
+
+        检查父级req_id是否为空与写入在同一次加锁内完成：并发加载同一SR下的多个AR时，
+        只有第一个补全SR/IR的req_id，其余看到已设置的值，不会重复写入或读到一半的状态。
+        三个排序键在加锁前解析，锁内不做字符串解析。
+        """
+        ar_key, sr_key, ir_key = parse_sort_key(ar_req_id), parse_sort_key(sr_req_id), parse_sort_key(ir_req_id)
+        with self.lock:
+            # 1. 更新AR的req_id（直接设置）
+            ar.req_id = ar_req_id
+            self._register_ar(ar, ar_key)
+
+            # 2. 更新父级SR的req_id（如果为空）
+            sr = ar.parent
+            if sr and not sr.req_id:
+                sr.req_id = sr_req_id
+                if sr_req_id:
+                    self._register_sr(sr, sr_key)
+
+                # 3. 更新父级IR的req_id（如果为空）
+                ir = sr.parent
+                if ir and not ir.req_id:
+                    ir.req_id = ir_req_id
+                    if ir_req_id:
+                        self._register_ir(ir, ir_key)
     
     def register_test_case(self, test_case: 'TestCase'):
         """注册测试用例（使用number）"""
         if test_case and test_case.number:
-            self.test_case_by_number[test_case.number] = test_case
+            sort_key = parse_sort_key(test_case.number)
+            with self.lock:
+                replaced = self.test_case_by_number.get(test_case.number)
+                self.test_case_by_number[test_case.number] = test_case
+                self._index("TC", test_case, sort_key, (replaced,))
+
+    def reindex(self, node):
+        """已注册节点的字段（如重新加载详情后的状态、处理人）变化后更新其索引"""
+        with self.lock:
+            kind = self.indexes.kind_of(node)
+            if kind:
+                self.indexes.index(kind, node)
+
+    def rebuild_indexes(self):
+        """按查找字典重建全部二级索引（直接填充字典后调用，如从快照恢复）"""
+        with self.lock:
+            self.indexes = RegistryIndexes()
+            for kind, nodes in (("IR", self.ir_by_req_id.values()), ("SR", self.sr_by_req_id.values()),
+                                ("AR", self.get_all_ar()), ("TC", self.test_case_by_number.values())):
+                # 一次性的批量重建（如从快照恢复），排序键在锁内解析
+                for node in nodes:
+                    self._index(kind, node, self._sort_key(kind, node))
+
+    def nodes_of(self, kind: str) -> list:
+        """某一类型的全部已注册节点"""
+        if kind == "IR":
+            return self.get_all_ir()
+        if kind == "SR":
+            return self.get_all_sr()
+        if kind == "AR":
+            return self.get_all_ar()
+        return self.get_all_test_cases()
+
+    def query(self, kind: str) -> RegistryQuery:
+        """
+        按状态、处理人、领域、创建人、计划日期等条件查询已注册的节点（kind: IR/SR/AR/TC）
+
+        例：data_registry.query("AR").where(assignee="张三").where_range("plan_end_date", end=today).all()
+        """
+        return RegistryQuery(self, kind)
     
     def get_ir(self, req_id: str) -> Optional['IR']:
         """通过req_id获取IR"""
@@ -75,26 +245,39 @@ class DataRegistry:
     
     def get_all_ir(self) -> List['IR']:
         """获取所有IR"""
-        return list(self.ir_by_req_id.values())
+        with self.lock:
+            return list(self.ir_by_req_id.values())
     
     def get_all_sr(self) -> List['SR']:
         """获取所有SR"""
-        return list(self.sr_by_req_id.values())
+        with self.lock:
+            return list(self.sr_by_req_id.values())
     
     def get_all_ar(self) -> List['AR']:
         """获取所有AR（去重，因为有两个字典）"""
         # 使用ar_by_id作为主要来源，因为id是唯一的
-        return list(self.ar_by_id.values())
+        with self.lock:
+            return list(self.ar_by_id.values())
     
     def get_all_test_cases(self) -> List['TestCase']:
         """获取所有测试用例"""
-        return list(self.test_case_by_number.values())
+        with self.lock:
+            return list(self.test_case_by_number.values())
+
+    def build_columns(self, sf: 'SF', test_cases: Optional[List['TestCase']] = None) -> ColumnarStore:
+        """
+        从需求树构建列存储，工时合计、状态分布等统计直接在列上计算，不再遍历节点对象
+
+        列存储是构建时的快照，需求树或测试用例变化后需要重新调用
+        """
+        self.columns = ColumnarStore.from_tree(sf, test_cases)
+        return self.columns
 
 # 全局数据注册表实例
 data_registry = DataRegistry()
 
 
-@dataclass
+@dataclass(slots=True)
 class TestCaseDetail:
     """测试用例详情类"""
     id: str = ""
@@ -153,6 +336,7 @@ class TestCaseDetail:
                 self.related_ar_id = issue_info.get("id", "")
                 self.related_ar_name = issue_info.get("name", "")
             
+            intern_fields(self)
             return True
             
         except Exception as e:
@@ -210,7 +394,7 @@ class TestCaseDetail:
         return [result.strip() for result in results if result.strip()]
 
 
-@dataclass
+@dataclass(slots=True)
 class TestCase:
     """测试用例类"""
     id: str = ""
@@ -225,6 +409,7 @@ class TestCase:
     related_sr_req_id: str = ""
     related_ir_req_id: str = ""
     html_file: str = ""
+    sort_key: tuple = field(default=UNPARSED_KEY, init=False, repr=False, compare=False)  # number的整数元组排序键（注册时计算）
     test_case_detail: TestCaseDetail = field(default_factory=TestCaseDetail)
     
     def __post_init__(self):
@@ -269,23 +454,27 @@ class TestCase:
             if associate_info and associate_info.get("associate") and associate_info.get("tracker_name") == "AR":
                 issue_id = associate_info.get("issue_id", "")
                 if issue_id:
-                    # 通过issue_id在DataRegistry中查找AR
-                    ar = data_registry.get_ar_by_id(issue_id)
-                    if ar:
-                        # 添加到AR的test_cases列表
-                        ar.add_test_case(self)
-                        self.related_ar_req_id = ar.req_id
-                        self.related_ar_name = ar.title
-                        
-                        # 通过AR的parent追溯SR和IR的req_id
-                        if ar.parent:  # SR
-                            self.related_sr_req_id = ar.parent.req_id
+                    # 查找AR、加入其test_cases并读取req_id链在注册表的锁内完成，不会读到正在补全的req_id
+                    with data_registry.lock:
+                        # 通过issue_id在DataRegistry中查找AR
+                        ar = data_registry.get_ar_by_id(issue_id)
+                        if ar:
+                            # 添加到AR的test_cases列表
+                            ar.add_test_case(self)
+                            self.related_ar_req_id = ar.req_id
+                            self.related_ar_name = ar.title
                             
-                            if ar.parent.parent:  # IR
-                                self.related_ir_req_id = ar.parent.parent.req_id
-                    else:
+                            # 通过AR的parent追溯SR和IR的req_id
+                            if ar.parent:  # SR
+                                self.related_sr_req_id = ar.parent.req_id
+                                
+                                if ar.parent.parent:  # IR
+                                    self.related_ir_req_id = ar.parent.parent.req_id
+                    if not ar:
                         print(f"警告: 未找到issue_id为 {issue_id} 的AR")
             
+            intern_fields(self)
+            
             # 在设置完基本信息后，立即加载测试用例详情
             if self.number:
                 # 现在number有值了，注册到DataRegistry
@@ -306,6 +495,58 @@ class TestCase:
         print(f"正在加载测试用例详情: {self.number}")
         return self.test_case_detail.load_detail_by_number(self.number)
 
+    #规划测试用例html文件路径
+    def plan_test_case_html_paths(self, ar: 'AR'):
+        """在所属AR的目录下规划测试用例页面路径（只计算路径，目录和文件在渲染阶段创建）"""
+        if not self.number:
+            print("测试用例number为空，无法规划文件路径")
+            return
+
+        if not ar.html_file:
+            print(f"测试用例 {self.number} 关联的AR html_file未设置")
+            return
+
+        tc_dir = os.path.join(os.path.dirname(ar.html_file), config.TEST_CASE_DIR_NAME)
+        self.html_file = os.path.join(tc_dir, f"{self.number}.html")
+
+    def _html_context(self, ar: 'AR') -> dict:
+        """构建测试用例页面的模板上下文（测试步骤和期望结果按顺序配对）"""
+        detail = self.test_case_detail
+        test_steps = detail.get_formatted_steps()
+        expect_results = detail.get_formatted_results()
+        steps = []
+        for index in range(max(len(test_steps), len(expect_results))):
+            steps.append({
+                "index": index + 1,
+                "test_step": test_steps[index] if index < len(test_steps) else "",
+                "expect_result": expect_results[index] if index < len(expect_results) else ""
+            })
+
+        return {
+            "title": self.name or self.number,
+            "css_link": stylesheet_link("testcase", self.html_file),
+            "back_link": calculate_relative_path(self.html_file, ar.html_file),
+            "number": self.number,
+            "status": self.status,
+            "execution_type": self.execution_type,
+            "test_type": self.test_type,
+            "creator": detail.creator,
+            "ar_title": ar.title,
+            "ar_req_id": ar.req_id,
+            "sr_req_id": self.related_sr_req_id,
+            "ir_req_id": self.related_ir_req_id,
+            "preparation": detail.preparation,
+            "steps": steps,
+            "description": detail.description or self.description
+        }
+
+    def _render_job(self, ar: 'AR') -> Optional[RenderJob]:
+        """构建测试用例页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file or not ar.html_file:
+            return None
+
+        return RenderJob("testcase.html", self._html_context(ar), self.html_file, "测试用例页面")
+
 @dataclass
 class TestSuite:
     """测试套件类 - 管理测试用例集合"""
@@ -314,60 +555,91 @@ class TestSuite:
     total: int = 0  # 测试用例总数
     act_total: int = 0  # 测试用例总数0
     
-    def load_all_test_cases(self, batch_size: int = 100) -> bool:
-        """分批获取所有测试用例"""
-        print(f"开始分批获取测试用例，每批 {batch_size} 个")
+    def load_all_test_cases(self, batch_size: Optional[int] = 100, max_workers: int = None) -> bool:
+        """
+        分批获取所有测试用例：先获取第一批得到总数，其余批次并发获取后按offset顺序合并
+
+        Args:
+            batch_size: 每批数量，为None或0时自动按服务端允许的最大数量分页
+            max_workers: 并发获取分页的线程数
+        """
+        auto_tune = not batch_size
+        batch_size = batch_size or config.TC_PAGE_SIZE_MAX
+        max_workers = max_workers or config.TC_PAGE_WORKERS
+        print(f"开始分批获取测试用例，每批 {batch_size} 个{'（自动调整）' if auto_tune else ''}")
         
         # 先获取第一批，得到总数
-        if not self._load_batch(offset=0, limit=batch_size):
+        first_page = self._fetch_page(offset=0, limit=batch_size)
+        while first_page is None and auto_tune and batch_size > config.TC_PAGE_SIZE_MIN:
+            # 请求数量可能超过服务端上限，减半后重试
+            batch_size = max(batch_size // 2, config.TC_PAGE_SIZE_MIN)
+            print(f"第一批获取失败，分页大小调整为 {batch_size} 后重试")
+            first_page = self._fetch_page(offset=0, limit=batch_size)
+        if first_page is None:
             return False
         
+        self.total = first_page.get("total", 0)
+        first_values = first_page.get("values", [])
         print(f"测试用例总数: {self.total}")
         
-        if self.total <= batch_size:
-            # 如果总数小于等于批次大小，已经获取完毕
-            print("测试用例已全部获取完成")
-            return True
+        # 服务端返回的数量少于请求数量且未取完时，说明服务端限制了单页最大数量
+        if auto_tune and 0 < len(first_values) < min(batch_size, self.total):
+            batch_size = len(first_values)
+            print(f"服务端单页最多返回 {batch_size} 个，分页大小调整为 {batch_size}")
+        
+        # 第一批之后所有批次的offset都已确定，并发获取
+        offsets = list(range(len(first_values), self.total, batch_size)) if first_values else []
+        pages = {0: first_values}
+        failed_offsets = []
+        if offsets:
+            print(f"需要再并发获取 {len(offsets)} 批（{max_workers}个线程）")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(self._fetch_page, offset, batch_size): offset for offset in offsets}
+                for future in as_completed(futures):
+                    offset = futures[future]
+                    page = future.result()
+                    if page is None:
+                        failed_offsets.append(offset)
+                    else:
+                        pages[offset] = page.get("values", [])
         
-        # 计算需要获取的批次数量
-        total_batches = (self.total + batch_size - 1) // batch_size
-        print(f"需要分 {total_batches} 批获取")
+        # 按offset顺序合并
+        for offset in sorted(pages):
+            self._add_page_values(offset, pages[offset])
         
-        # 从第二批次开始获取（第一批已经获取过了）
-        for batch_num in range(1, total_batches):
-            offset = batch_num * batch_size
-            print(f"正在获取第 {batch_num + 1}/{total_batches} 批，offset={offset}")
-            
-            if not self._load_batch(offset=offset, limit=batch_size):
-                print(f"第 {batch_num + 1} 批获取失败")
-                # 可以继续尝试获取下一批
+        if failed_offsets:
+            print(f"以下批次重试后仍获取失败，offset: {sorted(failed_offsets)}")
             
         self.act_total = len(self.test_cases)
         print(f"测试用例获取完成，共获取 {self.act_total} 个测试用例")
         return self._load_all_test_case_details()
     
-    def _load_batch(self, offset: int, limit: int) -> bool:
-        """获取单批测试用例数据"""
-        data = api_post_all_tc_with_limit(offset=offset, limit=limit)
-        
-        if not data:
-            print(f"获取第 {offset//limit + 1} 批测试用例数据失败")
-            return False
-        
-        # 更新总数（只在第一次获取时设置）
-        if offset == 0:
-            self.total = data.get("total", 0)
+    def _fetch_page(self, offset: int, limit: int, max_retries: int = None) -> Optional[dict]:
+        """获取单批测试用例数据，失败时按指数退避重试"""
+        max_retries = config.TC_PAGE_MAX_RETRIES if max_retries is None else max_retries
         
-        values = data.get("values", [])
-        print(f"第 {offset//limit + 1} 批获取到 {len(values)} 个测试用例数据")
+        for attempt in range(max_retries + 1):
+            data = api_post_all_tc_with_limit(offset=offset, limit=limit)
+            if data:
+                return data
+            
+            if attempt < max_retries:
+                wait_time = config.TC_PAGE_RETRY_BACKOFF * (2 ** attempt)
+                print(f"获取offset={offset}的测试用例数据失败，{wait_time:.1f}秒后第 {attempt + 1} 次重试")
+                time.sleep(wait_time)
         
+        print(f"获取offset={offset}的测试用例数据失败")
+        return None
+    
+    def _add_page_values(self, offset: int, values: list) -> int:
+        """根据单批测试用例数据创建测试用例并添加到列表"""
         success_count = 0
         for tc_data in values:
             if self._create_and_add_test_case(tc_data):
                 success_count += 1
         
-        print(f"第 {offset//limit + 1} 批成功创建 {success_count}/{len(values)} 个测试用例")
-        return success_count > 0
+        print(f"offset={offset} 的批次成功创建 {success_count}/{len(values)} 个测试用例")
+        return success_count
     
     def _create_and_add_test_case(self, tc_data: dict) -> bool:
         """创建测试用例并添加到列表"""
@@ -389,256 +661,138 @@ class TestSuite:
             print(f"创建测试用例异常: {e}, 数据: {tc_data}")
             return False
 
-    def _load_all_test_case_details(self) -> bool:
-        """批量加载所有测试用例的详情"""
+    def _load_all_test_case_details(self, max_workers: int = None, rate: float = None) -> bool:
+        """并发加载所有测试用例的详情（令牌桶限速），结束后汇总失败的用例"""
         if not self.test_cases:
             print("没有测试用例需要加载详情")
             return False
         
-        print(f"\n开始批量加载所有测试用例的详情...")
+        max_workers = max_workers or config.TC_DETAIL_WORKERS
+        rate = config.TC_DETAIL_RATE if rate is None else rate
+        bucket = TokenBucket(rate, config.TC_DETAIL_BURST)
+        
+        print(f"\n开始并发加载所有测试用例的详情（{max_workers}个线程，限速 {rate}/秒）...")
+        start_time = time.time()
         success_count = 0
+        failures = []
         total_count = len(self.test_cases)
         
-        for i, test_case in enumerate(self.test_cases, 1):
-            # 显示进度
-            if i % 10 == 0 or i == total_count:
-                print(f"进度: {i}/{total_count}")
-            
-            if test_case.load_detail():
-                success_count += 1
-            time.sleep(0.1) 
-        
-        print(f"测试用例详情加载完成: {success_count}/{total_count} 成功")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._load_test_case_detail, test_case, bucket): test_case
+                       for test_case in self.test_cases}
+            
+            for i, future in enumerate(as_completed(futures), 1):
+                test_case = futures[future]
+                error = future.result()
+                if error:
+                    failures.append((test_case.number, error))
+                else:
+                    success_count += 1
+                
+                # 显示进度
+                if i % 10 == 0 or i == total_count:
+                    print(f"进度: {i}/{total_count}")
+        
+        elapsed = time.time() - start_time
+        print(f"测试用例详情加载完成: {success_count}/{total_count} 成功，耗时 {elapsed:.2f} 秒")
+        if failures:
+            print(f"加载失败的测试用例 ({len(failures)} 个):")
+            for number, error in sorted(failures):
+                print(f"  {number or '无number'}: {error}")
         return success_count > 0
 
+    @staticmethod
+    def _load_test_case_detail(test_case: TestCase, bucket: TokenBucket) -> str:
+        """在工作线程中加载单个测试用例详情，成功返回空字符串，失败返回原因"""
+        if not test_case.number:
+            return "测试用例number为空"
+        
+        bucket.acquire()
+        try:
+            if test_case.test_case_detail.load_detail_by_number(test_case.number):
+                return ""
+            return "获取详情失败"
+        except Exception as e:
+            return f"加载异常: {e}"
+
 
     def sort_test_cases_by_number(self):
-        """按number对测试用例进行排序，number格式：tc_OS_XX_XX_XX_XX"""
+        """按number对测试用例进行排序，number格式：tc_OS_XX_XX_XX_XX（使用注册时缓存的sort_key）"""
         if not self.test_cases:
             print("没有测试用例需要排序")
             return
         
         print(f"开始对 {len(self.test_cases)} 个测试用例进行排序...")
-        
-        def extract_numbers(number_str):
-            """从tc_OS_XX_XX_XX_XX格式中提取数字"""
-            if not number_str:
-                return (0, 0, 0, 0)  # 返回默认值
-            
-            # 移除前缀"tc_OS_"
-            if number_str.startswith("tc_OS_"):
-                number_part = number_str[6:]  # 移除"tc_OS_"
-            else:
-                # 如果不是标准格式，返回默认值
-                print(f"警告: 测试用例number格式异常: {number_str}")
-                return (0, 0, 0, 0)
-            
-            # 按"_"分割并转换为整数
-            parts = number_part.split("_")
-            numbers = []
-            
-            for part in parts:
-                try:
-                    numbers.append(int(part))
-                except ValueError:
-                    numbers.append(0)  # 如果无法转换为整数，使用0
-            
-            # 确保有4个数字（不足的补0）
-            while len(numbers) < 4:
-                numbers.append(0)
-            
-            # 只取前4个数字
-            return tuple(numbers[:4])
-        
-        # 对测试用例进行排序
-        self.test_cases.sort(key=lambda tc: extract_numbers(tc.number))
+        self.test_cases.sort(key=SORT_KEY)
+        unparsed = sum(1 for tc in self.test_cases if tc.sort_key == UNPARSED_KEY)
+        if unparsed:
+            print(f"警告: {unparsed} 个测试用例的number格式异常，已排在最后")
         print("测试用例排序完成")
     
     def get_test_cases(self) -> List[TestCase]:
         """获取所有测试用例"""
         return self.test_cases
     
-    def print_summary(self):
-        """打印测试套件摘要"""
+    def print_summary(self, columns: ColumnarStore):
+        """
+        打印测试套件摘要
+
+        Args:
+            columns: 包含本套件测试用例的列存储（DataRegistry.build_columns(sf, test_cases)的结果），
+                     状态分布直接在列上统计
+        """
         print(f"\n测试套件摘要:")
         print(f"  HTML文件: {self.html_file}")
         print(f"  测试用例总数: {self.total}")
         print(f"  已获取测试用例数: {len(self.test_cases)}")
         
         if self.test_cases:
-            # 统计状态分布
-            status_count = {}
-            for tc in self.test_cases:
-                status = tc.status or "未知"
-                status_count[status] = status_count.get(status, 0) + 1
-            
             print(f"  状态分布:")
-            for status, count in status_count.items():
+            for status, count in columns.status_counts(LEVEL_TC).items():
                 print(f"    {status}: {count}")
     
 
-@dataclass
+@dataclass(slots=True)
 class DetailedDescription:
     """详细描述类"""
     content: str = ""
     owner: Optional[Union[SF, IR, SR, AR]] = None
     html_file: str = ""
     
-    def generate_html(self):
-        """
-        生成详细描述的HTML内容并保存到html_file指定的文件中
-        """
+    def _html_context(self) -> dict:
+        """构建详细描述页面的模板上下文"""
+        # 计算返回上一级的相对路径
+        back_link = "#"
+        if self.owner.html_file:
+            back_link = calculate_relative_path(self.html_file, self.owner.html_file)
+        
+        return {
+            "title": "需求描述",
+            "css_link": stylesheet_link("description", self.html_file),
+            "back_link": back_link,
+            "content": self.content
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建详细描述页面的渲染任务，缺少必要信息时返回None"""
         if not self.html_file:
             print("错误: DetailedDescription的html_file未设置")
-            return
+            return None
         
         if not self.owner or not hasattr(self.owner, 'html_file'):
             print("错误: DetailedDescription的owner未设置或无效")
-            return
+            return None
         
-        # 计算返回上一级的相对路径
-        back_link = "#"
-        if self.owner.html_file:
-            back_link = calculate_relative_path(self.html_file, self.owner.html_file)
-        
-        # 构建HTML内容
-        html_content = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>需求描述</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-            position: relative;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-
-        /* 返回链接样式1 */
-        .back-right-link {{
-            position: absolute;
-            top: 30px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式2 */
-        .back-right2-link {{
-            position: absolute;
-            top: 82px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right2-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式3 */
-        .back-left-link {{
-            position: absolute;
-            top: 30px;
-            left: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-left-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-        
-        h1 {{
-              font-size: 28px;
-            text-align: center;
-            color: #2c3e50;
-            margin-bottom: 30px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid #3498db;
-        }}
-        
-        .text-box {{
-            background-color: #f8f9fa;
-            border: 1px solid #e0e0e0;
-            border-radius: 6px;
-            padding: 25px;
-            margin: 0;
-            white-space: pre-line;
-            font-size: 14px;
-            line-height: 1.8;
-        }}
-    </style>
-</head>
-<body>
-          <!-- 返回链接 -->
-    <a href="{back_link}" class="back-right-link">返回上一级</a>
-    <div class="container">
-        <h1>需求描述</h1>
-        
-        <div class="text-box">
-{self.content if self.content else "暂无内容"}
-        </div>
-    </div>
-</body>
-</html>'''
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成详细描述HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
+        return RenderJob("description.html", self._html_context(), self.html_file, "详细描述")
 
-@dataclass
+    def generate_html(self):
+        """
+        生成详细描述的HTML内容并保存到html_file指定的文件中
+        """
+        render_now(self._render_job())
+
+
+@dataclass(slots=True)
 class ReviewRecord:
     """评审记录类"""
     title: str = ""
@@ -653,13 +807,8 @@ class ReviewRecord:
     owner: Optional[Union['SF', 'IR', 'SR', 'AR']] = None
     html_file: str = ""
 
-    def generate_html(self):
-        """
-        生成评审记录的HTML内容并保存到html_file指定的文件中
-        """
-        if not self.html_file:
-            return
-        
+    def _html_context(self) -> dict:
+        """构建评审记录页面的模板上下文"""
         # 计算返回上一级的相对路径
         back_link = "#"
         if self.owner and self.owner.html_file:
@@ -669,226 +818,30 @@ class ReviewRecord:
         req_id = self.owner.req_id if (self.owner and self.owner.req_id) else "无"
         req_name = self.owner.title if (self.owner and self.owner.title) else "无"
         
-        # 构建HTML内容
-        html_content = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>评审记录</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-            position: relative;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-
-        /* 返回链接样式1 */
-        .back-right-link {{
-            position: absolute;
-            top: 30px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式2 */
-        .back-right2-link {{
-            position: absolute;
-            top: 82px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right2-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式3 */
-        .back-left-link {{
-            position: absolute;
-            top: 30px;
-            left: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-left-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        h1 {{
-        	  font-size: 28px;
-            text-align: center;
-            color: #2c3e50;
-            margin-bottom: 30px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid #3498db;
-        }}
-
-        h2 {{
-            color: #34495e;
-            margin: 25px 0 15px 0;
-            padding-left: 10px;
-            border-left: 4px solid #3498db;
-        }}
-        
-        /* 信息列表布局 */
-        .info-list {{
-            margin: 15px 0;
-        }}
-        
-        .info-row {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: center;
-        }}
-        
-        .info-row:last-child {{
-            border-bottom: none;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 120px;
-            flex-shrink: 0;
-        }}
-        
-        .info-value {{
-            color: #666;
-            flex: 1;
-        }}
-
-        .modification-list {{
-            margin: 20px 0;
-        }}        
-        .modification-list {{
-            margin: 20px 0;
-        }}
-        
-        .modification-item {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: flex-start;
-        }}
-        
-        .modification-item:last-child {{
-            border-bottom: none;
-        }}
-        
-        .modification-time {{
-            min-width: 180px;
-            color: #666;
-            font-size: 14px;
-            font-weight: 500;
-        }}
-        
-        .modification-user {{
-            min-width: 80px;
-            color: #2c3e50;
-            font-weight: 500;
-            margin: 0 15px;
-        }}
-        
-        .modification-action {{
-            color: #666;
-            flex: 1;
-            background-color: #e3f2fd;
-            border-left: 4px solid #2196f3;
-            padding: 12px 15px;
-            margin: 5px 0;
-            border-radius: 0 4px 4px 0;
-        }}
-        
-        .action-highlight {{
-            color: #0066cc;
-            font-weight: 500;
-        }}
-    </style>
-</head>
-<body>
-	  	      <!-- 返回链接 -->
-    <a href="{back_link}" class="back-right-link">返回上一级</a>
-    <div class="container">
-        <h1>评审记录</h1>
-        <h2>1. 需求信息</h2>
-        <div class="description-box">
-            <div class="info-list">
-                <div class="info-row">
-                    <span class="info-label">需求ID：</span>
-                    <span class="info-value">{req_id}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">需求名称：</span>
-                    <span class="info-value">{req_name}</span>
-                </div>
-            </div>
-        </div>
-        <h2>2. 评审历史记录</h2>
-        <span class="info-value">无</span>
-    </div>
-</body>
-</html>'''
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成详细描述HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
+        return {
+            "title": "评审记录",
+            "css_link": stylesheet_link("record", self.html_file),
+            "back_link": back_link,
+            "req_id": req_id,
+            "req_name": req_name,
+            "history_heading": "评审历史记录"
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建评审记录页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file:
+            return None
+        
+        return RenderJob("record.html", self._html_context(), self.html_file, "评审记录")
 
-@dataclass
+    def generate_html(self):
+        """
+        生成评审记录的HTML内容并保存到html_file指定的文件中
+        """
+        render_now(self._render_job())
+
+
+@dataclass(slots=True)
 class HistoryRecord:
     """历史记录类"""
     req_id: str = ""
@@ -897,13 +850,8 @@ class HistoryRecord:
     owner: Optional[Union['SF', 'IR', 'SR', 'AR']] = None
     html_file: str = ""
 
-    def generate_html(self):
-        """
-        生成历史记录的HTML内容并保存到html_file指定的文件中
-        """
-        if not self.html_file:
-            return
-        
+    def _html_context(self) -> dict:
+        """构建修改记录页面的模板上下文"""
         # 计算返回上一级的相对路径
         back_link = "SF.html"
         if self.owner and self.owner.html_file:
@@ -913,227 +861,91 @@ class HistoryRecord:
         req_id = self.owner.req_id if (self.owner and self.owner.req_id) else "无"
         req_name = self.owner.title if (self.owner and self.owner.title) else "无"
         
-        # 构建HTML内容
-        html_content = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>修改记录</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-            position: relative;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-
-        /* 返回链接样式1 */
-        .back-right-link {{
-            position: absolute;
-            top: 30px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式2 */
-        .back-right2-link {{
-            position: absolute;
-            top: 82px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right2-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式3 */
-        .back-left-link {{
-            position: absolute;
-            top: 30px;
-            left: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-left-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        h1 {{
-        	  font-size: 28px;
-            text-align: center;
-            color: #2c3e50;
-            margin-bottom: 30px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid #3498db;
-        }}
-
-        h2 {{
-            color: #34495e;
-            margin: 25px 0 15px 0;
-            padding-left: 10px;
-            border-left: 4px solid #3498db;
-        }}
-        
-        /* 信息列表布局 */
-        .info-list {{
-            margin: 15px 0;
-        }}
-        
-        .info-row {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: center;
-        }}
-        
-        .info-row:last-child {{
-            border-bottom: none;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 120px;
-            flex-shrink: 0;
-        }}
-        
-        .info-value {{
-            color: #666;
-            flex: 1;
-        }}
-
-        .modification-list {{
-            margin: 20px 0;
-        }}        
-        .modification-list {{
-            margin: 20px 0;
-        }}
-        
-        .modification-item {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: flex-start;
-        }}
-        
-        .modification-item:last-child {{
-            border-bottom: none;
-        }}
-        
-        .modification-time {{
-            min-width: 180px;
-            color: #666;
-            font-size: 14px;
-            font-weight: 500;
-        }}
-        
-        .modification-user {{
-            min-width: 80px;
-            color: #2c3e50;
-            font-weight: 500;
-            margin: 0 15px;
-        }}
-        
-        .modification-action {{
-            color: #666;
-            flex: 1;
-            background-color: #e3f2fd;
-            border-left: 4px solid #2196f3;
-            padding: 12px 15px;
-            margin: 5px 0;
-            border-radius: 0 4px 4px 0;
-        }}
-        
-        .action-highlight {{
-            color: #0066cc;
-            font-weight: 500;
-        }}
-    </style>
-</head>
-<body>
-	  	      <!-- 返回链接 -->
-    <a href="{back_link}" class="back-right-link">返回上一级</a>
-    <div class="container">
-        <h1>修改记录</h1>
-        <h2>1. 需求信息</h2>
-        <div class="description-box">
-            <div class="info-list">
-                <div class="info-row">
-                    <span class="info-label">需求ID：</span>
-                    <span class="info-value">{req_id}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">需求名称：</span>
-                    <span class="info-value">{req_name}</span>
-                </div>
-            </div>
-        </div>
-        <h2>2. 修改历史记录</h2>
-        <span class="info-value">无</span>
-    </div>
-</body>
-</html>'''
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成修改记录HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
+        return {
+            "title": "修改记录",
+            "css_link": stylesheet_link("record", self.html_file),
+            "back_link": back_link,
+            "req_id": req_id,
+            "req_name": req_name,
+            "history_heading": "修改历史记录"
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建修改记录页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file:
+            return None
+        
+        return RenderJob("record.html", self._html_context(), self.html_file, "修改记录")
 
-@dataclass
-class AR:
+    def generate_html(self):
+        """
+        生成历史记录的HTML内容并保存到html_file指定的文件中
+        """
+        render_now(self._render_job())
+
+
+# 需求节点的子记录：属性名 -> (记录类型, 页面文件名后缀)
+_SUB_RECORD_TYPES = {
+    "detailed_description": (DetailedDescription, "描述"),
+    "review_record": (ReviewRecord, "评审记录"),
+    "history_record": (HistoryRecord, "修改记录")
+}
+
+
+class SubRecordOwner:
+    """
+    SF/IR/SR/AR共用的子记录访问 - 详细描述、评审记录、修改记录在首次访问时才创建
+
+    子记录页面路径由节点的html_file推出（如 目录/标题.html -> 目录/标题描述.html），
+    节点只保存已创建的子记录；评审记录和修改记录在渲染前不会被创建。
+    """
+    __slots__ = ()
+
+    def _sub_record(self, name: str):
+        record = getattr(self, f"_{name}")
+        if record is None:
+            record_type, suffix = _SUB_RECORD_TYPES[name]
+            record = record_type(owner=self, html_file=self._sub_record_file(suffix))
+            setattr(self, f"_{name}", record)
+        return record
+
+    def _sub_record_file(self, suffix: str) -> str:
+        if not self.html_file:
+            return ""
+        return f"{os.path.splitext(self.html_file)[0]}{suffix}.html"
+
+    def _plan_sub_record_paths(self):
+        """已创建的子记录跟随节点的新路径（未创建的子记录在首次访问时按节点路径生成）"""
+        for name, (_, suffix) in _SUB_RECORD_TYPES.items():
+            record = getattr(self, f"_{name}")
+            if record is not None:
+                record.html_file = self._sub_record_file(suffix)
+
+    def output_files(self) -> List[str]:
+        """节点自身生成的页面文件：节点页面、子记录页面和需求表（不创建子记录，不含测试用例页面）"""
+        files = [self.html_file, getattr(self, "req_table_html_file", "")]
+        files += [self._sub_record_file(suffix) for _, suffix in _SUB_RECORD_TYPES.values()]
+        return [file for file in files if file]
+
+    def created_sub_record(self, name: str):
+        """已创建的子记录，未创建时返回None（不触发创建）"""
+        return getattr(self, f"_{name}")
+
+    @property
+    def detailed_description(self) -> DetailedDescription:
+        return self._sub_record("detailed_description")
+
+    @property
+    def review_record(self) -> ReviewRecord:
+        return self._sub_record("review_record")
+
+    @property
+    def history_record(self) -> HistoryRecord:
+        return self._sub_record("history_record")
+
+
+@dataclass(slots=True)
+class AR(SubRecordOwner):
     """AR (Action Request) - 最底层"""
     id: str = ""
     req_id: str = ""
@@ -1153,23 +965,17 @@ class AR:
     plan_test_end_date: str = ""
     html_file: str = ""
     parent: Optional['SR'] = None
-    detailed_description: DetailedDescription = field(default_factory=DetailedDescription)
-    review_record: ReviewRecord = field(default_factory=ReviewRecord)
-    history_record: HistoryRecord = field(default_factory=HistoryRecord)
+    _detailed_description: Optional[DetailedDescription] = field(default=None, init=False, repr=False, compare=False)
+    _review_record: Optional[ReviewRecord] = field(default=None, init=False, repr=False, compare=False)
+    _history_record: Optional[HistoryRecord] = field(default=None, init=False, repr=False, compare=False)
+    sort_key: tuple = field(default=UNPARSED_KEY, init=False, repr=False, compare=False)  # req_id的整数元组排序键（注册时计算）
     test_cases: List[TestCase] = field(default_factory=list)
     
-    def __post_init__(self):
-        """初始化后自动注册到数据注册表"""
-        self.detailed_description.owner = self
-        self.review_record.owner = self
-        self.history_record.owner = self
-        pass
-
-    #创建AR html文件
-    def create_ar_html_files(self):
-        """为当前AR创建HTML空文件"""
+    #规划AR html文件路径
+    def plan_ar_html_paths(self):
+        """为当前AR规划HTML文件路径（只计算路径，目录和文件在渲染阶段创建）"""
         if not self.title:
-            print("AR title为空，无法创建文件")
+            print("AR title为空，无法规划文件路径")
             return
         
         if not self.parent or not self.parent.title:
@@ -1187,61 +993,17 @@ class AR:
         # 构建目录路径
         ar_dir = os.path.join(config.BASE_DIR_NAME, config.REQ_DIR_NAME, ir_title, sr_title, self.title)
         
-        # 创建AR专属目录
-        if not os.path.exists(ar_dir):
-            os.makedirs(ar_dir)
-        
         # 设置文件路径
         self.html_file = os.path.join(ar_dir, f"{self.title}.html")
-        self.detailed_description.html_file = os.path.join(ar_dir, f"{self.title}描述.html")
-        self.review_record.html_file = os.path.join(ar_dir, f"{self.title}评审记录.html")
-        self.history_record.html_file = os.path.join(ar_dir, f"{self.title}修改记录.html")
-        
-        # 创建四个空文件
-        for file_path in [
-            self.html_file,
-            self.detailed_description.html_file,
-            self.review_record.html_file,
-            self.history_record.html_file
-        ]:
-            try:
-                open(file_path, 'w', encoding='utf-8').close()
-                print(f"创建AR文件: {file_path}")
-            except Exception as e:
-                print(f"创建失败 {file_path}: {e}")
+        self._plan_sub_record_paths()
+        
+        # AR目录可能随标题变化，已关联的测试用例页面跟随AR目录
+        for test_case in self.test_cases:
+            test_case.plan_test_case_html_paths(self)
 
     def _extract_req_ids_from_title(self):
-        """从title中提取AR、SR、IR的req_id"""
-        if not self.title:
-            return None, None, None
-        
-        # 查找 "LLR_OS_" 关键字
-        keyword = "LLR_OS_"
-        start_idx = self.title.find(keyword)
-        if start_idx == -1:
-            return None, None, None
-        
-        # 提取 LLR_OS_xx_xx_xx 部分
-        # 格式为 LLR_OS_xx_xx_xx，xx是两位数字，共5部分
-        expected_length = len("LLR_OS_xx_xx_xx")  # 15个字符
-        
-        # 从关键字开始，取15个字符
-        ar_req_id = self.title[start_idx:start_idx + expected_length]
-        
-        # 验证格式
-        parts = ar_req_id.split('_')
-        if len(parts) != 5 or parts[0] != "LLR" or parts[1] != "OS":
-            return None, None, None
-        
-        # 生成SR的req_id：LLR_OS_01_02_03 -> HLR_OS_01_02
-        sr_parts = ["HLR", "OS", parts[2], parts[3]]
-        sr_req_id = '_'.join(sr_parts)
-        
-        # 生成IR的req_id：HLR_OS_01_02 -> HLR_OS_01
-        ir_parts = ["HLR", "OS", parts[2]]
-        ir_req_id = '_'.join(ir_parts)
-        
-        return ar_req_id, sr_req_id, ir_req_id
+        """从title中提取AR、SR、IR的req_id（LLR_OS_01_02_03 -> AR、HLR_OS_01_02 -> SR、HLR_OS_01 -> IR）"""
+        return parse_ar_title(self.title)
     
     def _update_req_id_chain(self):
         """更新AR、SR、IR的req_id链,并注册到DataRegistry"""
@@ -1254,22 +1016,8 @@ class AR:
         if not ar_req_id:
             return False
         
-        # 1. 更新AR的req_id（直接设置）
-        self.req_id = ar_req_id
-        # 注册AR到DataRegistry
-        data_registry.register_ar(self)
-        
-        # 2. 更新父级SR的req_id（如果为空）
-        if self.parent and not self.parent.req_id:
-            self.parent.req_id = sr_req_id
-            # 注册SR到DataRegistry
-            data_registry.register_sr(self.parent)
-            
-            # 3. 更新父级IR的req_id（如果为空）
-            if self.parent.parent and not self.parent.parent.req_id:
-                self.parent.parent.req_id = ir_req_id
-                # 注册IR到DataRegistry
-                data_registry.register_ir(self.parent.parent)
+        # 设置AR的req_id、补全父级SR/IR的req_id并注册（在注册表的锁内完成，可并发调用）
+        data_registry.register_ar_chain(self, ar_req_id, sr_req_id, ir_req_id)
         
         return True
 
@@ -1366,6 +1114,7 @@ class AR:
             
             # 设置详细描述
             self._set_detailed_description(detail)
+            intern_fields(self)
             
             # 在所有字段提取完成后，更新req_id链
             self._update_req_id_chain()
@@ -1383,8 +1132,9 @@ class AR:
         self.detailed_description.owner = self
     
     def add_test_case(self, test_case: TestCase):
-        """添加测试用例"""
+        """添加测试用例，并在当前AR的目录下规划其页面路径"""
         self.test_cases.append(test_case)
+        test_case.plan_test_case_html_paths(self)
     
     def print_info(self):
         """打印AR的所有元素信息"""
@@ -1423,13 +1173,8 @@ class AR:
         print(f"test_cases count: {len(self.test_cases)}")
 
 
-    def generate_html(self):
-        """
-        生成AR的HTML内容并保存到html_file指定的文件中
-        """
-        if not self.html_file:
-            return
-        
+    def _html_context(self) -> dict:
+        """构建AR页面的模板上下文（只包含字符串等可序列化的值，不引用其他节点对象）"""
         # 计算返回父需求的相对路径
         back_link = "../OSTaskChangePrio()-任务优先级设置.html"
         if self.parent and self.parent.html_file:
@@ -1459,365 +1204,58 @@ class AR:
         parent_href = back_link
         parent_title = self.parent.title if (self.parent and self.parent.title) else "无"
         
-        # 生成测试用例链接HTML
-        test_case_links_html = ""
+        # 生成测试用例链接
+        related_links = []
         for test_case in self.test_cases:
             if test_case.html_file or test_case.name:  # 只处理有HTML文件和标题的测试用例
-                test_case_relative_path = calculate_relative_path(self.html_file, test_case.html_file)
-                test_case_link = f"""
-            <div class="requirement-item">
-                <a href="{test_case_relative_path}" class="requirement-link">{test_case.name}</a>
-            </div>"""
-                test_case_links_html += test_case_link
-        
-        # 构建完整的HTML内容
-        html_content = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title}</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-            position: relative;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-
-
-        /* 返回链接样式1 */
-        .back-right-link {{
-            position: absolute;
-            top: 30px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式2 */
-        .back-right2-link {{
-            position: absolute;
-            top: 82px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right2-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式3 */
-        .back-left-link {{
-            position: absolute;
-            top: 30px;
-            left: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-left-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-        
-        .section-title {{
-            font-size: 20px;
-            font-weight: bold;
-            color: #2c3e50;
-            margin: 25px 0 15px 0;
-            padding-bottom: 8px;
-            border-bottom: 2px solid #3498db;
-        }}
-        
-        .subsection-title {{
-            font-size: 16px;
-            font-weight: bold;
-            color: #34495e;
-            margin: 20px 0 10px 0;
-        }}
-        
-        /* 新的信息列表布局 */
-        .info-list {{
-            margin: 15px 0;
-        }}
-        
-        .info-row {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: center;
-        }}
-        
-        .info-row:last-child {{
-            border-bottom: none;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 140px;
-            flex-shrink: 0;
-        }}
-        
-        .info-value {{
-            color: #666;
-            flex: 1;
-        }}
-        
-        /* CM信息网格布局 - 一行两列 */
-        .cm-info-grid {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin: 15px 0;
-            position: relative;
-        }}
-        
-        .cm-info-grid::before {{
-            content: "";
-            position: absolute;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 1px;
-            height: 100%;
-            background-color: #e0e0e0;
-        }}
-        
-        .cm-column {{
-            display: flex;
-            flex-direction: column;
-        }}
-        
-        .link-group {{
-            display: flex;
-            gap: 30px;
-            margin: 20px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-        }}
-        
-        .link-item {{
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            transition: color 0.3s;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-        }}
-        
-        .link-item:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-        }}
-        
-        .requirement-list {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        
-        .requirement-item {{
-            margin: 8px 0;
-            padding: 8px 12px;
-            background-color: #f8f9fa;
-            border-radius: 4px;
-            border-left: 3px solid #3498db;
-        }}
-        
-        .requirement-link {{
-            color: #0066cc;
-            text-decoration: none;
-            transition: color 0.3s;
-            font-weight: 500;
-        }}
-        
-        .requirement-link:hover {{
-            color: #004499;
-            text-decoration: underline;
-        }}
-        
-        /* 需求详情样式 */
-        .requirement-detail {{
-            margin: 15px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-            border: 1px solid #e0e0e0;
-        }}
-    </style>
-</head>
-<body>
-          <!-- 返回链接 -->
-    <a href="{back_link}" class="back-right-link">返回父需求</a>
-    <a href="{root_link}" class="back-left-link">返回根需求</a>
-    <div class="container">
-        <h1 style="text-align: center; color: #2c3e50; margin-bottom: 30px; font-size: 28px;">{self.title}</h1>
-        
-        <!-- 1. 基本信息 -->
-        <div class="section-title">1. 基本信息</div>
-    
-        <div class="info-list">
-            <div class="info-row">
-                <span class="info-label">需求级别：</span>
-                <span class="info-value">AR(低层)</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求ID：</span>
-                <span class="info-value">{self.req_id if self.req_id else "无"}</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求名称：</span>
-                <span class="info-value">{self.title}</span>
-            </div>
-        </div>
-        
-        <div class="section-title">2. 需求描述</div>
-        <div class="requirement-detail">
-            <a href="{desc_href}" class="link-item">详细描述</a>
-        </div>
-        
-        <!-- 3. CM信息 - 一行两列网格布局 -->
-        <div class="section-title">3. CM信息</div>
-        
-        <div class="cm-info-grid">
-            <!-- 左侧列 -->
-            <div class="cm-column">
-                <div class="info-list">
-                    <div class="info-row">
-                        <span class="info-label">提出人：</span>
-                        <span class="info-value">{self.creator if self.creator else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">状态：</span>
-                        <span class="info-value">{self.status if self.status else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开始时间：</span>
-                        <span class="info-value">{self.plan_start_date if self.plan_start_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开发结束：</span>
-                        <span class="info-value">{self.plan_dev_end_date if self.plan_dev_end_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划工时：</span>
-                        <span class="info-value">{self.workload} 人天</span>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- 右侧列 -->
-            <div class="cm-column">
-                <div class="info-list">
-                      <div class="info-row">
-                        <span class="info-label">负责人：</span>
-                        <span class="info-value">{self.assignee if self.assignee else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">领域：</span>
-                        <span class="info-value">{self.domain_value if self.domain_value else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划完成时间：</span>
-                        <span class="info-value">{self.plan_end_date if self.plan_end_date else "无"}</span>
-                    </div>
-                    
-                    <div class="info-row">
-                        <span class="info-label">计划测试结束：</span>
-                        <span class="info-value">{self.plan_test_end_date if self.plan_test_end_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">实际工时：</span>
-                        <span class="info-value">{self.act_workload} 人天</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- 评审和修改记录链接 -->
-        <div class="link-group">
-            <a href="{review_href}" class="link-item">评审记录</a>
-            <a href="{history_href}" class="link-item">修改记录</a>
-        </div>
-        
-        <!-- 4. 关联项 -->
-        <div class="section-title">4. 关联项</div>
-        
-        <div class="subsection-title">4.1 上一层级需求(SR级)：</div>
-        <div class="requirement-list">
-            <div class="requirement-item">
-                <a href="{parent_href}" class="requirement-link">{parent_title}</a>
-            </div>
-        </div>
-        
-        <div class="subsection-title">4.2 关联测试用例：</div>
-        <div class="requirement-list">
-            {test_case_links_html if test_case_links_html else '<div class="requirement-item">无</div>'}
-        </div>
-    </div>
-</body>
-</html>'''
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成AR HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
+                related_links.append({
+                    "href": calculate_relative_path(self.html_file, test_case.html_file),
+                    "title": test_case.name
+                })
+        
+        return {
+            "title": self.title,
+            "css_link": stylesheet_link("requirement", self.html_file),
+            "back_link": back_link,
+            "root_link": root_link,
+            "level_label": "AR(低层)",
+            "req_id": self.req_id,
+            "desc_href": desc_href,
+            "creator": self.creator,
+            "status": self.status,
+            "plan_start_date": self.plan_start_date,
+            "plan_dev_end_date": self.plan_dev_end_date,
+            "workload": self.workload,
+            "assignee": self.assignee,
+            "domain_value": self.domain_value,
+            "plan_end_date": self.plan_end_date,
+            "plan_test_end_date": self.plan_test_end_date,
+            "act_workload": self.act_workload,
+            "review_href": review_href,
+            "history_href": history_href,
+            "parent_heading": "上一层级需求(SR级)",
+            "parent_href": parent_href,
+            "parent_title": parent_title,
+            "related_heading": "关联测试用例",
+            "related_links": related_links
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建AR页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file:
+            return None
+        
+        return RenderJob("requirement.html", self._html_context(), self.html_file, "AR页面")
 
+    def generate_html(self):
+        """
+        生成AR的HTML内容并保存到html_file指定的文件中
+        """
+        render_now(self._render_job())
 
-@dataclass
-class SR:
+
+@dataclass(slots=True)
+class SR(SubRecordOwner):
     """SR (Service Request) - 第三层"""
     id: str = ""
     req_id: str = ""
@@ -1838,23 +1276,17 @@ class SR:
     html_file: str = ""
     req_table_html_file: str = ""
     parent: Optional['IR'] = None
-    detailed_description: DetailedDescription = field(default_factory=DetailedDescription)
-    review_record: ReviewRecord = field(default_factory=ReviewRecord)
-    history_record: HistoryRecord = field(default_factory=HistoryRecord)
+    _detailed_description: Optional[DetailedDescription] = field(default=None, init=False, repr=False, compare=False)
+    _review_record: Optional[ReviewRecord] = field(default=None, init=False, repr=False, compare=False)
+    _history_record: Optional[HistoryRecord] = field(default=None, init=False, repr=False, compare=False)
+    sort_key: tuple = field(default=UNPARSED_KEY, init=False, repr=False, compare=False)  # req_id的整数元组排序键（注册时计算）
     ars: List[AR] = field(default_factory=list)
     
-    def __post_init__(self):
-        """初始化后自动注册到数据注册表"""
-        self.detailed_description.owner = self
-        self.review_record.owner = self
-        self.history_record.owner = self
-        pass
-
-    #创建sr的html文件
-    def create_sr_html_files(self):
-        """为当前SR创建HTML空文件"""
+    #规划sr的html文件路径
+    def plan_sr_html_paths(self):
+        """为当前SR规划HTML文件路径（只计算路径，目录和文件在渲染阶段创建）"""
         if not self.title:
-            print("SR title为空，无法创建文件")
+            print("SR title为空，无法规划文件路径")
             return
         
         if not self.parent or not self.parent.title:
@@ -1864,71 +1296,16 @@ class SR:
         # 构建目录路径
         sr_dir = os.path.join(config.BASE_DIR_NAME, config.REQ_DIR_NAME, self.parent.title, self.title)
         
-        # 创建SR专属目录
-        if not os.path.exists(sr_dir):
-            os.makedirs(sr_dir)
-        
         # 设置文件路径
         self.html_file = os.path.join(sr_dir, f"{self.title}.html")
         self.req_table_html_file = os.path.join(sr_dir, f"{self.title}_table.html")
-        self.detailed_description.html_file = os.path.join(sr_dir, f"{self.title}描述.html")
-        self.review_record.html_file = os.path.join(sr_dir, f"{self.title}评审记录.html")
-        self.history_record.html_file = os.path.join(sr_dir, f"{self.title}修改记录.html")
-        
-        # 创建四个空文件
-        for file_path in [
-            self.html_file,
-            self.req_table_html_file,
-            self.detailed_description.html_file,
-            self.review_record.html_file,
-            self.history_record.html_file
-        ]:
-            try:
-                open(file_path, 'w', encoding='utf-8').close()
-                print(f"创建SR文件: {file_path}")
-            except Exception as e:
-                print(f"创建失败 {file_path}: {e}")
+        self._plan_sub_record_paths()
 
 
     #使用req_id对ars进行排序
     def sort_ars_by_req_id(self):
-        """按照req_id对ars列表进行排序"""
-        if not self.ars or len(self.ars) <= 1:
-            print(f"  AR列表为空或只有一个元素，无需排序")
-            return
-        
-        # 检查AR是否有req_id
-        ars_without_req_id = [ar for ar in self.ars if ar and not ar.req_id]
-        if ars_without_req_id:
-            print(f"  警告：{len(ars_without_req_id)}个AR没有req_id")
-        
-        def get_sort_key(ar):
-            """获取AR的排序键"""
-            if not ar or not ar.req_id:
-                return (999, 999, 999, "zzz")  # 没有req_id的放在最后
-            
-            # 处理req_id格式：LLR_OS_01_02_03
-            parts = ar.req_id.split('_')
-            if len(parts) < 5:
-                return (999, 999, 999, ar.req_id)  # 格式不正确的放在最后
-            
-            try:
-                # 解析数字部分
-                num1 = int(parts[2]) if parts[2].isdigit() else 0
-                num2 = int(parts[3]) if parts[3].isdigit() else 0
-                num3 = int(parts[4]) if len(parts) > 4 and parts[4].isdigit() else 0
-                return (num1, num2, num3, ar.req_id)
-            except (ValueError, IndexError):
-                return (999, 999, 999, ar.req_id or "")
-        
-        # 使用稳定排序
-        self.ars.sort(key=get_sort_key)
-        
-        print(f"  AR排序完成，顺序如下：")
-        for i, ar in enumerate(self.ars, 1):
-            if ar:
-                print(f"    {i}. {ar.req_id or '无req_id'} - {ar.title[:30]}...")
-        
+        """按照req_id对ars列表进行排序（使用注册时缓存的sort_key，没有req_id或格式不正确的排在最后，稳定排序）"""
+        self.ars.sort(key=SORT_KEY)
         return True
 
     
@@ -2025,6 +1402,9 @@ class SR:
             
             # 设置详细描述
             self._set_detailed_description(detail)
+            intern_fields(self)
+            # 已注册时（如增量同步重新加载详情）更新二级索引
+            data_registry.reindex(self)
             
             # 从children字段创建AR
             children_str = detail.get("children", "")
@@ -2070,7 +1450,7 @@ class SR:
             print(f"  更新AR {i}/{len(self.ars)}: {ar.id}")
             if ar.load_detail_by_id():
                 success_count += 1
-                ar.create_ar_html_files()
+                ar.plan_ar_html_paths()
                 print(f"    ✓ 成功")
             else:
                 print(f"    ✗ 失败")
@@ -2115,13 +1495,8 @@ class SR:
         print(f"ars count: {len(self.ars)}")
 
 
-    def generate_html(self):
-        """
-        生成SR的HTML内容并保存到html_file指定的文件中
-        """
-        if not self.html_file:
-            return
-        
+    def _html_context(self) -> dict:
+        """构建SR页面的模板上下文（只包含字符串等可序列化的值，不引用其他节点对象）"""
         # 计算返回父需求的相对路径
         back_link = "../任务管理.html"
         if self.parent and self.parent.html_file:
@@ -2146,374 +1521,64 @@ class SR:
         parent_href = back_link
         parent_title = self.parent.title if (self.parent and self.parent.title) else "无"
         
-        # 生成AR链接HTML
-        ar_links_html = ""
+        # 生成AR链接
+        related_links = []
         for ar in self.ars:
             if ar.html_file and ar.title:  # 只处理有HTML文件和标题的AR
-                ar_relative_path = calculate_relative_path(self.html_file, ar.html_file)
-                ar_link = f"""
-            <div class="requirement-item">
-                <a href="{ar_relative_path}" class="requirement-link">{ar.title}</a>
-            </div>"""
-                ar_links_html += ar_link
-        
-        # 构建完整的HTML内容
-        html_content = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title}</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-            position: relative;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-
-
-        /* 返回链接样式1 */
-        .back-right-link {{
-            position: absolute;
-            top: 30px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式2 */
-        .back-right2-link {{
-            position: absolute;
-            top: 82px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right2-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式3 */
-        .back-left-link {{
-            position: absolute;
-            top: 30px;
-            left: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-left-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-        
-        .section-title {{
-            font-size: 20px;
-            font-weight: bold;
-            color: #2c3e50;
-            margin: 25px 0 15px 0;
-            padding-bottom: 8px;
-            border-bottom: 2px solid #3498db;
-        }}
-        
-        .subsection-title {{
-            font-size: 16px;
-            font-weight: bold;
-            color: #34495e;
-            margin: 20px 0 10px 0;
-        }}
-        
-        /* 新的信息列表布局 */
-        .info-list {{
-            margin: 15px 0;
-        }}
-        
-        .info-row {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: center;
-        }}
-        
-        .info-row:last-child {{
-            border-bottom: none;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 140px;
-            flex-shrink: 0;
-        }}
-        
-        .info-value {{
-            color: #666;
-            flex: 1;
-        }}
-        
-        /* CM信息网格布局 - 一行两列 */
-        .cm-info-grid {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin: 15px 0;
-            position: relative;
-        }}
-        
-        .cm-info-grid::before {{
-            content: "";
-            position: absolute;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 1px;
-            height: 100%;
-            background-color: #e0e0e0;
-        }}
-        
-        .cm-column {{
-            display: flex;
-            flex-direction: column;
-        }}
-        
-        .link-group {{
-            display: flex;
-            gap: 30px;
-            margin: 20px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-        }}
-        
-        .link-item {{
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            transition: color 0.3s;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-        }}
-        
-        .link-item:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-        }}
-        
-        .requirement-list {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        
-        .requirement-item {{
-            margin: 8px 0;
-            padding: 8px 12px;
-            background-color: #f8f9fa;
-            border-radius: 4px;
-            border-left: 3px solid #3498db;
-        }}
-        
-        .requirement-link {{
-            color: #0066cc;
-            text-decoration: none;
-            transition: color 0.3s;
-            font-weight: 500;
-        }}
-        
-        .requirement-link:hover {{
-            color: #004499;
-            text-decoration: underline;
-        }}
-        
-        /* 需求详情样式 */
-        .requirement-detail {{
-            margin: 15px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-            border: 1px solid #e0e0e0;
-        }}
-    </style>
-</head>
-<body>
-          <!-- 返回链接 -->
-    <a href="{back_link}" class="back-right-link">返回父需求</a>
-    <div class="container">
-        <h1 style="text-align: center; color: #2c3e50; margin-bottom: 30px; font-size: 28px;">{self.title}</h1>
-        
-        <!-- 1. 基本信息 -->
-        <div class="section-title">1. 基本信息</div>
-    
-        <div class="info-list">
-            <div class="info-row">
-                <span class="info-label">需求级别：</span>
-                <span class="info-value">SR(高层)</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求ID：</span>
-                <span class="info-value">{self.req_id if self.req_id else "无"}</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求名称：</span>
-                <span class="info-value">{self.title}</span>
-            </div>
-        </div>
-        
-        <div class="section-title">2. 需求描述</div>
-        <div class="requirement-detail">
-            <a href="{desc_href}" class="link-item">详细描述</a>
-        </div>
-        
-        <!-- 3. CM信息 - 一行两列网格布局 -->
-        <div class="section-title">3. CM信息</div>
-        
-        <div class="cm-info-grid">
-            <!-- 左侧列 -->
-            <div class="cm-column">
-                <div class="info-list">
-                    <div class="info-row">
-                        <span class="info-label">提出人：</span>
-                        <span class="info-value">{self.creator if self.creator else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">状态：</span>
-                        <span class="info-value">{self.status if self.status else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开始时间：</span>
-                        <span class="info-value">{self.plan_start_date if self.plan_start_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开发结束：</span>
-                        <span class="info-value">{self.plan_dev_end_date if self.plan_dev_end_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划工时：</span>
-                        <span class="info-value">{self.workload} 人天</span>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- 右侧列 -->
-            <div class="cm-column">
-                <div class="info-list">
-                      <div class="info-row">
-                        <span class="info-label">负责人：</span>
-                        <span class="info-value">{self.assignee if self.assignee else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">领域：</span>
-                        <span class="info-value">{self.domain_value if self.domain_value else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划完成时间：</span>
-                        <span class="info-value">{self.plan_end_date if self.plan_end_date else "无"}</span>
-                    </div>
-                    
-                    <div class="info-row">
-                        <span class="info-label">计划测试结束：</span>
-                        <span class="info-value">{self.plan_test_end_date if self.plan_test_end_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">实际工时：</span>
-                        <span class="info-value">{self.act_workload} 人天</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- 评审和修改记录链接 -->
-        <div class="link-group">
-            <a href="{review_href}" class="link-item">评审记录</a>
-            <a href="{history_href}" class="link-item">修改记录</a>
-        </div>
-        
-        <!-- 4. 关联项 -->
-        <div class="section-title">4. 关联项</div>
-        
-        <div class="subsection-title">4.1 上一层级需求(IR级)：</div>
-        <div class="requirement-list">
-            <div class="requirement-item">
-                <a href="{parent_href}" class="requirement-link">{parent_title}</a>
-            </div>
-        </div>
-        
-        <div class="subsection-title">4.2 下一层级需求(AR级)：</div>
-        <div class="requirement-list">
-            {ar_links_html if ar_links_html else '<div class="requirement-item">无</div>'}
-        </div>
-    </div>
-</body>
-</html>'''
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成SR HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
-
-
+                related_links.append({
+                    "href": calculate_relative_path(self.html_file, ar.html_file),
+                    "title": ar.title
+                })
+        
+        return {
+            "title": self.title,
+            "css_link": stylesheet_link("requirement", self.html_file),
+            "back_link": back_link,
+            "root_link": "",
+            "level_label": "SR(高层)",
+            "req_id": self.req_id,
+            "desc_href": desc_href,
+            "creator": self.creator,
+            "status": self.status,
+            "plan_start_date": self.plan_start_date,
+            "plan_dev_end_date": self.plan_dev_end_date,
+            "workload": self.workload,
+            "assignee": self.assignee,
+            "domain_value": self.domain_value,
+            "plan_end_date": self.plan_end_date,
+            "plan_test_end_date": self.plan_test_end_date,
+            "act_workload": self.act_workload,
+            "review_href": review_href,
+            "history_href": history_href,
+            "parent_heading": "上一层级需求(IR级)",
+            "parent_href": parent_href,
+            "parent_title": parent_title,
+            "related_heading": "下一层级需求(AR级)",
+            "related_links": related_links
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建SR页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file:
+            return None
+        
+        return RenderJob("requirement.html", self._html_context(), self.html_file, "SR页面")
 
-    def generate_req_table_html(self):
+    def generate_html(self):
         """
-        生成SR-AR需求表HTML文件，并保存到req_table_html_file指定的路径
+        生成SR的HTML内容并保存到html_file指定的文件中
         """
+        render_now(self._render_job())
+
+    def _table_render_job(self) -> Optional[RenderJob]:
+        """构建SR-AR需求表的渲染任务，缺少必要信息时返回None"""
         if not self.req_table_html_file:
             print("错误: SR的req_table_html_file未设置")
-            return
+            return None
         
         if not self.html_file:
             print("错误: SR的html_file未设置，无法计算相对路径")
-            return
+            return None
         
         # 计算SR文件的相对路径
         sr_relative_path = calculate_relative_path(self.req_table_html_file, self.html_file)
@@ -2521,18 +1586,15 @@ class SR:
         # 生成AR行HTML
         ar_rows_html = self._generate_ar_rows(sr_relative_path)
         
-        # 构建完整的HTML内容
-        html_content = self._build_sr_ar_table_html(sr_relative_path, ar_rows_html)
-        
-        # 写入文件
-        try:
-            with open(self.req_table_html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成SR-AR需求表HTML文件: {self.req_table_html_file}")
-            
-        except Exception as e:
-            print(f"写入SR-AR需求表HTML文件失败: {e}")
-    
+        return RenderJob("req_table.html", self._build_sr_ar_table_context(sr_relative_path, ar_rows_html),
+                         self.req_table_html_file, "SR-AR需求表")
+
+    def generate_req_table_html(self):
+        """
+        生成SR-AR需求表HTML文件，并保存到req_table_html_file指定的路径
+        """
+        render_now(self._table_render_job())
+
     def _generate_ar_rows(self, sr_relative_path: str) -> str:
         """生成AR行的HTML"""
         if not self.ars:
@@ -2541,7 +1603,7 @@ class SR:
                     <td class="sr-cell" rowspan="1">
                         <a href="{sr_relative_path}" target="_blank">{self.title}</a>
                     </td>
-                    <td colspan="2" style="text-align: center; color: #7f8c8d; font-style: italic;">
+                    <td colspan="3" style="text-align: center; color: #7f8c8d; font-style: italic;">
                         暂无AR级需求
                     </td>
                 </tr>'''
@@ -2562,6 +1624,9 @@ class SR:
             # 获取AR的标题
             ar_title = ar.title if ar.title else "无名称"
             
+            # AR关联的测试用例链接
+            test_case_links = self._test_case_links(ar)
+            
             # 如果是第一行，包含SR单元格
             if i == 0:
                 row = f'''
@@ -2571,147 +1636,41 @@ class SR:
                     </td>
                     <td>{ar.req_id}</td>
                     <td><a href="{ar_detail_href}" target="_blank">{ar_title}</a></td>
+                    <td>{test_case_links}</td>
                 </tr>'''
             else:
                 row = f'''
                 <tr>
                     <td>{ar.req_id}</td>
                     <td><a href="{ar_detail_href}" target="_blank">{ar_title}</a></td>
+                    <td>{test_case_links}</td>
                 </tr>'''
             
             rows_html += row
         
         return rows_html
     
-    def _build_sr_ar_table_html(self, sr_relative_path: str, ar_rows_html: str) -> str:
-        """构建SR-AR表格HTML文档"""
-        return f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title} SR-AR需求表</title>
-    <style>
-        * {{
-            box-sizing: border-box;
-            margin: 0;
-            padding: 0;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background-color: #f5f7fa;
-            padding: 40px 20px;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh;
-        }}
-        
-        .container {{
-            max-width: 800px;
-            width: 100%;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
-            padding: 30px;
-        }}
-        
-        h1 {{
-            text-align: center;
-            margin-bottom: 25px;
-            color: #2c3e50;
-            font-weight: 600;
-            font-size: 24px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #eaeaea;
-        }}
-        
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 0 auto;
-            border: 1px solid #ddd;
-        }}
-        
-        th {{
-            background-color: #2ecc71;
-            color: white;
-            font-weight: 500;
-            padding: 14px 16px;
-            text-align: center;
-            border-right: 1px solid #27ae60;
-        }}
-        
-        th:last-child {{
-            border-right: none;
-        }}
-        
-        td {{
-            padding: 12px 16px;
-            text-align: center;
-            border-bottom: 1px solid #eaeaea;
-            border-right: 1px solid #eaeaea;
-        }}
-        
-        td:last-child {{
-            border-right: none;
-        }}
-        
-        tr:nth-child(even) {{
-            background-color: #f8fafc;
-        }}
-        
-        tr:hover {{
-            background-color: #f0f7ff;
-        }}
-        
-        .sr-cell {{
-            background-color: #d1fae5;
-            font-weight: 500;
-            vertical-align: middle;
-            color: #065f46;
-        }}
-        
-        a {{
-            color: #2980b9;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 4px 8px;
-            border-radius: 4px;
-            transition: all 0.2s ease;
-        }}
-        
-        a:hover {{
-            background-color: #3498db;
-            color: white;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>{self.title} SR-AR需求表</h1>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th>SR</th>
-                    <th>AR-低层需求ID</th>
-                    <th>AR-需求名称</th>
-                </tr>
-            </thead>
-            <tbody>
-{ar_rows_html}
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>'''
-
-@dataclass
-class IR:
+    def _test_case_links(self, ar: AR) -> str:
+        """SR-AR需求表中AR关联的测试用例链接"""
+        links = [f'<a href="{calculate_relative_path(self.req_table_html_file, test_case.html_file)}" target="_blank">{test_case.number}</a>'
+                 for test_case in ar.test_cases if test_case.html_file]
+        return "<br>".join(links) if links else "无"
+    
+    def _build_sr_ar_table_context(self, sr_relative_path: str, ar_rows_html: str) -> dict:
+        """构建SR-AR表格模板上下文"""
+        return {
+            "title": f"{self.title} SR-AR需求表",
+            "css_link": stylesheet_link("sr_table", self.req_table_html_file),
+            "parent_level": "SR",
+            "child_level": "AR",
+            "child_id_label": "低层需求ID",
+            "extra_heading": "关联测试用例",
+            "rows_html": ar_rows_html
+        }
+
+
+@dataclass(slots=True)
+class IR(SubRecordOwner):
     """IR (Incident Request) - 第二层"""
     id: str = ""
     req_id: str = ""
@@ -2732,90 +1691,30 @@ class IR:
     html_file: str = ""
     req_table_html_file: str = ""
     parent: Optional['SF'] = None
-    detailed_description: DetailedDescription = field(default_factory=DetailedDescription)
-    review_record: ReviewRecord = field(default_factory=ReviewRecord)
-    history_record: HistoryRecord = field(default_factory=HistoryRecord)
+    _detailed_description: Optional[DetailedDescription] = field(default=None, init=False, repr=False, compare=False)
+    _review_record: Optional[ReviewRecord] = field(default=None, init=False, repr=False, compare=False)
+    _history_record: Optional[HistoryRecord] = field(default=None, init=False, repr=False, compare=False)
+    sort_key: tuple = field(default=UNPARSED_KEY, init=False, repr=False, compare=False)  # req_id的整数元组排序键（注册时计算）
     srs: List['SR'] = field(default_factory=list)
     
-    def __post_init__(self):
-        """初始化后自动注册到数据注册表"""
-        self.detailed_description.owner = self
-        self.review_record.owner = self
-        self.history_record.owner = self
-        pass
-
-    def create_ir_html_files(self):
-        """为当前IR创建HTML空文件"""
+    def plan_ir_html_paths(self):
+        """为当前IR规划HTML文件路径（只计算路径，目录和文件在渲染阶段创建）"""
         if not self.title:
-            print("IR title为空，无法创建文件")
+            print("IR title为空，无法规划文件路径")
             return
         
         # 构建目录路径
         ir_dir = os.path.join(config.BASE_DIR_NAME, config.REQ_DIR_NAME, self.title)
         
-        # 创建IR专属目录
-        if not os.path.exists(ir_dir):
-            os.makedirs(ir_dir)
-        
         # 设置文件路径
         self.html_file = os.path.join(ir_dir, f"{self.title}.html")
         self.req_table_html_file = os.path.join(ir_dir, f"{self.title}_table.html")
-        self.detailed_description.html_file = os.path.join(ir_dir, f"{self.title}描述.html")
-        self.review_record.html_file = os.path.join(ir_dir, f"{self.title}评审记录.html")
-        self.history_record.html_file = os.path.join(ir_dir, f"{self.title}修改记录.html")
-      
-        # 创建四个空文件
-        for file_path in [
-            self.html_file,
-            self.req_table_html_file,
-            self.detailed_description.html_file,
-            self.review_record.html_file,
-            self.history_record.html_file
-        ]:
-            try:
-                open(file_path, 'w', encoding='utf-8').close()
-                print(f"创建: {file_path}")
-            except Exception as e:
-                print(f"创建失败 {file_path}: {e}")
+        self._plan_sub_record_paths()
 
     #使用req_id对srs进行排序
     def sort_srs_by_req_id(self):
-        """按照req_id对srs列表进行排序"""
-        if not self.srs or len(self.srs) <= 1:
-            print(f"  SR列表为空或只有一个元素，无需排序")
-            return
-        
-        # 检查SR是否有req_id
-        srs_without_req_id = [sr for sr in self.srs if sr and not sr.req_id]
-        if srs_without_req_id:
-            print(f"  警告：{len(srs_without_req_id)}个SR没有req_id")
-        
-        def get_sort_key(sr):
-            """获取SR的排序键"""
-            if not sr or not sr.req_id:
-                return (999, 999, "zzz")  # 没有req_id的放在最后
-            
-            # 处理req_id格式：HLR_OS_01_02
-            parts = sr.req_id.split('_')
-            if len(parts) < 4:
-                return (999, 999, sr.req_id)  # 格式不正确的放在最后
-            
-            try:
-                # 解析数字部分
-                num1 = int(parts[2]) if parts[2].isdigit() else 0
-                num2 = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else 0
-                return (num1, num2, sr.req_id)
-            except (ValueError, IndexError):
-                return (999, 999, sr.req_id or "")
-        
-        # 使用稳定排序
-        self.srs.sort(key=get_sort_key)
-        
-        print(f"  SR排序完成，顺序如下：")
-        for i, sr in enumerate(self.srs, 1):
-            if sr:
-                print(f"    {i}. {sr.req_id or '无req_id'} - {sr.title[:30]}...")
-        
+        """按照req_id对srs列表进行排序（使用注册时缓存的sort_key，没有req_id或格式不正确的排在最后，稳定排序）"""
+        self.srs.sort(key=SORT_KEY)
         return True
 
 
@@ -2912,6 +1811,9 @@ class IR:
             
             # 设置详细描述
             self._set_detailed_description(detail)
+            intern_fields(self)
+            # 已注册时（如增量同步重新加载详情）更新二级索引
+            data_registry.reindex(self)
             
             # 从children字段创建SR
             children_str = detail.get("children", "")
@@ -2959,7 +1861,7 @@ class IR:
             print(f"  更新SR {i}/{len(self.srs)}: {sr.id}")
             if sr.load_detail_by_id():
                 success_count += 1
-                sr.create_sr_html_files()
+                sr.plan_sr_html_paths()
                 print(f"    ✓ 成功")
             else:
                 print(f"    ✗ 失败")
@@ -3003,13 +1905,8 @@ class IR:
         # 打印SR数量
         print(f"srs count: {len(self.srs)}")
 
-    def generate_html(self):
-        """
-        生成IR的HTML内容并保存到html_file指定的文件中
-        """
-        if not self.html_file:
-            return
-        
+    def _html_context(self) -> dict:
+        """构建IR页面的模板上下文（只包含字符串等可序列化的值，不引用其他节点对象）"""
         # 计算返回父需求的相对路径
         back_link = "#"
         if self.parent and self.parent.html_file:
@@ -3034,372 +1931,64 @@ class IR:
         parent_href = back_link
         parent_title = self.parent.title if (self.parent and self.parent.title) else "无"
         
-        # 生成SR链接HTML
-        sr_links_html = ""
+        # 生成SR链接
+        related_links = []
         for sr in self.srs:
             if sr.html_file and sr.title:  # 只处理有HTML文件和标题的SR
-                sr_relative_path = calculate_relative_path(self.html_file, sr.html_file)
-                sr_link = f"""
-            <div class="requirement-item">
-                <a href="{sr_relative_path}" class="requirement-link">{sr.title}</a>
-            </div>"""
-                sr_links_html += sr_link
-        
-        # 构建完整的HTML内容
-        html_content = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title}</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-            position: relative;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-
-
-        /* 返回链接样式1 */
-        .back-right-link {{
-            position: absolute;
-            top: 30px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式2 */
-        .back-right2-link {{
-            position: absolute;
-            top: 82px;
-            right: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-right2-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-
-        /* 返回链接样式3 */
-        .back-left-link {{
-            position: absolute;
-            top: 30px;
-            left: 40px;
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-            transition: all 0.3s;
-            z-index: 100;
-        }}
-        
-        .back-left-link:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-            text-decoration: none;
-        }}
-        
-        .section-title {{
-            font-size: 20px;
-            font-weight: bold;
-            color: #2c3e50;
-            margin: 25px 0 15px 0;
-            padding-bottom: 8px;
-            border-bottom: 2px solid #3498db;
-        }}
-        
-        .subsection-title {{
-            font-size: 16px;
-            font-weight: bold;
-            color: #34495e;
-            margin: 20px 0 10px 0;
-        }}
-        
-        /* 新的信息列表布局 */
-        .info-list {{
-            margin: 15px 0;
-        }}
-        
-        .info-row {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: center;
-        }}
-        
-        .info-row:last-child {{
-            border-bottom: none;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 140px;
-            flex-shrink: 0;
-        }}
-        
-        .info-value {{
-            color: #666;
-            flex: 1;
-        }}
-        
-        /* CM信息网格布局 - 一行两列 */
-        .cm-info-grid {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin: 15px 0;
-            position: relative;
-        }}
-        
-        .cm-info-grid::before {{
-            content: "";
-            position: absolute;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 1px;
-            height: 100%;
-            background-color: #e0e0e0;
-        }}
-        
-        .cm-column {{
-            display: flex;
-            flex-direction: column;
-        }}
-        
-        .link-group {{
-            display: flex;
-            gap: 30px;
-            margin: 20px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-        }}
-        
-        .link-item {{
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            transition: color 0.3s;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-        }}
-        
-        .link-item:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-        }}
-        
-        .requirement-list {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        
-        .requirement-item {{
-            margin: 8px 0;
-            padding: 8px 12px;
-            background-color: #f8f9fa;
-            border-radius: 4px;
-            border-left: 3px solid #3498db;
-        }}
-        
-        .requirement-link {{
-            color: #0066cc;
-            text-decoration: none;
-            transition: color 0.3s;
-            font-weight: 500;
-        }}
-        
-        .requirement-link:hover {{
-            color: #004499;
-            text-decoration: underline;
-        }}
-        
-        /* 需求详情样式 */
-        .requirement-detail {{
-            margin: 15px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-            border: 1px solid #e0e0e0;
-        }}
-    </style>
-</head>
-<body>
-          <!-- 返回链接 -->
-    <a href="{back_link}" class="back-right-link">返回父需求</a>
-    <div class="container">
-        <h1 style="text-align: center; color: #2c3e50; margin-bottom: 30px; font-size: 28px;">{self.title}</h1>
-        
-        <!-- 1. 基本信息 -->
-        <div class="section-title">1. 基本信息</div>
-    
-        <div class="info-list">
-            <div class="info-row">
-                <span class="info-label">需求级别：</span>
-                <span class="info-value">IR(高层)</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求ID：</span>
-                <span class="info-value">{self.req_id if self.req_id else "无"}</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求名称：</span>
-                <span class="info-value">{self.title}</span>
-            </div>
-        </div>
-        
-        <div class="section-title">2. 需求描述</div>
-        <div class="requirement-detail">
-            <a href="{desc_href}" class="link-item">详细描述</a>
-        </div>
-        
-        <!-- 3. CM信息 - 一行两列网格布局 -->
-        <div class="section-title">3. CM信息</div>
-        
-        <div class="cm-info-grid">
-            <!-- 左侧列 -->
-            <div class="cm-column">
-                <div class="info-list">
-                    <div class="info-row">
-                        <span class="info-label">提出人：</span>
-                        <span class="info-value">{self.creator if self.creator else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">状态：</span>
-                        <span class="info-value">{self.status if self.status else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开始时间：</span>
-                        <span class="info-value">{self.plan_start_date if self.plan_start_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开发结束：</span>
-                        <span class="info-value">{self.plan_dev_end_date if self.plan_dev_end_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划工时：</span>
-                        <span class="info-value">{self.workload} 人天</span>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- 右侧列 -->
-            <div class="cm-column">
-                <div class="info-list">
-                      <div class="info-row">
-                        <span class="info-label">负责人：</span>
-                        <span class="info-value">{self.assignee if self.assignee else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">领域：</span>
-                        <span class="info-value">{self.domain_value if self.domain_value else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划完成时间：</span>
-                        <span class="info-value">{self.plan_end_date if self.plan_end_date else "无"}</span>
-                    </div>
-                    
-                    <div class="info-row">
-                        <span class="info-label">计划测试结束：</span>
-                        <span class="info-value">{self.plan_test_end_date if self.plan_test_end_date else "无"}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">实际工时：</span>
-                        <span class="info-value">{self.act_workload} 人天</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- 评审和修改记录链接 -->
-        <div class="link-group">
-            <a href="{review_href}" class="link-item">评审记录</a>
-            <a href="{history_href}" class="link-item">修改记录</a>
-        </div>
-        
-        <!-- 4. 关联项 -->
-        <div class="section-title">4. 关联项</div>
-        
-        <div class="subsection-title">4.1 上一层级需求(SF级)：</div>
-        <div class="requirement-list">
-            <div class="requirement-item">
-                <a href="{parent_href}" class="requirement-link">{parent_title}</a>
-            </div>
-        </div>
-        
-        <div class="subsection-title">4.2 下一层级需求(SR级)：</div>
-        <div class="requirement-list">
-            {sr_links_html if sr_links_html else '<div class="requirement-item">无</div>'}
-        </div>
-    </div>
-</body>
-</html>'''
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成IR HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
+                related_links.append({
+                    "href": calculate_relative_path(self.html_file, sr.html_file),
+                    "title": sr.title
+                })
+        
+        return {
+            "title": self.title,
+            "css_link": stylesheet_link("requirement", self.html_file),
+            "back_link": back_link,
+            "root_link": "",
+            "level_label": "IR(高层)",
+            "req_id": self.req_id,
+            "desc_href": desc_href,
+            "creator": self.creator,
+            "status": self.status,
+            "plan_start_date": self.plan_start_date,
+            "plan_dev_end_date": self.plan_dev_end_date,
+            "workload": self.workload,
+            "assignee": self.assignee,
+            "domain_value": self.domain_value,
+            "plan_end_date": self.plan_end_date,
+            "plan_test_end_date": self.plan_test_end_date,
+            "act_workload": self.act_workload,
+            "review_href": review_href,
+            "history_href": history_href,
+            "parent_heading": "上一层级需求(SF级)",
+            "parent_href": parent_href,
+            "parent_title": parent_title,
+            "related_heading": "下一层级需求(SR级)",
+            "related_links": related_links
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建IR页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file:
+            return None
+        
+        return RenderJob("requirement.html", self._html_context(), self.html_file, "IR页面")
 
-    def generate_req_table_html(self):
+    def generate_html(self):
         """
-        生成IR-SR需求表HTML文件，并保存到req_table_html_file指定的路径
+        生成IR的HTML内容并保存到html_file指定的文件中
         """
+        render_now(self._render_job())
+
+    def _table_render_job(self) -> Optional[RenderJob]:
+        """构建IR-SR需求表的渲染任务，缺少必要信息时返回None"""
         if not self.req_table_html_file:
             print("错误: IR的req_table_html_file未设置")
-            return
+            return None
         
         if not self.html_file:
             print("错误: IR的html_file未设置，无法计算相对路径")
-            return
+            return None
         
         # 计算IR文件的相对路径
         ir_relative_path = calculate_relative_path(self.req_table_html_file, self.html_file)
@@ -3407,18 +1996,15 @@ class IR:
         # 生成SR行HTML
         sr_rows_html = self._generate_sr_rows(ir_relative_path)
         
-        # 构建完整的HTML内容
-        html_content = self._build_ir_sr_table_html(ir_relative_path, sr_rows_html)
-        
-        # 写入文件
-        try:
-            with open(self.req_table_html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成IR-SR需求表HTML文件: {self.req_table_html_file}")
-            
-        except Exception as e:
-            print(f"写入IR-SR需求表HTML文件失败: {e}")
-    
+        return RenderJob("req_table.html", self._build_ir_sr_table_context(ir_relative_path, sr_rows_html),
+                         self.req_table_html_file, "IR-SR需求表")
+
+    def generate_req_table_html(self):
+        """
+        生成IR-SR需求表HTML文件，并保存到req_table_html_file指定的路径
+        """
+        render_now(self._table_render_job())
+
     def _generate_sr_rows(self, ir_relative_path: str) -> str:
         """生成SR行的HTML"""
         if not self.srs:
@@ -3427,7 +2013,7 @@ class IR:
                     <td class="ir-cell" rowspan="1">
                         <a href="{ir_relative_path}" target="_blank">{self.title}</a>
                     </td>
-                    <td colspan="2" style="text-align: center; color: #7f8c8d; font-style: italic;">
+                    <td colspan="3" style="text-align: center; color: #7f8c8d; font-style: italic;">
                         暂无SR级需求
                     </td>
                 </tr>'''
@@ -3448,6 +2034,9 @@ class IR:
             # 获取SR的标题
             sr_title = sr.title if sr.title else "无名称"
             
+            # SR下所有AR关联的测试用例数
+            test_case_count = sum(len(ar.test_cases) for ar in sr.ars)
+            
             # 如果是第一行，包含IR单元格
             if i == 0:
                 row = f'''
@@ -3457,147 +2046,35 @@ class IR:
                     </td>
                     <td><a href="{sr_table_href}" target="_blank">{sr.req_id}</a></td>
                     <td><a href="{sr_detail_href}" target="_blank">{sr_title}</a></td>
+                    <td><a href="{sr_table_href}" target="_blank">{test_case_count}</a></td>
                 </tr>'''
             else:
                 row = f'''
                 <tr>
                     <td><a href="{sr_table_href}" target="_blank">{sr.req_id}</a></td>
                     <td><a href="{sr_detail_href}" target="_blank">{sr_title}</a></td>
+                    <td><a href="{sr_table_href}" target="_blank">{test_case_count}</a></td>
                 </tr>'''
             
             rows_html += row
         
         return rows_html
     
-    def _build_ir_sr_table_html(self, ir_relative_path: str, sr_rows_html: str) -> str:
-        """构建IR-SR表格HTML文档"""
-        return f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title} IR-SR需求表</title>
-    <style>
-        * {{
-            box-sizing: border-box;
-            margin: 0;
-            padding: 0;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background-color: #f5f7fa;
-            padding: 40px 20px;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh;
-        }}
-        
-        .container {{
-            max-width: 800px;
-            width: 100%;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
-            padding: 30px;
-        }}
-        
-        h1 {{
-            text-align: center;
-            margin-bottom: 25px;
-            color: #2c3e50;
-            font-weight: 600;
-            font-size: 24px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #eaeaea;
-        }}
-        
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 0 auto;
-            border: 1px solid #ddd;
-        }}
-        
-        th {{
-            background-color: #3498db;
-            color: white;
-            font-weight: 500;
-            padding: 14px 16px;
-            text-align: center;
-            border-right: 1px solid #2c81ba;
-        }}
-        
-        th:last-child {{
-            border-right: none;
-        }}
-        
-        td {{
-            padding: 12px 16px;
-            text-align: center;
-            border-bottom: 1px solid #eaeaea;
-            border-right: 1px solid #eaeaea;
-        }}
-        
-        td:last-child {{
-            border-right: none;
-        }}
-        
-        tr:nth-child(even) {{
-            background-color: #f8fafc;
-        }}
-        
-        tr:hover {{
-            background-color: #f0f7ff;
-        }}
-        
-        .ir-cell {{
-            background-color: #e0f2fe;
-            font-weight: 500;
-            vertical-align: middle;
-            color: #1e3a8a;
-        }}
-        
-        a {{
-            color: #2980b9;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 4px 8px;
-            border-radius: 4px;
-            transition: all 0.2s ease;
-        }}
-        
-        a:hover {{
-            background-color: #3498db;
-            color: white;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>{self.title} IR-SR需求表</h1>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th>IR</th>
-                    <th>SR-高层需求ID</th>
-                    <th>SR-需求名称</th>
-                </tr>
-            </thead>
-            <tbody>
-{sr_rows_html}
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>'''
-
-@dataclass
-class SF:
+    def _build_ir_sr_table_context(self, ir_relative_path: str, sr_rows_html: str) -> dict:
+        """构建IR-SR表格模板上下文"""
+        return {
+            "title": f"{self.title} IR-SR需求表",
+            "css_link": stylesheet_link("ir_table", self.req_table_html_file),
+            "parent_level": "IR",
+            "child_level": "SR",
+            "child_id_label": "高层需求ID",
+            "extra_heading": "测试用例数",
+            "rows_html": sr_rows_html
+        }
+
+
+@dataclass(slots=True)
+class SF(SubRecordOwner):
     """SF (Service Function) - 最顶层"""
     id: str = ""
     req_id: str = ""
@@ -3612,127 +2089,48 @@ class SF:
     html_file: str = ""
     req_navga_html_file: str = ""
     req_table_html_file: str = ""
-    detailed_description: DetailedDescription = field(default_factory=DetailedDescription)
-    review_record: ReviewRecord = field(default_factory=ReviewRecord)
-    history_record: HistoryRecord = field(default_factory=HistoryRecord)
+    search_html_file: str = ""
+    _detailed_description: Optional[DetailedDescription] = field(default=None, init=False, repr=False, compare=False)
+    _review_record: Optional[ReviewRecord] = field(default=None, init=False, repr=False, compare=False)
+    _history_record: Optional[HistoryRecord] = field(default=None, init=False, repr=False, compare=False)
     irs: List[IR] = field(default_factory=list)
     
-    def __post_init__(self):
-        """初始化后自动注册到数据注册表"""
-        self.detailed_description.owner = self
-        self.review_record.owner = self
-        self.history_record.owner = self
-        pass
-
-    def create_sf_html_files(self):
-        """为当前SF创建HTML空文件，路径：verifymaterial/requirement/"""
-        import os
-        
+    def plan_sf_html_paths(self):
+        """为当前SF规划HTML文件路径，路径：verifymaterial/requirement/（目录和文件在渲染阶段创建）"""
         # 构建完整路径
-        base_dir = config.BASE_DIR_NAME
-        requirement_dir = os.path.join(base_dir, config.REQ_DIR_NAME)
-        
-        # 创建verifymaterial目录（如果不存在）
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir)
-            print(f"创建目录: {base_dir}")
-        
-        # 创建requirement目录（如果不存在）
-        if not os.path.exists(requirement_dir):
-            os.makedirs(requirement_dir)
-            print(f"创建目录: {requirement_dir}")
+        requirement_dir = os.path.join(config.BASE_DIR_NAME, config.REQ_DIR_NAME)
         
         # 设置文件路径
         self.html_file = os.path.join(requirement_dir, "SF.html")
         self.req_table_html_file = os.path.join(requirement_dir, f"{self.title}_table.html")
         self.req_navga_html_file = os.path.join(requirement_dir, "需求导航.html")
-        self.detailed_description.html_file = os.path.join(requirement_dir, "SF描述.html")
-        self.review_record.html_file = os.path.join(requirement_dir, "SF评审记录.html")
-        self.history_record.html_file = os.path.join(requirement_dir, "SF修改记录.html")
-        
-        # 创建空文件
-        files_to_create = [
-            ("SF.html", self.html_file),
-            ("SF_IR_table.html", self.req_table_html_file),
-            ("需求导航.html", self.req_navga_html_file),
-            ("SF描述.html", self.detailed_description.html_file),
-            ("SF评审记录.html", self.review_record.html_file),
-            ("SF修改记录.html", self.history_record.html_file)
-        ]
-        
-        for file_name, file_path in files_to_create:
-            try:
-                with open(file_path, 'w', encoding='utf-8'):
-                    pass  # 创建空文件
-                print(f"创建空文件: {file_path}")
-            except Exception as e:
-                print(f"创建文件 {file_name} 失败: {e}")
+        self.search_html_file = os.path.join(requirement_dir, "需求搜索.html")
+        self._plan_sub_record_paths()
 
     #使用req_id对irs进行排序
     def sort_irs_by_req_id(self):
-        """按照req_id对irs列表进行排序"""
-        if not self.irs or len(self.irs) <= 1:
-            print("  IR列表为空或只有一个元素，无需排序")
-            return
-        
-        # 检查IR是否有req_id
-        irs_without_req_id = [ir for ir in self.irs if ir and not ir.req_id]
-        if irs_without_req_id:
-            print(f"  警告：{len(irs_without_req_id)}个IR没有req_id")
-        
-        def get_sort_key(ir):
-            """获取IR的排序键"""
-            if not ir or not ir.req_id:
-                return (999, "zzz")  # 没有req_id的放在最后
-            
-            # 处理req_id格式：HLR_OS_01
-            parts = ir.req_id.split('_')
-            if len(parts) < 3:
-                return (999, ir.req_id)  # 格式不正确的放在最后
-            
-            try:
-                # 解析数字部分
-                num1 = int(parts[2]) if parts[2].isdigit() else 0
-                return (num1, ir.req_id)
-            except (ValueError, IndexError):
-                return (999, ir.req_id or "")
-        
-        # 使用稳定排序
-        self.irs.sort(key=get_sort_key)
-        
-        print(f"  IR排序完成，顺序如下：")
-        for i, ir in enumerate(self.irs, 1):
-            if ir:
-                print(f"    {i}. {ir.req_id or '无req_id'} - {ir.title[:30]}...")
-        
+        """按照req_id对irs列表进行排序（使用注册时缓存的sort_key，没有req_id或格式不正确的排在最后，稳定排序）"""
+        self.irs.sort(key=SORT_KEY)
         return True
 
     #对整个IR，SR，AR列表进行排序
     def _sort_all_hierarchy_after_ars_updated(self):
-        """在所有AR更新完成后，排序整个层级"""
-        print(f"\n" + "-"*60)
-        print(f"开始排序SF '{self.title}' 的所有层级...")
-        print("-"*60)
-        
-        # 1. 先排序IR（此时IR的req_id应该已经被AR推导出来了）
-        if self.irs:
-            print(f"1. 排序IR列表 ({len(self.irs)}个)")
-            self.sort_irs_by_req_id()
-            
-            # 2. 对每个已排序的IR，排序其SR
-            for ir in self.irs:
-                if ir and ir.srs:
-                    print(f"\n2. 排序IR '{ir.title[:20]}...' 的SR列表 ({len(ir.srs)}个)")
-                    ir.sort_srs_by_req_id()
-                    
-                    # 3. 对每个已排序的SR，排序其AR
-                    for sr in ir.srs:
-                        if sr and sr.ars:
-                            print(f"3. 排序SR '{sr.title[:20]}...' 的AR列表 ({len(sr.ars)}个)")
-                            sr.sort_ars_by_req_id()  # 直接调用SR的排序方法
-        
-        print(f"\nSF '{self.title}' 的所有层级排序完成")
-        print("-"*60)
+        """在所有AR更新完成后，排序整个层级（一次遍历，按各节点注册时缓存的sort_key排序，不再解析字符串）"""
+        start_time = time.time()
+        node_count = len(self.irs)
+        without_req_id = 0
+        self.sort_irs_by_req_id()
+        for ir in self.irs:
+            ir.sort_srs_by_req_id()
+            node_count += len(ir.srs)
+            for sr in ir.srs:
+                sr.sort_ars_by_req_id()
+                node_count += len(sr.ars)
+                without_req_id += sum(1 for ar in sr.ars if ar.sort_key == UNPARSED_KEY)
+        
+        print(f"\nSF '{self.title}' 的所有层级排序完成（{node_count} 个节点，耗时 {time.time() - start_time:.3f} 秒）")
+        if without_req_id:
+            print(f"  警告：{without_req_id}个AR没有可解析的req_id，已排在所属SR的最后")
 
     def load_sf_by_keyword(self) -> bool:
         """通过关键词加载完整SF信息（从配置读取关键词）"""
@@ -3744,7 +2142,7 @@ class SF:
         if not self._load_detail_by_id():
             return False
         
-        self.create_sf_html_files()
+        self.plan_sf_html_paths()
         return True
     
     def _search_by_keyword(self) -> bool:
@@ -3851,7 +2249,7 @@ class SF:
             if ir.load_detail_by_id():
                 success_count += 1
                 print(f"    ✓ 成功")
-                ir.create_ir_html_files()
+                ir.plan_ir_html_paths()
             else:
                 print(f"    ✗ 失败")
         
@@ -3901,6 +2299,14 @@ class SF:
         print(f"\nAR详情更新完成: {success_count}/{total_ars} 个成功")
         self._sort_all_hierarchy_after_ars_updated()
         return success_count > 0
+
+    def update_all_hierarchy(self, max_workers: int = None, batch_size: int = None, loader: str = None) -> bool:
+        """
+        并发更新SF下所有IR、SR、AR的详细信息（替代依次调用update_all_irs/srs/ars）
+
+        loader: 加载方式 thread/async，默认使用config.HIERARCHY_LOADER
+        """
+        return create_hierarchy_loader(self, max_workers, batch_size, loader).load()
     
     def add_ir(self, ir: IR):
         """添加IR"""
@@ -3930,297 +2336,192 @@ class SF:
         # 打印IR数量
         print(f"irs count: {len(self.irs)}")
 
-    def generate_html(self):
-        """
-        生成SF的HTML内容并保存到html_file指定的文件中
-        """
-        if not self.html_file:
-            print("错误: SF的html_file未设置")
-            return
-        
+    def _html_context(self) -> dict:
+        """构建SF页面的模板上下文（只包含字符串等可序列化的值，不引用其他节点对象）"""
         # 计算各个关联文件的相对路径
         desc_relative_path = calculate_relative_path(self.html_file, self.detailed_description.html_file)
         review_relative_path = calculate_relative_path(self.html_file, self.review_record.html_file)
         history_relative_path = calculate_relative_path(self.html_file, self.history_record.html_file)
         
-        # 生成IR链接HTML
-        ir_links_html = ""
+        # 生成IR链接
+        related_links = []
         for ir in self.irs:
             if ir.html_file and ir.title:  # 只处理有HTML文件和标题的IR
-                ir_relative_path = calculate_relative_path(self.html_file, ir.html_file)
-                ir_link = f"""
-            <div class="requirement-item">
-                <a href="{ir_relative_path}" class="requirement-link">{ir.title}</a>
-            </div>"""
-                ir_links_html += ir_link
+                related_links.append({
+                    "href": calculate_relative_path(self.html_file, ir.html_file),
+                    "title": ir.title
+                })
         
         # 为空的路径设置默认值
         desc_href = desc_relative_path if desc_relative_path else "#"
         review_href = review_relative_path if review_relative_path else "#"
         history_href = history_relative_path if history_relative_path else "#"
         
-        # 构建完整的HTML内容
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title}</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f8f9fa;
-        }}
-        
-        .container {{
-            background-color: white;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        
-        .section-title {{
-            font-size: 20px;
-            font-weight: bold;
-            color: #2c3e50;
-            margin: 25px 0 15px 0;
-            padding-bottom: 8px;
-            border-bottom: 2px solid #3498db;
-        }}
-        
-        .subsection-title {{
-            font-size: 16px;
-            font-weight: bold;
-            color: #34495e;
-            margin: 20px 0 10px 0;
-        }}
-        
-        /* 新的信息列表布局 */
-        .info-list {{
-            margin: 15px 0;
-        }}
-        
-        .info-row {{
-            display: flex;
-            padding: 12px 0;
-            border-bottom: 1px solid #ecf0f1;
-            align-items: center;
-        }}
-        
-        .info-row:last-child {{
-            border-bottom: none;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 140px;
-            flex-shrink: 0;
-        }}
-        
-        .info-value {{
-            color: #666;
-            flex: 1;
-        }}
-        
-        /* 两列信息组 */
-        .info-group {{
-            display: flex;
-            gap: 40px;
-            margin: 15px 0;
-        }}
-        
-        .info-column {{
-            flex: 1;
-        }}
-        
-        .link-group {{
-            display: flex;
-            gap: 30px;
-            margin: 20px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-        }}
-        
-        .link-item {{
-            color: #0066cc;
-            text-decoration: none;
-            font-weight: 500;
-            transition: color 0.3s;
-            padding: 8px 16px;
-            border: 1px solid #e0e0e0;
-            border-radius: 4px;
-            background-color: white;
-        }}
-        
-        .link-item:hover {{
-            color: #004499;
-            background-color: #f0f7ff;
-            border-color: #0066cc;
-        }}
-        
-        .requirement-list {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        
-        .requirement-item {{
-            margin: 8px 0;
-            padding: 8px 12px;
-            background-color: #f8f9fa;
-            border-radius: 4px;
-            border-left: 3px solid #3498db;
-        }}
-        
-        .requirement-link {{
-            color: #0066cc;
-            text-decoration: none;
-            transition: color 0.3s;
-            font-weight: 500;
-        }}
-        
-        .requirement-link:hover {{
-            color: #004499;
-            text-decoration: underline;
-        }}
-        
-        /* 需求详情样式 */
-        .requirement-detail {{
-            margin: 15px 0;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 6px;
-            border: 1px solid #e0e0e0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1 style="text-align: center; color: #2c3e50; margin-bottom: 30px;">{self.title}</h1>
-        
-        <!-- 1. 基本信息 -->
-        <div class="section-title">1. 基本信息</div>
-    
-        <div class="info-list">
-            <div class="info-row">
-                <span class="info-label">需求级别：</span>
-                <span class="info-value">SF(系统级)</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求ID：</span>
-                <span class="info-value">无</span>
-            </div>
-            <div class="info-row">
-                <span class="info-label">需求名称：</span>
-                <span class="info-value">{self.title}</span>
-            </div>
-        </div>
-        
-        <div class="section-title">2. 需求描述</div>
-        <div class="requirement-detail">
-            <a href="{desc_href}" class="link-item">详细描述</a>
-        </div>
-        
-        <!-- 3. CM信息 - 使用两列布局 -->
-        <div class="section-title">3. CM信息</div>
-        
-        <div class="info-group">
-            <div class="info-column">
-                <div class="info-list">
-                    <div class="info-row">
-                        <span class="info-label">责任人：</span>
-                        <span class="info-value">{self.assignee}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划开始时间：</span>
-                        <span class="info-value">{self.plan_start_date}</span>
-                    </div>
-                </div>
-            </div>
-            <div class="info-column">
-                <div class="info-list">
-                    <div class="info-row">
-                        <span class="info-label">计划工时：</span>
-                        <span class="info-value">{self.workload}</span>
-                    </div>
-                    <div class="info-row">
-                        <span class="info-label">计划结束时间：</span>
-                        <span class="info-value">{self.plan_end_date}</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- 评审和修改记录链接 -->
-        <div class="link-group">
-            <a href="{review_href}" class="link-item">评审记录</a>
-            <a href="{history_href}" class="link-item">修改记录</a>
-        </div>
-        
-        <!-- 4. 关联项 -->
-        <div class="section-title">4. 关联项</div>
-        
-        <div class="subsection-title">4.1 上一层级需求：</div>
-        <div class="requirement-list">
-            <div class="requirement-item">
-                <a href="upper-level-requirement.html" class="requirement-link">无</a>
-            </div>
-        </div>
-        
-        <div class="subsection-title">4.2 下一层级需求(IR级)：</div>
-        <div class="requirement-list">
-            {ir_links_html if ir_links_html else '<div class="requirement-item">无</div>'}
-        </div>
-    </div>
-</body>
-</html>"""
-        
-        # 将HTML内容写入文件
-        try:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成SF HTML文件: {self.html_file}")
-        except Exception as e:
-            print(f"写入HTML文件失败: {e}")
+        return {
+            "title": self.title,
+            "css_link": stylesheet_link("sf", self.html_file),
+            "level_label": "SF(系统级)",
+            "req_id": "",
+            "desc_href": desc_href,
+            "assignee": self.assignee,
+            "plan_start_date": self.plan_start_date,
+            "workload": self.workload,
+            "plan_end_date": self.plan_end_date,
+            "review_href": review_href,
+            "history_href": history_href,
+            "parent_heading": "上一层级需求",
+            "parent_href": "upper-level-requirement.html",
+            "parent_title": "无",
+            "related_heading": "下一层级需求(IR级)",
+            "related_links": related_links
+        }
+
+    def _render_job(self) -> Optional[RenderJob]:
+        """构建SF页面的渲染任务，缺少必要信息时返回None"""
+        if not self.html_file:
+            print("错误: SF的html_file未设置")
+            return None
+        
+        return RenderJob("sf.html", self._html_context(), self.html_file, "SF页面")
 
-    def generate_req_navigation_html(self):
+    def generate_html(self):
         """
-        生成SF的需求导航HTML文件，并保存到req_navga_html_file指定的路径
+        生成SF的HTML内容并保存到html_file指定的文件中
         """
+        render_now(self._render_job())
+
+    def _navigation_render_job(self) -> Optional[RenderJob]:
+        """构建需求导航页面的渲染任务，缺少必要信息时返回None"""
         if not self.req_navga_html_file:
             print("错误: SF的req_navga_html_file未设置")
-            return
+            return None
         
         if not self.html_file:
             print("错误: SF的html_file未设置，无法计算相对路径")
-            return
+            return None
         
         # 计算SF节点自身的相对路径（从导航文件到SF详情文件）
         sf_relative_path = calculate_relative_path(self.req_navga_html_file, self.html_file)
         
-        # 生成完整的HTML内容
-        html_content = self._build_navigation_html(sf_relative_path)
-        
-        # 写入文件
-        try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.req_navga_html_file), exist_ok=True)
-            
-            with open(self.req_navga_html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成需求导航HTML文件: {self.req_navga_html_file}")
-            
-        except Exception as e:
-            print(f"写入需求导航HTML文件失败: {e}")
-    
-    def _build_navigation_html(self, sf_relative_path: str) -> str:
-        """构建完整的导航HTML文档"""
+        return RenderJob("navigation.html", self._build_navigation_context(sf_relative_path),
+                         self.req_navga_html_file, "需求导航")
+
+    def _navigation_render_jobs(self) -> List[RenderJob]:
+        """按config.NAVIGATION_MODE构建需求导航的渲染任务"""
+        if config.NAVIGATION_MODE == NAVIGATION_LAZY:
+            return self._lazy_navigation_render_jobs()
+        job = self._navigation_render_job()
+        return [job] if job else []
+
+    def generate_req_navigation_html(self):
+        """
+        生成SF的需求导航HTML文件，并保存到req_navga_html_file指定的路径
+        """
+        results = [render_now(job, save_manifest=False) for job in self._navigation_render_jobs()]
+        build_manifest.save()
+        self.remove_stale_nav_chunks([result for result in results if result])
+
+    def _lazy_navigation_render_jobs(self) -> List[RenderJob]:
+        """
+        构建懒加载需求导航的渲染任务：外壳页面、SF数据块（IR列表）和每个IR一个数据块（SR及其AR）
+
+        外壳页面只包含SF节点，大小与需求数量无关；数据块是调用navChunkLoaded(id, JSON)的脚本，
+        放在需求导航页面同级的NAV_DATA_DIR_NAME目录中，链接都相对需求导航页面计算。
+        数据块名和URL中保存的展开状态使用需求id（见_nav_key），需求增删或顺序变化后已保存的链接仍指向原来的需求；
+        已删除IR的数据块在渲染完成后由remove_stale_nav_chunks删除，这里只构建任务。
+        """
+        if not self.req_navga_html_file:
+            print("错误: SF的req_navga_html_file未设置")
+            return []
+
+        if not self.html_file:
+            print("错误: SF的html_file未设置，无法计算相对路径")
+            return []
+
+        nav_file = self.req_navga_html_file
+        data_dir = os.path.join(os.path.dirname(nav_file), config.NAV_DATA_DIR_NAME)
+        jobs = [RenderJob("navigation_lazy.html", {
+            "title": f"{self.title} 需求导航",
+            "css_link": stylesheet_link("navigation", nav_file),
+            "sf_title": self.title,
+            "sf_href": calculate_relative_path(nav_file, self.html_file),
+            "root_chunk": "sf",
+            "search_href": self._search_href(),
+            "data_dir": json.dumps(config.NAV_DATA_DIR_NAME, ensure_ascii=False)
+        }, nav_file, "需求导航")]
+
+        ir_items = []
+        for ir in self.irs:
+            if not ir.title or not ir.html_file:
+                continue
+            key = _nav_key("ir", ir)
+            ir_items.append({"key": key, "chunk": key, "title": ir.title,
+                             "href": calculate_relative_path(nav_file, ir.html_file)})
+            jobs.append(self._nav_chunk_job(data_dir, key, {"srs": self._lazy_sr_items(ir)}))
+        jobs.append(self._nav_chunk_job(data_dir, "sf", {"irs": ir_items}))
+        return jobs
+
+    def _lazy_sr_items(self, ir: 'IR') -> List[dict]:
+        """IR数据块中的SR列表（每个SR带上其AR列表，有测试用例的AR带上测试用例列表）"""
+        nav_file = self.req_navga_html_file
+        sr_items = []
+        for sr in ir.srs:
+            if not sr.title or not sr.html_file:
+                continue
+            ar_items = []
+            for ar in sr.ars:
+                if not ar.title or not ar.html_file:
+                    continue
+                ar_item = {"title": ar.title, "href": calculate_relative_path(nav_file, ar.html_file)}
+                tc_items = [{"title": f"{test_case.number} {test_case.name}",
+                             "href": calculate_relative_path(nav_file, test_case.html_file)}
+                            for test_case in ar.test_cases if test_case.html_file]
+                if tc_items:
+                    # 有测试用例的AR可以展开，测试用例列表随IR数据块一起到达
+                    ar_item.update({"key": _nav_key("ar", ar), "tests": tc_items})
+                ar_items.append(ar_item)
+            sr_items.append({"key": _nav_key("sr", sr), "title": sr.title,
+                             "href": calculate_relative_path(nav_file, sr.html_file), "ars": ar_items})
+        return sr_items
+
+    @staticmethod
+    def remove_stale_nav_chunks(results: list):
+        """
+        导航数据块渲染完成后，删除以前生成、现在不再需要的数据块及其预压缩文件（只删除构建清单中记录的文件）
+
+        results: 本次的渲染结果；其中没有导航数据块（未重新生成导航或inline模式）或有数据块渲染失败时不删除
+        """
+        chunk_results = [result for result in results if result.label == NAV_CHUNK_LABEL]
+        if not chunk_results or any(result.error for result in chunk_results):
+            return
+        data_dir = os.path.dirname(chunk_results[0].output_file)
+        output_files = {result.output_file for result in chunk_results}
+        if not os.path.isdir(data_dir):
+            return
+        removed = 0
+        for name in os.listdir(data_dir):
+            path = os.path.join(data_dir, name)
+            stem, ext = os.path.splitext(path)
+            source_file = stem if ext[1:] in COMPRESSORS else path
+            if source_file in output_files or not build_manifest.get(path):
+                continue
+            os.remove(path)
+            removed += 1
+        if removed:
+            build_manifest.save()
+            print(f"删除不再使用的需求导航数据块: {removed} 个文件")
+
+    @staticmethod
+    def _nav_chunk_job(data_dir: str, chunk_id: str, data: dict) -> RenderJob:
+        """导航数据块的渲染任务"""
+        return RenderJob("data_chunk.js", {
+            "callback": "navChunkLoaded",
+            "chunk_id": json.dumps(chunk_id),
+            "payload": json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        }, os.path.join(data_dir, f"{chunk_id}.js"), NAV_CHUNK_LABEL)
+
+    def _build_navigation_context(self, sf_relative_path: str) -> dict:
+        """构建需求导航页面的模板上下文"""
         # 生成SF节点的HTML（开始部分）
         sf_node_start = f'''
             <div class="node">
@@ -4239,11 +2540,18 @@ class SF:
                 </div>
             </div>'''
         
-        # 返回完整的HTML文档
-        return self._get_html_template().format(
-            title=f"{self.title} 需求导航",
-            sf_node=complete_sf_node
-        )
+        return {
+            "title": f"{self.title} 需求导航",
+            "css_link": stylesheet_link("navigation", self.req_navga_html_file),
+            "search_href": self._search_href(),
+            "sf_node": complete_sf_node
+        }
+
+    def _search_href(self) -> str:
+        """需求导航页面到需求搜索页面的链接（不生成搜索索引时为空）"""
+        if not config.SEARCH_INDEX or not self.search_html_file:
+            return ""
+        return calculate_relative_path(self.req_navga_html_file, self.search_html_file)
     
     def _generate_children_hierarchy(self) -> str:
         """生成IR-SR-AR层级结构的HTML"""
@@ -4333,320 +2641,61 @@ class SF:
             # 计算AR的相对路径
             ar_relative_path = calculate_relative_path(self.req_navga_html_file, ar.html_file)
             
-            # 生成AR节点
-            ar_node = f'''
+            # 生成测试用例子节点（没有测试用例的AR不显示展开箭头）
+            tc_children = self._generate_test_case_children(ar)
+            if not tc_children:
+                ar_node = f'''
                                     <div class="node">
                                         <div class="node-content">
                                             <span class="level-badge level-ar">AR</span>
                                             <a href="{ar_relative_path}" class="node-link" target="_blank">{ar.title}</a>
                                         </div>
                                     </div>'''
+            else:
+                ar_node = f'''
+                                    <div class="node">
+                                        <div class="node-content">
+                                            <span class="level-badge level-ar">AR</span>
+                                            <a href="{ar_relative_path}" class="node-link" target="_blank">{ar.title}</a>
+                                            <div class="toggle">▶</div>
+                                        </div>
+                                        <div class="children">{tc_children}
+                                        </div>
+                                    </div>'''
             ar_children += ar_node
         
         return ar_children
     
-    def _get_html_template(self) -> str:
-        """返回HTML模板"""
-        return '''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background-color: #f5f7fa;
-            padding: 20px;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 20px rgba(0,0,0,0.1);
-            padding: 30px;
-        }}
-        
-        h1 {{
-            text-align: center;
-            color: #2c3e50;
-            margin-bottom: 30px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid #3498db;
-        }}
-        
-        .description {{
-            background-color: #e8f4fd;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 30px;
-            border-left: 4px solid #3498db;
-        }}
-        
-        .traceability-tree {{
-            margin-top: 30px;
-        }}
-        
-        .node {{
-            margin: 10px 0;
-            position: relative;
-        }}
-        
-        .node-content {{
-            display: flex;
-            align-items: center;
-            padding: 12px 15px;
-            background-color: white;
-            border-radius: 6px;
-            border: 1px solid #e1e8ed;
-            transition: all 0.3s;
-            cursor: pointer;
-        }}
-        
-        .node-content:hover {{
-            background-color: #f0f7ff;
-            border-color: #3498db;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(52, 152, 219, 0.2);
-        }}
-        
-        .toggle {{
-            width: 24px;
-            height: 24px;
-            margin-left: 10px;
-            border-radius: 50%;
-            background-color: #3498db;
-            color: white;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            cursor: pointer;
-            font-size: 14px;
-            transition: all 0.3s;
-            flex-shrink: 0;
-        }}
-        
-        .toggle:hover {{
-            background-color: #2980b9;
-            transform: scale(1.1);
-        }}
-        
-        .node-link {{
-            color: #2c3e50;
-            text-decoration: none;
-            font-weight: 500;
-            flex-grow: 1;
-        }}
-        
-        .node-link:hover {{
-            color: #3498db;
-        }}
-        
-        .level-badge {{
-            display: inline-block;
-            padding: 3px 8px;
-            border-radius: 12px;
-            font-size: 12px;
-            font-weight: bold;
-            margin-right: 10px;
-            color: white;
-            flex-shrink: 0;
-        }}
-        
-        .level-sf {{
-            background-color: #e74c3c;
-        }}
-        
-        .level-ir {{
-            background-color: #3498db;
-        }}
-        
-        .level-sr {{
-            background-color: #2ecc71;
-        }}
-        
-        .level-ar {{
-            background-color: #f39c12;
-        }}
-        
-        .children {{
-            margin-left: 30px;
-            display: none;
-            border-left: 2px dashed #bdc3c7;
-            padding-left: 20px;
-        }}
-        
-        .children.show {{
-            display: block;
-        }}
-        
-        .empty-message {{
-            color: #7f8c8d;
-            font-style: italic;
-            padding: 10px 0;
-        }}
-        
-        .action-buttons {{
-            display: flex;
-            gap: 15px;
-            margin-top: 20px;
-        }}
-        
-        .btn {{
-            padding: 10px 20px;
-            border: none;
-            border-radius: 5px;
-            cursor: pointer;
-            font-weight: 500;
-            transition: all 0.3s;
-        }}
-        
-        .btn-expand {{
-            background-color: #3498db;
-            color: white;
-        }}
-        
-        .btn-expand:hover {{
-            background-color: #2980b9;
-        }}
-        
-        .btn-collapse {{
-            background-color: #95a5a6;
-            color: white;
-        }}
-        
-        .btn-collapse:hover {{
-            background-color: #7f8c8d;
-        }}
-        
-        .legend {{
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            margin-top: 30px;
-            flex-wrap: wrap;
-        }}
-        
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            font-size: 14px;
-        }}
-        
-        .legend-color {{
-            width: 16px;
-            height: 16px;
-            border-radius: 4px;
-            margin-right: 8px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>{title}</h1>
-        
-        <div class="description">
-            <p>需求导航可按SF-IR-SR-AR层级进行追溯浏览。点击需求名称可查看详细信息，点击右侧箭头可展开/折叠下级需求。</p>
-            <p>点击"展开全部"可查看完整层级结构，点击"折叠全部"可重新折叠所有节点。</p>
-        </div>
-        
-        <div class="traceability-tree" id="traceabilityTree">
-{sf_node}
-        </div>
-        
-        <div class="action-buttons">
-            <button class="btn btn-expand" id="expandAll">展开全部</button>
-            <button class="btn btn-collapse" id="collapseAll">折叠全部</button>
-        </div>
-        
-        <div class="legend">
-            <div class="legend-item">
-                <div class="legend-color" style="background-color: #e74c3c;"></div>
-                <span>SF - 系统需求</span>
-            </div>
-            <div class="legend-item">
-                <div class="legend-color" style="background-color: #3498db;"></div>
-                <span>IR - 高层需求</span>
-            </div>
-            <div class="legend-item">
-                <div class="legend-color" style="background-color: #2ecc71;"></div>
-                <span>SR - 高层需求</span>
-            </div>
-            <div class="legend-item">
-                <div class="legend-color" style="background-color: #f39c12;"></div>
-                <span>AR - 低层需求</span>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {{
-            // 切换节点展开/折叠
-            const toggles = document.querySelectorAll('.toggle');
-            toggles.forEach(toggle => {{
-                toggle.addEventListener('click', function(e) {{
-                    e.stopPropagation();
-                    const children = this.parentElement.nextElementSibling;
-                    if (children && children.classList.contains('children')) {{
-                        children.classList.toggle('show');
-                        this.textContent = children.classList.contains('show') ? '▼' : '▶';
-                    }}
-                }});
-            }});
+    def _generate_test_case_children(self, ar: 'AR') -> str:
+        """生成测试用例子节点的HTML"""
+        tc_children = ""
+        
+        for test_case in ar.test_cases:
+            if not test_case.html_file:
+                continue
             
-            // 展开全部
-            document.getElementById('expandAll').addEventListener('click', function() {{
-                const allChildren = document.querySelectorAll('.children');
-                const allToggles = document.querySelectorAll('.toggle');
-                
-                allChildren.forEach(child => {{
-                    child.classList.add('show');
-                }});
-                
-                allToggles.forEach(toggle => {{
-                    toggle.textContent = '▼';
-                }});
-            }});
+            # 计算测试用例的相对路径
+            tc_relative_path = calculate_relative_path(self.req_navga_html_file, test_case.html_file)
             
-            // 折叠全部
-            document.getElementById('collapseAll').addEventListener('click', function() {{
-                const allChildren = document.querySelectorAll('.children');
-                const allToggles = document.querySelectorAll('.toggle');
-                
-                allChildren.forEach(child => {{
-                    child.classList.remove('show');
-                }});
-                
-                allToggles.forEach(toggle => {{
-                    toggle.textContent = '▶';
-                }});
-            }});
-        }});
-    </script>
-</body>
-</html>'''
-
-    def generate_req_table_html(self):
-        """
-        生成SF-IR需求表HTML文件，并保存到req_table_html_file指定的路径
-        """
+            tc_children += f'''
+                                            <div class="node">
+                                                <div class="node-content">
+                                                    <span class="level-badge level-tc">TC</span>
+                                                    <a href="{tc_relative_path}" class="node-link" target="_blank">{test_case.number} {test_case.name}</a>
+                                                </div>
+                                            </div>'''
+        
+        return tc_children
+    
+    def _table_render_job(self) -> Optional[RenderJob]:
+        """构建SF-IR需求表的渲染任务，缺少必要信息时返回None"""
         if not self.req_table_html_file:
             print("错误: SF的req_table_html_file未设置")
-            return
+            return None
         
         if not self.html_file:
             print("错误: SF的html_file未设置，无法计算相对路径")
-            return
+            return None
         
         # 计算SF文件的相对路径
         sf_relative_path = calculate_relative_path(self.req_table_html_file, self.html_file)
@@ -4654,18 +2703,14 @@ class SF:
         # 生成IR行HTML
         ir_rows_html = self._generate_ir_rows(sf_relative_path)
         
-        # 构建完整的HTML内容
-        html_content = self._build_table_html(sf_relative_path, ir_rows_html)
-        
-        # 写入文件
-        try:
-            with open(self.req_table_html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"已成功生成SF-IR需求表HTML文件: {self.req_table_html_file}")
-            
-        except Exception as e:
-            print(f"写入SF-IR需求表HTML文件失败: {e}")
-    
+        return RenderJob("req_table.html", self._build_table_context(sf_relative_path, ir_rows_html), self.req_table_html_file, "SF-IR需求表")
+
+    def generate_req_table_html(self):
+        """
+        生成SF-IR需求表HTML文件，并保存到req_table_html_file指定的路径
+        """
+        render_now(self._table_render_job())
+
     def _generate_ir_rows(self, sf_relative_path: str) -> str:
         """生成IR行的HTML"""
         if not self.irs:
@@ -4718,163 +2763,63 @@ class SF:
         
         return rows_html
     
-    def _build_table_html(self, sf_relative_path: str, ir_rows_html: str) -> str:
-        """构建完整的表格HTML文档"""
-        return f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title} SF-IR需求表</title>
-    <style>
-        * {{
-            box-sizing: border-box;
-            margin: 0;
-            padding: 0;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background-color: #f5f7fa;
-            padding: 40px 20px;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh;
-        }}
-        
-        .container {{
-            max-width: 800px;
-            width: 100%;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08);
-            padding: 30px;
-        }}
-        
-        h1 {{
-            text-align: center;
-            margin-bottom: 25px;
-            color: #2c3e50;
-            font-weight: 600;
-            font-size: 24px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #eaeaea;
-        }}
-        
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 0 auto;
-            border: 1px solid #ddd;
-        }}
-        
-        th {{
-            background-color: #3498db;
-            color: white;
-            font-weight: 500;
-            padding: 14px 16px;
-            text-align: center;
-            border-right: 1px solid #2c81ba;
-        }}
-        
-        th:last-child {{
-            border-right: none;
-        }}
-        
-        td {{
-            padding: 12px 16px;
-            text-align: center;
-            border-bottom: 1px solid #eaeaea;
-            border-right: 1px solid #eaeaea;
-        }}
-        
-        td:last-child {{
-            border-right: none;
-        }}
-        
-        tr:nth-child(even) {{
-            background-color: #f8fafc;
-        }}
-        
-        tr:hover {{
-            background-color: #f0f7ff;
-        }}
-        
-        .sf-cell {{
-            background-color: #e8f4fc;
-            font-weight: 500;
-            vertical-align: middle;
-            color: #2c3e50;
-        }}
-        
-        a {{
-            color: #2980b9;
-            text-decoration: none;
-            font-weight: 500;
-            padding: 4px 8px;
-            border-radius: 4px;
-            transition: all 0.2s ease;
-        }}
-        
-        a:hover {{
-            background-color: #3498db;
-            color: white;
-        }}
-        
-        .footer {{
-            text-align: center;
-            margin-top: 25px;
-            color: #7f8c8d;
-            font-size: 14px;
-            padding-top: 15px;
-            border-top: 1px solid #eaeaea;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>{self.title} SF-IR需求表</h1>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th>SF</th>
-                    <th>IR-高层需求ID</th>
-                    <th>IR-需求名称</th>
-                </tr>
-            </thead>
-            <tbody>
-{ir_rows_html}
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>'''
-
-    def generate_all_html(self):
-        self.generate_html()
-        self.detailed_description.generate_html()
-        self.review_record.generate_html()
-        self.history_record.generate_html()
-        self.generate_req_navigation_html()
-        self.generate_req_table_html()
+    def _build_table_context(self, sf_relative_path: str, ir_rows_html: str) -> dict:
+        """构建完整的表格模板上下文"""
+        return {
+            "title": f"{self.title} SF-IR需求表",
+            "css_link": stylesheet_link("sf_table", self.req_table_html_file),
+            "parent_level": "SF",
+            "child_level": "IR",
+            "child_id_label": "高层需求ID",
+            "extra_heading": "",
+            "rows_html": ir_rows_html
+        }
+
+    def collect_render_jobs(self, targets: Optional[set] = None) -> List[RenderJob]:
+        """
+        把SF及其下所有IR、SR、AR以及AR关联测试用例的页面转换为互相独立的渲染任务
+
+        Args:
+            targets: 需要重新生成的节点id集合（增量同步时使用），None表示全部生成
+        """
+        def selected(node) -> bool:
+            return targets is None or node.id in targets
+
+        def node_jobs(node) -> list:
+            return [node._render_job(), node.detailed_description._render_job(),
+                    node.review_record._render_job(), node.history_record._render_job()]
+
+        jobs = []
+        if selected(self):
+            jobs += node_jobs(self)
+            jobs += self._navigation_render_jobs() + [self._table_render_job()]
         for ir in self.irs:
-            ir.generate_html()
-            ir.detailed_description.generate_html()
-            ir.review_record.generate_html()
-            ir.history_record.generate_html()
-            ir.generate_req_table_html()
+            if selected(ir):
+                jobs += node_jobs(ir) + [ir._table_render_job()]
             for sr in ir.srs:
-                sr.generate_html()
-                sr.detailed_description.generate_html()
-                sr.review_record.generate_html()
-                sr.history_record.generate_html()
-                sr.generate_req_table_html()
+                if selected(sr):
+                    jobs += node_jobs(sr) + [sr._table_render_job()]
                 for ar in sr.ars:
-                    ar.generate_html()
-                    ar.detailed_description.generate_html()
-                    ar.review_record.generate_html()
-                    ar.history_record.generate_html()
+                    if selected(ar):
+                        jobs += node_jobs(ar)
+                        jobs += [test_case._render_job(ar) for test_case in ar.test_cases]
+        if config.SEARCH_INDEX and jobs:
+            # 搜索索引覆盖整棵树，任何节点变化都要重建（内容未变化的分片不会重写）
+            jobs += build_search_jobs(self)
+        return [job for job in jobs if job is not None]
+
+    def generate_all_html(self, targets: Optional[set] = None, executor: str = None,
+                          max_workers: int = None) -> RenderScheduler:
+        """
+        生成SF及其下所有IR、SR、AR的HTML文件（在进程池/线程池上并发渲染）
+
+        Args:
+            targets: 需要重新生成的节点id集合（增量同步时使用），None表示全部生成
+            executor: 执行方式 process/thread/serial，默认使用config.RENDER_EXECUTOR
+            max_workers: 工作进程/线程数，默认使用config.RENDER_WORKERS
+        """
+        jobs = self.collect_render_jobs(targets)
+        scheduler = RenderScheduler(executor, max_workers)
+        scheduler.run(jobs)
+        self.remove_stale_nav_chunks(scheduler.results)
+        return scheduler
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from config import config
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(content: str) -> str:
+    """计算页面内容的哈希（UTF-8编码后的sha256）"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def write_if_changed(path: str, content: str, previous_hash: str = "", previous_size: int = -1) -> Tuple[bool, str, int]:
+    """
+    内容与上次生成时相同且文件未被改动时跳过写入，否则写入文件
+
+    Args:
+        path: 输出文件路径
+        content: 页面内容
+        previous_hash: 清单中记录的上次内容哈希（为空表示没有记录，总是写入）
+        previous_size: 清单中记录的上次文件大小，用于发现文件被删除或手工修改
+
+    Returns:
+        (是否写入, 内容哈希, 文件大小)
+    """
+    digest = content_hash(content)
+    if previous_hash and digest == previous_hash:
+        try:
+            if os.path.getsize(path) == previous_size:
+                return False, digest, previous_size
+        except OSError:
+            pass  # 文件已被删除，重新写入
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True, digest, os.path.getsize(path)
+
+def create_output_dirs(paths: Iterable[str]) -> int:
+    """
+    创建输出文件所在的目录：只对叶子目录调用一次makedirs（上级目录随之创建）
+
+    Returns:
+        调用makedirs的次数
+    """
+    dirs = {os.path.dirname(path) for path in paths}
+    dirs.discard("")
+    ancestors = set()
+    for directory in dirs:
+        parent = os.path.dirname(directory)
+        while parent and parent not in ancestors:
+            ancestors.add(parent)
+            parent = os.path.dirname(parent)
+    leaves = sorted(dirs - ancestors)
+    for directory in leaves:
+        os.makedirs(directory, exist_ok=True)
+    return len(leaves)
+
+
+class BuildManifest:
+    """
+    构建清单 - 记录每个已生成文件的内容哈希、大小、页面类型和生成时间
+
+    写文件前与清单比较，内容未变化的文件不再重写（保持mtime不变，便于rsync、Web服务器缓存和产物比对）。
+    清单同时是一份构建索引：列出输出目录中由本工具生成的全部页面。
+    路径以清单所在目录为基准保存为相对路径（使用/分隔）。
+    """
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.BASE_DIR_NAME, config.BUILD_MANIFEST_FILE)
+        self.root = os.path.dirname(self.path)
+        self.files: Dict[str, dict] = {}  # 相对路径 -> {"hash", "size", "label", "built_at"}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _key(self, output_file: str) -> str:
+        return os.path.relpath(output_file, self.root or '.').replace('\\', '/')
+
+    def load(self):
+        """读取上次运行保存的清单（文件不存在或版本不匹配时从空清单开始）"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取构建清单失败，将重新生成所有文件: {e}")
+                return
+            if manifest.get("version") != MANIFEST_VERSION:
+                print(f"构建清单版本不匹配: {manifest.get('version')}，将重新生成所有文件")
+                return
+            self.files = manifest.get("files", {})
+
+    def get(self, output_file: str) -> Optional[dict]:
+        """获取文件在清单中的记录"""
+        self.load()
+        return self.files.get(self._key(output_file))
+
+    def update(self, output_file: str, digest: str, size: int, label: str, written: bool):
+        """记录文件本次生成的结果（未重写的文件保留原来的生成时间）"""
+        self.load()
+        key = self._key(output_file)
+        with self._lock:
+            entry = self.files.get(key)
+            if written or entry is None:
+                built_at = time.strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                built_at = entry.get("built_at", "")
+            self.files[key] = {"hash": digest, "size": size, "label": label, "built_at": built_at}
+
+    def remove(self, output_file: str):
+        """删除文件的记录（文件已从输出目录删除时）"""
+        self.load()
+        with self._lock:
+            self.files.pop(self._key(output_file), None)
+
+    def save(self):
+        """保存清单（删除已不存在的文件的记录）"""
+        self.load()
+        with self._lock:
+            self.files = {
+                key: entry for key, entry in self.files.items()
+                if os.path.exists(os.path.join(self.root, key))
+            }
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "files": dict(sorted(self.files.items()))
+            }
+            if self.root:
+                os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+# 全局构建清单实例
+build_manifest = BuildManifest()
@@ -0,0 +1,177 @@
+import functools
+import gzip
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from config import config
+from output_writer import BuildManifest, build_manifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PRECOMPRESS_LABEL = "预压缩"
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime固定为0，相同内容得到相同的压缩文件
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+# 压缩格式 -> 压缩函数，压缩文件名为 原文件名.格式（与nginx gzip_static/brotli_static一致）
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gz": _gzip, "br": _brotli}
+
+
+@functools.lru_cache(maxsize=None)
+def parse_formats(value: str) -> Tuple[str, ...]:
+    """解析逗号分隔的预压缩格式（未安装brotli时去掉br，同一配置只提示一次）"""
+    formats = []
+    for name in (value or "").split(","):
+        name = name.strip().lower()
+        if not name or name in formats:
+            continue
+        if name not in COMPRESSORS:
+            raise ValueError(f"未知的预压缩格式: {name}，可选: {', '.join(COMPRESSORS)}")
+        if name == "br" and brotli is None:
+            print("警告: 未安装brotli，跳过br预压缩")
+            continue
+        formats.append(name)
+    return tuple(formats)
+
+
+@dataclass
+class CompressJob:
+    """预压缩任务 - 一个已生成文件及需要生成的压缩格式"""
+    source_file: str
+    source_hash: str
+    formats: List[str]
+
+
+@dataclass
+class CompressResult:
+    """预压缩任务的执行结果"""
+    source_file: str
+    source_hash: str
+    source_size: int = 0
+    sizes: Dict[str, int] = field(default_factory=dict)  # 压缩格式 -> 压缩文件大小
+    elapsed: float = 0.0
+    error: str = ""
+
+
+def run_compress_job(job: CompressJob) -> CompressResult:
+    """读取文件并写出各格式的压缩文件（在工作进程/线程中执行，先写临时文件再替换）"""
+    start_time = time.perf_counter()
+    result = CompressResult(job.source_file, job.source_hash)
+    try:
+        with open(job.source_file, "rb") as f:
+            data = f.read()
+        result.source_size = len(data)
+        for name in job.formats:
+            compressed_file = f"{job.source_file}.{name}"
+            tmp_file = f"{compressed_file}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(COMPRESSORS[name](data))
+            os.replace(tmp_file, compressed_file)
+            result.sizes[name] = os.path.getsize(compressed_file)
+    except Exception as e:
+        result.error = str(e)
+    result.elapsed = time.perf_counter() - start_time
+    return result
+
+
+class Precompressor:
+    """
+    预压缩阶段 - 为每个已生成的文件写出 .gz/.br 压缩文件，Web服务器可以直接发送而不必每次压缩
+
+    压缩文件也记在构建清单中，记录的hash是压缩时源文件的内容哈希：
+    源文件内容未变化且压缩文件大小与记录一致时跳过；关闭某种格式或源文件小于PRECOMPRESS_MIN_SIZE时，
+    删除本工具以前写出的该格式压缩文件，避免服务器发送过期内容。
+    """
+    def __init__(self, formats: Tuple[str, ...], manifest: Optional[BuildManifest] = None):
+        self.formats = formats
+        self.manifest = manifest or build_manifest
+        self.results: List[CompressResult] = []
+        self.skipped = 0
+        self.removed = 0
+        self.elapsed = 0.0
+
+    def _up_to_date(self, compressed_file: str, source_hash: str) -> bool:
+        """压缩文件是否由当前内容的源文件生成且未被改动"""
+        if not config.SKIP_UNCHANGED_WRITES:
+            return False
+        entry = self.manifest.get(compressed_file)
+        if not entry or entry.get("hash") != source_hash:
+            return False
+        try:
+            return os.path.getsize(compressed_file) == entry.get("size")
+        except OSError:
+            return False
+
+    def _remove_stale(self, compressed_file: str):
+        """删除以前生成、现在不再需要的压缩文件（只删除清单中记录的文件）"""
+        if self.manifest.get(compressed_file) and os.path.exists(compressed_file):
+            os.remove(compressed_file)
+            self.removed += 1
+
+    def collect_jobs(self, render_results) -> List[CompressJob]:
+        """根据渲染结果确定需要压缩的文件，并清理过期的压缩文件"""
+        jobs = []
+        for result in render_results:
+            if result.error or not result.content_hash:
+                continue
+            wanted = self.formats if result.size >= config.PRECOMPRESS_MIN_SIZE else []
+            for name in COMPRESSORS:
+                if name not in wanted:
+                    self._remove_stale(f"{result.output_file}.{name}")
+            pending = []
+            for name in wanted:
+                if self._up_to_date(f"{result.output_file}.{name}", result.content_hash):
+                    self.skipped += 1
+                else:
+                    pending.append(name)
+            if pending:
+                jobs.append(CompressJob(result.output_file, result.content_hash, pending))
+        return jobs
+
+    def run(self, render_results, map_jobs: Callable, report: bool = True) -> List[CompressResult]:
+        """
+        压缩渲染结果中的文件，并把压缩文件记入构建清单（清单由调用方保存）
+
+        Args:
+            render_results: 渲染调度器的结果列表
+            map_jobs: 在工作池上执行任务的函数 map_jobs(func, jobs) -> 结果列表
+            report: 是否输出统计
+        """
+        start_time = time.perf_counter()
+        jobs = self.collect_jobs(render_results)
+        self.results = map_jobs(run_compress_job, jobs) if jobs else []
+        for result in self.results:
+            if result.error:
+                print(f"预压缩失败: {result.source_file}: {result.error}")
+                continue
+            for name, size in result.sizes.items():
+                self.manifest.update(f"{result.source_file}.{name}", result.source_hash, size, PRECOMPRESS_LABEL, True)
+        self.elapsed = time.perf_counter() - start_time
+        if report:
+            self.print_report()
+        return self.results
+
+    def print_report(self):
+        """输出预压缩统计：压缩的文件数、跳过数和各格式的压缩率"""
+        if not self.formats and not self.removed:
+            return
+        done = [result for result in self.results if not result.error]
+        print(f"\n预压缩完成（{','.join(self.formats) or '未启用'}）: 压缩 {len(done)} 个文件，"
+              f"内容未变化跳过 {self.skipped} 个压缩文件，删除过期压缩文件 {self.removed} 个，"
+              f"失败 {len(self.results) - len(done)} 个，耗时 {self.elapsed:.2f} 秒")
+        for name in self.formats:
+            compressed = [result for result in done if name in result.sizes]
+            source_total = sum(result.source_size for result in compressed)
+            if source_total:
+                compressed_total = sum(result.sizes[name] for result in compressed)
+                print(f"  {name}: {source_total / 1024:.1f} KB -> {compressed_total / 1024:.1f} KB"
+                      f"（{compressed_total / source_total:.1%}）")
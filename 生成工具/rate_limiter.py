@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """令牌桶限速器（线程安全）- 平均每秒放行rate个请求，允许capacity个突发"""
+    def __init__(self, rate: float, capacity: int = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """按流逝的时间补充令牌"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens: int = 1):
+        """获取令牌，令牌不足时阻塞等待（rate<=0表示不限速）"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
@@ -0,0 +1,206 @@
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 建立等值索引的字段（节点没有的字段不索引，如测试用例只有status）
+INDEXED_FIELDS = ("status", "assignee", "domain_value", "creator")
+# 建立日期索引的字段（按'YYYY-MM-DD'索引，可做范围查询）
+DATE_INDEXED_FIELDS = ("plan_start_date", "plan_end_date", "plan_dev_end_date", "plan_test_end_date")
+
+# 注册表中的节点类型
+KINDS = ("IR", "SR", "AR", "TC")
+
+
+def index_value(field: str, value) -> str:
+    """字段值在索引中的键：日期只取日期部分，None记为空字符串"""
+    value = value or ""
+    return value[:10] if field in DATE_INDEXED_FIELDS else value
+
+
+class FieldIndex:
+    """
+    单个字段的二级索引 - 字段值 -> 节点（按注册顺序），并维护有序的不同取值用于范围查询
+
+    节点是不可哈希的dataclass，桶中以id(node)为键保存节点；不同取值（状态、人员、日期）很少，
+    有序取值列表只在出现新取值或某个取值的桶清空时调整。
+    """
+    def __init__(self):
+        self.buckets: Dict[str, Dict[int, object]] = {}
+        self.keys: List[str] = []
+
+    def add(self, value: str, node):
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            bucket = self.buckets[value] = {}
+            bisect.insort(self.keys, value)
+        bucket[id(node)] = node
+
+    def remove(self, value: str, node):
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            return
+        bucket.pop(id(node), None)
+        if not bucket:
+            del self.buckets[value]
+            del self.keys[bisect.bisect_left(self.keys, value)]
+
+    def equal(self, value: str) -> List[object]:
+        return list(self.buckets.get(value, {}).values())
+
+    def range_buckets(self, start: Optional[str], end: Optional[str]) -> List[Dict[int, object]]:
+        """取值在[start, end]内的桶（不含空值）"""
+        low = bisect.bisect_left(self.keys, start) if start else bisect.bisect_right(self.keys, "")
+        high = bisect.bisect_right(self.keys, end) if end else len(self.keys)
+        return [self.buckets[key] for key in self.keys[low:high]]
+
+    def count_range(self, start: Optional[str], end: Optional[str]) -> int:
+        return sum(len(bucket) for bucket in self.range_buckets(start, end))
+
+
+class RegistryIndexes:
+    """
+    DataRegistry的二级索引 - 每种节点类型、每个索引字段一个FieldIndex
+
+    记录每个节点被索引时的取值，重新注册或详情更新后调用index()会先移除旧取值，索引与节点字段保持一致。
+    调用方负责加锁（见DataRegistry）。
+    """
+    def __init__(self):
+        self.indexes: Dict[Tuple[str, str], FieldIndex] = {}
+        self._indexed: Dict[int, Tuple[str, Dict[str, str]]] = {}  # id(node) -> (类型, 字段 -> 索引时的取值)
+
+    def index(self, kind: str, node):
+        """按节点当前的字段值（重新）建立索引，取值未变化时保持原位置"""
+        values = {field: index_value(field, getattr(node, field))
+                  for field in INDEXED_FIELDS + DATE_INDEXED_FIELDS if hasattr(node, field)}
+        if self._indexed.get(id(node)) == (kind, values):
+            return
+        self.unindex(node)
+        for field, value in values.items():
+            self.field_index(kind, field).add(value, node)
+        self._indexed[id(node)] = (kind, values)
+
+    def unindex(self, node):
+        entry = self._indexed.pop(id(node), None)
+        if entry is None:
+            return
+        kind, values = entry
+        for field, value in values.items():
+            self.field_index(kind, field).remove(value, node)
+
+    def kind_of(self, node) -> Optional[str]:
+        """节点被索引时的类型，未索引时返回None"""
+        entry = self._indexed.get(id(node))
+        return entry[0] if entry else None
+
+    def field_index(self, kind: str, field: str) -> FieldIndex:
+        index = self.indexes.get((kind, field))
+        if index is None:
+            index = self.indexes[(kind, field)] = FieldIndex()
+        return index
+
+    def has_field(self, kind: str, field: str) -> bool:
+        return (kind, field) in self.indexes
+
+
+class RegistryQuery:
+    """
+    注册表查询 - 组合等值、范围和任意条件，例如：
+
+        data_registry.query("AR").where(status="开发中", assignee="张三").all()
+        data_registry.query("AR").where_range("plan_end_date", end="2025-06-30").filter(lambda ar: not ar.test_cases).count()
+
+    有索引的条件各取一个候选集（范围条件合并各日期的桶），从最小的候选集开始求交集；
+    没有索引的条件和filter()的条件在交集上逐个节点检查，没有任何索引条件时遍历该类型的全部节点。
+    结果顺序：候选集最小的条件是范围条件时按日期，否则按索引顺序（即注册顺序，字段变化后重新索引的节点排在后面）。
+    """
+    def __init__(self, registry, kind: str):
+        if kind not in KINDS:
+            raise ValueError(f"未知的节点类型: {kind}，可选: {', '.join(KINDS)}")
+        self.registry = registry
+        self.kind = kind
+        self.equals: List[Tuple[str, str]] = []
+        self.ranges: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self.predicates: List[Callable] = []
+        self.plan = ""  # 最近一次执行使用的索引条件，便于检查
+
+    def where(self, **conditions) -> 'RegistryQuery':
+        """字段等于给定值"""
+        for field, value in conditions.items():
+            self.equals.append((field, index_value(field, value)))
+        return self
+
+    def where_range(self, field: str, start: Optional[str] = None, end: Optional[str] = None) -> 'RegistryQuery':
+        """日期字段在[start, end]内（含两端，为None表示不限；字段为空的节点不匹配）"""
+        if field not in DATE_INDEXED_FIELDS:
+            raise ValueError(f"不支持范围查询的字段: {field}，可选: {', '.join(DATE_INDEXED_FIELDS)}")
+        self.ranges.append((field, index_value(field, start) or None, index_value(field, end) or None))
+        return self
+
+    def filter(self, predicate: Callable) -> 'RegistryQuery':
+        """任意条件 predicate(node) -> bool，在索引条件之后检查"""
+        self.predicates.append(predicate)
+        return self
+
+    def _plan(self, indexes: RegistryIndexes):
+        """
+        把条件分为有索引和无索引两部分
+
+        Returns:
+            (候选集列表[(说明, {id(node): node})]，无索引的等值条件，无索引的范围条件)
+        """
+        candidates, equals, ranges = [], [], []
+        for field, value in self.equals:
+            if indexes.has_field(self.kind, field):
+                bucket = indexes.field_index(self.kind, field).buckets.get(value, {})
+                candidates.append((f"{field}={value}", bucket))
+            else:
+                equals.append((field, value))
+        for field, start, end in self.ranges:
+            if indexes.has_field(self.kind, field):
+                merged = {}
+                for bucket in indexes.field_index(self.kind, field).range_buckets(start, end):
+                    merged.update(bucket)
+                candidates.append((f"{field} in [{start or ''}, {end or ''}]", merged))
+            else:
+                ranges.append((field, start, end))
+        candidates.sort(key=lambda candidate: len(candidate[1]))
+        return candidates, equals, ranges
+
+    def _matches(self, node, equals, ranges) -> bool:
+        for field, value in equals:
+            if index_value(field, getattr(node, field, None)) != value:
+                return False
+        for field, start, end in ranges:
+            value = index_value(field, getattr(node, field, None))
+            if not value or (start and value < start) or (end and value > end):
+                return False
+        return True
+
+    def all(self) -> List[object]:
+        """执行查询，返回匹配的节点"""
+        with self.registry.lock:
+            candidates, equals, ranges = self._plan(self.registry.indexes)
+            if not candidates:
+                self.plan = "全部节点"
+                nodes = self.registry.nodes_of(self.kind)
+            else:
+                self.plan = " & ".join(description for description, _ in candidates)
+                smallest = candidates[0][1]
+                if len(candidates) == 1:
+                    nodes = list(smallest.values())
+                else:
+                    keys = smallest.keys()
+                    for _, bucket in candidates[1:]:
+                        keys = keys & bucket.keys()
+                    nodes = [node for key, node in smallest.items() if key in keys]
+        if equals or ranges:
+            nodes = [node for node in nodes if self._matches(node, equals, ranges)]
+        for predicate in self.predicates:
+            nodes = [node for node in nodes if predicate(node)]
+        return nodes
+
+    def count(self) -> int:
+        return len(self.all())
+
+    def first(self):
+        matched = self.all()
+        return matched[0] if matched else None
@@ -0,0 +1,184 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from config import config
+from template_engine import render_template
+from output_writer import BuildManifest, build_manifest, create_output_dirs, write_if_changed
+from precompress import Precompressor, parse_formats
+
+# 执行方式
+EXECUTOR_PROCESS = "process"  # 进程池（渲染和写文件分布到多个CPU核心）
+EXECUTOR_THREAD = "thread"  # 线程池
+EXECUTOR_SERIAL = "serial"  # 在当前线程中逐个执行
+EXECUTORS = [EXECUTOR_PROCESS, EXECUTOR_THREAD, EXECUTOR_SERIAL]
+
+
+@dataclass
+class RenderJob:
+    """渲染任务 - 一个页面的模板名、上下文和输出路径
+
+    上下文只包含字符串、数字、列表和字典，不引用parent/owner等对象，可以直接pickle到其他进程。
+    """
+    template: str
+    context: Dict[str, Any]
+    output_file: str
+    label: str  # 日志中显示的页面类型
+    previous_hash: str = ""  # 构建清单中记录的上次内容哈希（由调度器在分发前填入）
+    previous_size: int = -1  # 构建清单中记录的上次文件大小
+
+
+@dataclass
+class RenderResult:
+    """渲染任务的执行结果"""
+    output_file: str
+    label: str
+    elapsed: float  # 渲染和写文件耗时（秒）
+    error: str = ""
+    written: bool = True  # False表示内容未变化，跳过了写入
+    content_hash: str = ""
+    size: int = 0
+
+
+def run_render_job(job: RenderJob) -> RenderResult:
+    """渲染模板并写入文件（在工作进程/线程中执行，内容与上次相同时跳过写入）"""
+    start_time = time.perf_counter()
+    result = RenderResult(job.output_file, job.label, 0.0)
+    try:
+        html_content = render_template(job.template, job.context)
+        result.written, result.content_hash, result.size = write_if_changed(
+            job.output_file, html_content, job.previous_hash, job.previous_size)
+    except Exception as e:
+        result.error = str(e)
+    result.elapsed = time.perf_counter() - start_time
+    return result
+
+def _attach_previous(job: RenderJob, manifest: Optional[BuildManifest]):
+    """把构建清单中的上次记录填入任务（工作进程中没有清单；SKIP_UNCHANGED_WRITES关闭时总是写入）"""
+    entry = manifest.get(job.output_file) if manifest is not None and config.SKIP_UNCHANGED_WRITES else None
+    if entry:
+        job.previous_hash = entry.get("hash", "")
+        job.previous_size = entry.get("size", -1)
+
+def _record_result(result: RenderResult, manifest: Optional[BuildManifest]):
+    """把成功的任务结果记入构建清单"""
+    if manifest is not None and not result.error:
+        manifest.update(result.output_file, result.content_hash, result.size, result.label, result.written)
+
+def report_render_result(result: RenderResult):
+    """输出单个渲染任务的结果"""
+    kind = "HTML文件" if result.output_file.endswith(".html") else "文件"
+    if result.error:
+        print(f"写入{result.label}{kind}失败: {result.error}")
+    elif not result.written:
+        print(f"{result.label}{kind}内容未变化，跳过写入: {result.output_file}")
+    else:
+        print(f"已成功生成{result.label}{kind}: {result.output_file}")
+
+def render_now(job: Optional[RenderJob], save_manifest: bool = True) -> Optional[RenderResult]:
+    """
+    在当前线程中立即执行一个渲染任务（单个页面的generate_html使用）
+
+    与RenderScheduler.run一样更新并保存构建清单，下次运行才能跳过内容未变化的文件；
+    连续渲染多个任务时可传save_manifest=False，最后调用一次build_manifest.save()
+    """
+    if job is None:
+        return None
+    _attach_previous(job, build_manifest)
+    create_output_dirs([job.output_file])
+    result = run_render_job(job)
+    _record_result(result, build_manifest)
+    report_render_result(result)
+    Precompressor(parse_formats(config.PRECOMPRESS), build_manifest).run([result], _map_serial, report=False)
+    if save_manifest:
+        build_manifest.save()
+    return result
+
+def _map_serial(func, jobs: list) -> list:
+    return [func(job) for job in jobs]
+
+
+class RenderScheduler:
+    """渲染调度器 - 在进程池或线程池上并发执行渲染任务，并统计每个任务的耗时
+
+    分发前从构建清单取出每个文件的上次哈希，工作者只在内容变化时写文件；
+    结果返回后由调度器（主进程）统一更新清单，在同一个工作池上执行预压缩阶段（config.PRECOMPRESS），最后保存清单。
+    """
+    def __init__(self, executor: str = None, max_workers: int = None, manifest: Optional[BuildManifest] = None):
+        self.executor = executor or config.RENDER_EXECUTOR
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"未知的渲染执行方式: {self.executor}，可选: {', '.join(EXECUTORS)}")
+        self.max_workers = max_workers or config.RENDER_WORKERS or os.cpu_count() or 1
+        self.manifest = manifest or build_manifest
+        self.results: List[RenderResult] = []
+        self.elapsed = 0.0
+        self.precompressor = Precompressor(parse_formats(config.PRECOMPRESS), self.manifest)
+
+    def map_jobs(self, func, jobs: list) -> list:
+        """在配置的工作池上执行func(job)，返回与jobs顺序一致的结果列表"""
+        if self.executor == EXECUTOR_SERIAL or self.max_workers <= 1 or len(jobs) <= 1:
+            return _map_serial(func, jobs)
+        if self.executor == EXECUTOR_THREAD:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(func, jobs))
+        # 每个进程一次领取一批任务，减少进程间通信次数
+        chunksize = max(1, len(jobs) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(func, jobs, chunksize=chunksize))
+
+    def run(self, jobs: List[RenderJob]) -> List[RenderResult]:
+        """执行所有渲染任务，返回与jobs顺序一致的结果列表"""
+        start_time = time.perf_counter()
+        # 目录在分发前统一创建，工作者只写文件
+        create_output_dirs(job.output_file for job in jobs)
+        for job in jobs:
+            _attach_previous(job, self.manifest)
+        self.results = self.map_jobs(run_render_job, jobs)
+        self.elapsed = time.perf_counter() - start_time
+
+        for result in self.results:
+            _record_result(result, self.manifest)
+            report_render_result(result)
+        self.print_report()
+        self.precompressor.run(self.results, self.map_jobs)
+        self.manifest.save()
+        return self.results
+
+    def print_report(self, top: int = 5):
+        """输出渲染耗时统计：按页面类型汇总，以及最慢的几个任务"""
+        if not self.results:
+            print("没有需要渲染的页面")
+            return
+
+        failed = [result for result in self.results if result.error]
+        skipped = [result for result in self.results if not result.error and not result.written]
+        job_time = sum(result.elapsed for result in self.results)
+        print(f"\n页面渲染完成: {len(self.results) - len(failed)}/{len(self.results)} 个成功，"
+              f"执行方式: {self.executor}（{self.max_workers}个工作者），"
+              f"总耗时 {self.elapsed:.2f} 秒，任务累计耗时 {job_time:.2f} 秒")
+        print(f"  写入 {len(self.results) - len(failed) - len(skipped)} 个文件，"
+              f"内容未变化跳过 {len(skipped)} 个，失败 {len(failed)} 个")
+
+        by_label: Dict[str, List[float]] = {}
+        for result in self.results:
+            by_label.setdefault(result.label, []).append(result.elapsed)
+        for label, times in sorted(by_label.items(), key=lambda item: -sum(item[1])):
+            print(f"  {label}: {len(times)} 个，累计 {sum(times) * 1000:.1f} ms，"
+                  f"平均 {sum(times) / len(times) * 1000:.2f} ms，最长 {max(times) * 1000:.2f} ms")
+
+        slowest = sorted(self.results, key=lambda result: result.elapsed, reverse=True)[:top]
+        print(f"  最慢的{len(slowest)}个页面:")
+        for result in slowest:
+            print(f"    {result.elapsed * 1000:.2f} ms  {result.output_file}")
+
+    def save_timings(self, path: str):
+        """把每个任务的耗时保存为CSV"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["output_file", "label", "elapsed_ms", "written", "error"])
+            for result in self.results:
+                writer.writerow([result.output_file, result.label, f"{result.elapsed * 1000:.3f}",
+                                 int(result.written), result.error])
+        print(f"已保存渲染耗时: {path}")
@@ -0,0 +1,44 @@
+import operator
+import re
+from typing import Optional, Tuple
+
+# 需求和测试用例编号：LLR_OS_01_02_03（AR）、HLR_OS_01_02（SR）、HLR_OS_01（IR）、tc_OS_01_02_03_04（测试用例）
+_match_id = re.compile(r"(?:LLR|HLR|tc)_OS_(\d+(?:_\d+)*)").fullmatch
+# AR标题中的编号：LLR_OS_xx_xx_xx，xx是两位数字
+_match_ar_req_id = re.compile(r"LLR_OS_\d\d_\d\d_\d\d").fullmatch
+_AR_TITLE_KEYWORD = "LLR_OS_"
+_AR_REQ_ID_LENGTH = len("LLR_OS_xx_xx_xx")
+
+# 无法解析的编号（包括空编号）的排序键，排在所有可解析编号之后
+UNPARSED_KEY: Tuple[int, ...] = (1,)
+
+# 按节点上缓存的排序键排序：list.sort(key=SORT_KEY)
+SORT_KEY = operator.attrgetter("sort_key")
+
+
+def parse_sort_key(identifier: str) -> Tuple[int, ...]:
+    """
+    编号的整数元组排序键，如 LLR_OS_01_02_03 -> (0, 1, 2, 3)
+
+    首项0表示可解析，各段按数值比较（段数不同时较短的排在前面）；无法解析的编号返回UNPARSED_KEY
+    """
+    match = _match_id(identifier) if identifier else None
+    if match is None:
+        return UNPARSED_KEY
+    return (0, *map(int, match[1].split("_")))
+
+def parse_ar_title(title: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    从AR的title中提取AR、SR、IR的req_id
+
+    只检查title中第一次出现LLR_OS_的位置：LLR_OS_01_02_03 -> (LLR_OS_01_02_03, HLR_OS_01_02, HLR_OS_01)，
+    格式不正确时返回 (None, None, None)
+    """
+    start = title.find(_AR_TITLE_KEYWORD) if title else -1
+    if start == -1:
+        return None, None, None
+    ar_req_id = title[start:start + _AR_REQ_ID_LENGTH]
+    if _match_ar_req_id(ar_req_id) is None:
+        return None, None, None
+    # LLR_OS_01_02_03 -> HLR_OS_01_02 / HLR_OS_01
+    return ar_req_id, "HLR_OS_" + ar_req_id[7:12], "HLR_OS_" + ar_req_id[7:9]
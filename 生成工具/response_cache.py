@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# 缓存模式
+CACHE_MODE_OFF = "off"  # 不使用缓存
+CACHE_MODE_READ_THROUGH = "read_through"  # 优先读缓存，未命中或过期时请求网络并写入缓存
+CACHE_MODE_WRITE_THROUGH = "write_through"  # 总是请求网络，并把结果写入缓存
+CACHE_MODE_OFFLINE = "offline"  # 只读缓存（忽略过期时间），不访问网络
+CACHE_MODES = [CACHE_MODE_OFF, CACHE_MODE_READ_THROUGH, CACHE_MODE_WRITE_THROUGH, CACHE_MODE_OFFLINE]
+
+
+class ResponseCache:
+    """磁盘响应缓存 - 以请求内容的哈希为键，支持TTL和按容量的LRU淘汰"""
+    def __init__(self, cache_dir: str, ttl: int, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._total_bytes: Optional[int] = None  # 首次写入时统计
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Dict[str, Any] = None, data: Dict[str, Any] = None) -> str:
+        """根据method、url、params和body计算缓存键"""
+        raw = json.dumps([method.upper(), url, params or {}, data], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """缓存文件路径（按键的前两位分子目录）"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[Dict[str, Any]]:
+        """读取缓存，未命中或已过期返回None"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if not allow_expired and self.ttl > 0 and time.time() - entry.get("stored_at", 0) > self.ttl:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # 更新访问时间，作为LRU淘汰依据
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return entry.get("body")
+
+    def put(self, key: str, body: Dict[str, Any], method: str = "", url: str = ""):
+        """写入缓存（先写临时文件再替换，保证并发读取时文件完整）"""
+        path = self._path(key)
+        entry = {
+            "stored_at": time.time(),
+            "method": method,
+            "url": url,
+            "body": body
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            new_size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"写入响应缓存失败: {e}")
+            return
+
+        with self._lock:
+            self.writes += 1
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            else:
+                self._total_bytes += new_size - old_size
+            if self.max_bytes > 0 and self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _iter_entries(self):
+        """遍历所有缓存文件，返回(路径, 访问时间, 大小)"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for sub_dir in os.scandir(self.cache_dir):
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    def _scan_total_bytes(self) -> int:
+        """统计缓存目录总大小"""
+        return sum(size for _, _, size in self._iter_entries())
+
+    def _evict(self):
+        """按最近使用时间淘汰缓存，直到总大小降到上限的90%以下（调用方需持有锁）"""
+        target = self.max_bytes * 0.9
+        entries = sorted(self._iter_entries(), key=lambda item: item[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓存命中统计"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions
+        }
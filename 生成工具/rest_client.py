@@ -1,13 +1,121 @@
 import requests
 import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
+from requests.adapters import HTTPAdapter
 from config import config
+from response_cache import ResponseCache, CACHE_MODE_OFF, CACHE_MODE_READ_THROUGH, CACHE_MODE_OFFLINE
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class HttpClient:
+    """HTTP客户端 - 基于连接池的requests.Session封装，所有api_*请求共用"""
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None):
+        self.pool_connections = pool_connections or config.POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or config.POOL_MAXSIZE
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """创建带连接池和keep-alive的Session"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        # 共享的默认请求头
+        session.headers.update({
+            'Content-Type': 'application/json; charset=UTF-8',
+            'Connection': 'keep-alive'
+        })
+        if config.has_token and config.token:
+            session.headers['X-Auth-Token'] = config.token
+
+        session.verify = False  # 跳过SSL证书验证
+        return session
+
+    def set_token(self, token: str):
+        """更新默认请求头中的X-Auth-Token"""
+        self.session.headers['X-Auth-Token'] = token
+
+    def request(self, method: str, url: str, json: Dict[str, Any] = None,
+                params: Dict[str, Any] = None, headers: Dict[str, Any] = None) -> requests.Response:
+        """通过连接池发送请求"""
+        with self._lock:
+            self.request_count += 1
+
+        return self.session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            json=json,
+            params=params,
+            timeout=config.TIMEOUT
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取连接复用统计（新建连接数、复用连接数）"""
+        new_connections = 0
+        pool_requests = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                new_connections += pool.num_connections
+                pool_requests += pool.num_requests
+
+        return {
+            "requests": self.request_count,
+            "new_connections": new_connections,
+            "reused_connections": max(pool_requests - new_connections, 0)
+        }
+
+    def close(self):
+        """关闭Session并释放连接池"""
+        self.session.close()
+
+
+# 全局HTTP客户端实例
+http_client = HttpClient()
+
+# token刷新锁（并发请求同时遇到401时只刷新一次）
+_token_lock = threading.Lock()
+
+# 磁盘响应缓存（首次使用时按config创建）
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+# 请求录制器（http_fixture.FixtureRecorder，设置后记录所有网络请求）
+_fixture_recorder = None
+
+
+def get_response_cache() -> ResponseCache:
+    """获取全局磁盘响应缓存"""
+    global _response_cache
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(config.CACHE_DIR, config.CACHE_TTL, config.CACHE_MAX_BYTES)
+    return _response_cache
+
+
+def set_fixture_recorder(recorder):
+    """设置请求录制器，None表示停止录制"""
+    global _fixture_recorder
+    _fixture_recorder = recorder
+
+def get_connection_stats() -> Dict[str, int]:
+    """获取全局HTTP客户端的连接复用统计"""
+    return http_client.get_stats()
+
 def get_token() -> Optional[str]:
     """获取认证token"""
     # 如果已经获取过token，直接返回
@@ -40,15 +148,15 @@ def get_token() -> Optional[str]:
         }
     }
     
-    headers = {'Content-Type': 'application/json; charset=UTF-8'}
+    # 获取token的请求不携带旧的X-Auth-Token
+    headers = {'X-Auth-Token': None}
     
     try:
-        response = requests.post(
+        response = http_client.request(
+            method='POST',
             url=config.IAM_URL,
             headers=headers,
-            json=auth_data,
-            timeout=config.TIMEOUT,
-            verify=False  # 跳过SSL证书验证
+            json=auth_data
         )
         
         if response.status_code == 201:
@@ -56,6 +164,7 @@ def get_token() -> Optional[str]:
             if token:
                 config.token = token
                 config.has_token = True
+                http_client.set_token(token)
                 logger.info("Token获取成功")
                 print(token)
                 return token
@@ -69,41 +178,83 @@ def get_token() -> Optional[str]:
     
     return None
 
-def api_get(url: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+def _ensure_token() -> bool:
+    """确保已获取token（线程安全）"""
+    if config.has_token:
+        return True
+    with _token_lock:
+        if config.has_token:
+            return True
+        logger.info("未获取token，先获取token")
+        return get_token() is not None
+
+def _refresh_token(expired_token: str) -> bool:
+    """token过期后重新获取token（线程安全，同一个过期token只刷新一次）"""
+    with _token_lock:
+        # 其他请求已经刷新过token，直接使用新token
+        if config.has_token and config.token != expired_token:
+            return True
+        config.has_token = False  # 重置token状态
+        return get_token() is not None
+
+def api_get(url: str, params: Dict[str, Any] = None, use_cache: bool = True) -> Optional[Dict[str, Any]]:
     """发送GET请求"""
-    return _make_request('GET', url, params=params)
+    return _make_request('GET', url, params=params, use_cache=use_cache)
 
-def api_post(url: str, data: Dict[str, Any] = None, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+def api_post(url: str, data: Dict[str, Any] = None, params: Dict[str, Any] = None,
+             use_cache: bool = True) -> Optional[Dict[str, Any]]:
     """发送POST请求"""
-    return _make_request('POST', url, data, params)
+    return _make_request('POST', url, data, params, use_cache=use_cache)
 
 def _make_request(method: str, url: str, data: Dict[str, Any] = None, 
-                 params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
-    """发送HTTP请求"""
-    # 如果没有token，先获取token
-    if not config.has_token:
-        logger.info("未获取token，先获取token")
-        if not get_token():
-            logger.error("获取token失败，无法发送请求")
+                 params: Dict[str, Any] = None, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    发送HTTP请求（按config.CACHE_MODE经过磁盘响应缓存）
+
+    use_cache为False时不读缓存、总是请求网络（结果仍写入缓存），用于必须取得服务端当前数据的请求，
+    如增量同步探测修改时间和重新获取有变化的需求；offline模式下无法访问网络，直接返回None。
+    """
+    mode = config.CACHE_MODE
+    if mode == CACHE_MODE_OFF:
+        return _send_request(method, url, data, params)
+    if not use_cache and mode == CACHE_MODE_OFFLINE:
+        logger.warning(f"离线模式下不能绕过缓存请求网络: {method} {url}")
+        return None
+    
+    cache = get_response_cache()
+    key = cache.make_key(method, url, params, data)
+    
+    if use_cache and mode in (CACHE_MODE_READ_THROUGH, CACHE_MODE_OFFLINE):
+        cached = cache.get(key, allow_expired=(mode == CACHE_MODE_OFFLINE))
+        if cached is not None:
+            return cached
+        if mode == CACHE_MODE_OFFLINE:
+            logger.warning(f"离线模式下缓存未命中: {method} {url}")
             return None
     
-    # 构建请求头
-    headers = {
-        'Content-Type': 'application/json; charset=UTF-8',
-        'X-Auth-Token': config.token
-    }
+    result = _send_request(method, url, data, params)
+    if result is not None:
+        cache.put(key, result, method, url)
+    return result
+
+def _send_request(method: str, url: str, data: Dict[str, Any] = None, 
+                  params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """通过网络发送HTTP请求"""
+    # 如果没有token，先获取token
+    if not _ensure_token():
+        logger.error("获取token失败，无法发送请求")
+        return None
     
     try:
         logger.info(f"发送请求: {method} {url}")
+        used_token = config.token
         
-        response = requests.request(
+        # 请求头（含X-Auth-Token）由http_client的Session统一提供
+        response = http_client.request(
             method=method,
             url=url,
-            headers=headers,
             json=data,
-            params=params,
-            timeout=config.TIMEOUT,
-            verify=False  # 跳过SSL证书验证
+            params=params
         )
         
         logger.info(f"响应状态码: {response.status_code}")
@@ -111,24 +262,26 @@ def _make_request(method: str, url: str, data: Dict[str, Any] = None,
         # 如果token过期，重新获取token并重试
         if response.status_code == 401:
             logger.warning("Token可能已过期，重新获取token并重试")
-            config.has_token = False  # 重置token状态
-            if get_token():  # 重新获取token
-                # 使用新token重新发送请求
-                headers['X-Auth-Token'] = config.token
-                response = requests.request(
+            if _refresh_token(used_token):  # 重新获取token
+                # 使用新token重新发送请求（get_token已更新Session的默认请求头）
+                response = http_client.request(
                     method=method,
                     url=url,
-                    headers=headers,
                     json=data,
-                    params=params,
-                    timeout=config.TIMEOUT,
-                    verify=False  # 跳过SSL证书验证
+                    params=params
                 )
                 logger.info(f"重试后响应状态码: {response.status_code}")
             else:
                 logger.error("重新获取token失败")
                 return None
         
+        if _fixture_recorder is not None:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            _fixture_recorder.record(method, url, params, data, response.status_code, body)
+        
         if response.status_code in [200, 201]:
             return response.json()
         else:
@@ -158,6 +311,26 @@ def api_post_all_tc_with_limit(offset: int, limit: int) -> Optional[Dict[str, An
     return api_post(config.TC_ALL_URL, data=data)
     
 
+#IPD related function
+def api_post_issue_list_by_ids(issue_ids: List[str], issue_type: str,
+                               use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """按id批量查询需求（一次请求携带多个id，use_cache=False时不读响应缓存）"""
+    data = {
+        "filter": [
+            {
+                "id": {
+                    "values": list(issue_ids),
+                    "operator": "||"
+                }
+            }
+        ]
+    }
+    params = {
+        "issue_type": issue_type
+    }
+    return api_post(config.IPD_LIST_URL, data, params, use_cache=use_cache)
+
+
 #SF related function
 def api_get_sf_detail_by_id(issue_id: str)-> Optional[Dict[str, Any]]:
     url = config.IPD_DETAIL_URL + issue_id
@@ -177,62 +350,41 @@ def api_post_sf_by_keyword() -> Optional[Dict[str, Any]]:
 
 
 #IR related function
-def api_get_ir_detail_by_id(issue_id: str)-> Optional[Dict[str, Any]]:
+def api_get_ir_detail_by_id(issue_id: str, use_cache: bool = True)-> Optional[Dict[str, Any]]:
     url = config.IPD_DETAIL_URL + issue_id
     params = {
         "issue_type": "IR"
     }
-    return api_get(url, params)
+    return api_get(url, params, use_cache=use_cache)
 
 def api_post_ir_list_by_id(issue_id: str) -> Optional[Dict[str, Any]]:
-    data = {
-        "filter": [
-            {
-                "id": {
-                    "values": [
-                        issue_id
-                    ],
-                    "operator": "||"
-                }
-            }
-        ]
-    }
-    params = {
-        "issue_type": "IR"
-    }
-    return api_post(config.IPD_LIST_URL, data, params)
+    return api_post_ir_list_by_ids([issue_id])
+
+def api_post_ir_list_by_ids(issue_ids: List[str]) -> Optional[Dict[str, Any]]:
+    return api_post_issue_list_by_ids(issue_ids, "IR")
 
 #SR related function
-def api_get_sr_detail_by_id(issue_id: str)-> Optional[Dict[str, Any]]:
+def api_get_sr_detail_by_id(issue_id: str, use_cache: bool = True)-> Optional[Dict[str, Any]]:
     url = config.IPD_DETAIL_URL + issue_id
     params = {
         "issue_type": "SR"
     }
-    return api_get(url, params)
+    return api_get(url, params, use_cache=use_cache)
 
 def api_post_sr_list_by_id(issue_id: str) -> Optional[Dict[str, Any]]:
-    data = {
-        "filter": [
-            {
-                "id": {
-                    "values": [
-                        issue_id
-                    ],
-                    "operator": "||"
-                }
-            }
-        ]
-    }
-    params = {
-        "issue_type": "SR"
-    }
-    return api_post(config.IPD_LIST_URL, data, params)
+    return api_post_sr_list_by_ids([issue_id])
+
+def api_post_sr_list_by_ids(issue_ids: List[str]) -> Optional[Dict[str, Any]]:
+    return api_post_issue_list_by_ids(issue_ids, "SR")
 
 
 #AR related function
-def api_get_ar_detail_by_id(issue_id: str)-> Optional[Dict[str, Any]]:
+def api_get_ar_detail_by_id(issue_id: str, use_cache: bool = True)-> Optional[Dict[str, Any]]:
     url = config.IPD_DETAIL_URL + issue_id
     params = {
         "issue_type": "AR"
     }
-    return api_get(url, params)
\ No newline at end of file
+    return api_get(url, params, use_cache=use_cache)
+
+def api_post_ar_list_by_ids(issue_ids: List[str]) -> Optional[Dict[str, Any]]:
+    return api_post_issue_list_by_ids(issue_ids, "AR")
@@ -0,0 +1,172 @@
+import html
+import json
+import math
+import os
+import re
+from operator import add
+from collections import Counter
+from typing import Dict, List
+from config import config, calculate_relative_path
+from render_scheduler import RenderJob
+from theme import stylesheet_link
+
+SEARCH_INDEX_VERSION = 1
+
+# 各字段命中一次的得分；同一词条在一个字段中最多计MAX_FIELD_COUNT次，避免长描述中的重复词压过标题
+FIELD_WEIGHTS = {"req_id": 8, "title": 4, "content": 1}
+MAX_FIELD_COUNT = 3
+MAX_SCORE = 255
+
+# ASCII单词（可用下划线连接，如llr_os_01_02_03）或连续的汉字
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*|[\u3400-\u9fff\uf900-\ufaff]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# 数据块回调函数名（与search.html中的脚本一致）
+_POSTINGS_CALLBACK = "searchShardLoaded"
+_DOCS_CALLBACK = "searchDocsLoaded"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    把文本切分为索引词条（search.html中的tokenize与此保持一致）
+
+    - ASCII单词转为小写；用下划线连接的编号同时产生整体和各部分，如 llr_os_01 -> llr_os_01, llr, os, 01
+    - 连续汉字按相邻两个字切分（bigram），单独出现的一个汉字作为一个词条
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if run[0] >= "\u3400":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(map(add, run, run[1:]))
+        else:
+            tokens.append(run)
+            if "_" in run:
+                tokens.extend(run.split("_"))
+    return tokens
+
+def html_to_text(content: str) -> str:
+    """去掉详细描述中的HTML标签和实体"""
+    return html.unescape(_TAG_RE.sub(" ", content or ""))
+
+def shard_of(token: str, shard_count: int) -> int:
+    """词条所在的分片（32位FNV-1a，按码点计算，与search.html中的shardOf一致）"""
+    h = 0x811c9dc5
+    for ch in token:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xffffffff
+    return h % shard_count
+
+
+class SearchIndexBuilder:
+    """
+    需求搜索索引 - 对每个节点的title、req_id和详细描述建立倒排索引，按词条哈希分片输出
+
+    输出（都位于搜索页面同级的SEARCH_DATA_DIR_NAME目录）：
+    - postings_N.js: 第N个分片的 词条 -> [文档id增量, 得分, 文档id增量, 得分, ...]
+    - docs_N.js: 第N段文档（每段SEARCH_DOCS_PER_SHARD个）的 [层级, req_id, 标题, 链接]
+    查询时只加载查询词所在的分片，再只加载排在前面的结果所在的文档段。
+    """
+    def __init__(self, page_file: str):
+        self.page_file = page_file
+        self.data_dir = os.path.join(os.path.dirname(page_file), config.SEARCH_DATA_DIR_NAME)
+        self.docs: List[list] = []
+        self.postings: Dict[str, Dict[int, int]] = {}  # 词条 -> {文档id: 得分}
+
+    def add(self, level: str, node):
+        """添加一个需求节点（SF/IR/SR/AR）"""
+        if not node.title or not node.html_file:
+            return
+        doc_id = len(self.docs)
+        self.docs.append([level, node.req_id or "", node.title, calculate_relative_path(self.page_file, node.html_file)])
+
+        # 先在文档内按词条累计得分，再写入倒排表（每个词条每个文档只写一次）
+        scores = Counter()
+        for name, text in [("req_id", node.req_id or ""), ("title", node.title),
+                           ("content", html_to_text(node.detailed_description.content))]:
+            weight = FIELD_WEIGHTS[name]
+            for token, count in Counter(tokenize(text)).items():
+                scores[token] += weight * min(count, MAX_FIELD_COUNT)
+        postings = self.postings
+        for token, score in scores.items():
+            doc_scores = postings.get(token)
+            if doc_scores is None:
+                doc_scores = postings[token] = {}
+            doc_scores[doc_id] = score if score < MAX_SCORE else MAX_SCORE
+
+    def add_tree(self, sf):
+        """按SF-IR-SR-AR顺序添加整棵需求树"""
+        self.add("sf", sf)
+        for ir in sf.irs:
+            self.add("ir", ir)
+            for sr in ir.srs:
+                self.add("sr", sr)
+                for ar in sr.ars:
+                    self.add("ar", ar)
+
+    def shard_count(self) -> int:
+        """分片数：配置为0时按倒排记录总数确定，每个分片约SEARCH_SHARD_POSTINGS条"""
+        if config.SEARCH_SHARD_COUNT > 0:
+            return config.SEARCH_SHARD_COUNT
+        total = sum(len(doc_scores) for doc_scores in self.postings.values())
+        return max(1, math.ceil(total / config.SEARCH_SHARD_POSTINGS))
+
+    def build_shards(self, shard_count: int) -> List[Dict[str, List[int]]]:
+        """把倒排表按词条分片，文档id按增量编码"""
+        shards: List[Dict[str, List[int]]] = [{} for _ in range(shard_count)]
+        for token in sorted(self.postings):
+            encoded = []
+            previous = 0
+            for doc_id, score in sorted(self.postings[token].items()):
+                encoded += [doc_id - previous, score]
+                previous = doc_id
+            shards[shard_of(token, shard_count)][token] = encoded
+        return shards
+
+    def meta(self, shard_count: int) -> dict:
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "shards": shard_count,
+            "docs": len(self.docs),
+            "docs_per_shard": config.SEARCH_DOCS_PER_SHARD,
+            "tokens": len(self.postings)
+        }
+
+    def _chunk_job(self, callback: str, chunk_id: str, data) -> RenderJob:
+        return RenderJob("data_chunk.js", {
+            "callback": callback,
+            "chunk_id": json.dumps(chunk_id),
+            "payload": json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        }, os.path.join(self.data_dir, f"{chunk_id}.js"), "搜索索引")
+
+    def render_jobs(self, sf_title: str, nav_file: str) -> List[RenderJob]:
+        """搜索页面和所有索引数据块的渲染任务"""
+        shard_count = self.shard_count()
+        jobs = [RenderJob("search.html", {
+            "title": f"{sf_title} 需求搜索",
+            "css_link": stylesheet_link("search", self.page_file),
+            "nav_href": calculate_relative_path(self.page_file, nav_file) if nav_file else "",
+            "data_dir": json.dumps(config.SEARCH_DATA_DIR_NAME, ensure_ascii=False),
+            "meta": json.dumps(self.meta(shard_count))
+        }, self.page_file, "需求搜索")]
+
+        for index, shard in enumerate(self.build_shards(shard_count)):
+            jobs.append(self._chunk_job(_POSTINGS_CALLBACK, f"postings_{index}", shard))
+        size = config.SEARCH_DOCS_PER_SHARD
+        for index in range(0, len(self.docs), size):
+            jobs.append(self._chunk_job(_DOCS_CALLBACK, f"docs_{index // size}", self.docs[index:index + size]))
+        return jobs
+
+
+def build_search_jobs(sf) -> List[RenderJob]:
+    """为SF需求树建立搜索索引，返回搜索页面和索引数据块的渲染任务"""
+    if not sf.search_html_file:
+        print("错误: SF的search_html_file未设置，跳过搜索索引")
+        return []
+    builder = SearchIndexBuilder(sf.search_html_file)
+    builder.add_tree(sf)
+    jobs = builder.render_jobs(sf.title, sf.req_navga_html_file)
+    print(f"搜索索引: 文档 {len(builder.docs)} 个，词条 {len(builder.postings)} 个，分片 {builder.shard_count()} 个")
+    return jobs
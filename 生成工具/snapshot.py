@@ -0,0 +1,196 @@
+import gzip
+import json
+import os
+import time
+from dataclasses import fields
+from typing import Dict, List, Optional, Tuple
+from models import SF, IR, SR, AR, TestCase, TestSuite, data_registry, intern_fields
+
+SNAPSHOT_VERSION = 1
+
+# 对象引用字段（parent/owner、子记录、子节点列表），快照中以id形式单独保存
+_REF_FIELDS = {
+    "parent", "owner", "_detailed_description", "_review_record", "_history_record",
+    "irs", "srs", "ars", "test_cases", "test_case_detail"
+}
+
+# 由其他字段推出的字段（排序键在注册时计算），快照中不保存
+_DERIVED_FIELDS = {"sort_key"}
+_SKIPPED_FIELDS = _REF_FIELDS | _DERIVED_FIELDS
+
+# 需求节点的三个子记录（只保存已创建的子记录）
+_SUB_RECORDS = ["detailed_description", "review_record", "history_record"]
+
+_NODE_TYPES = {"SF": SF, "IR": IR, "SR": SR, "AR": AR}
+
+
+def _open(path: str, mode: str, compress: bool = None):
+    """打开快照文件（.gz后缀时使用gzip压缩）"""
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def _dump_fields(obj) -> dict:
+    """取出dataclass中除对象引用和推出字段外的所有字段"""
+    return {f.name: getattr(obj, f.name) for f in fields(obj) if f.name not in _SKIPPED_FIELDS}
+
+def _apply_fields(obj, values: dict):
+    """把快照中的字段值写回对象（忽略当前版本已不存在的字段）"""
+    known = {f.name for f in fields(obj)}
+    for name, value in values.items():
+        if name in known and name not in _SKIPPED_FIELDS:
+            setattr(obj, name, value)
+    intern_fields(obj)
+
+def _node_record(node_type: str, node, parent_id: str = "") -> dict:
+    """需求节点的快照记录"""
+    record = {"type": node_type, "fields": _dump_fields(node)}
+    if parent_id:
+        record["parent"] = parent_id
+    for name in _SUB_RECORDS:
+        sub_record = node.created_sub_record(name)
+        if sub_record is not None:
+            record[name] = _dump_fields(sub_record)
+    return record
+
+def _apply_sub_record(node, name: str, values: dict):
+    """恢复子记录：只有页面路径的子记录不创建（路径与首次访问时由节点路径推出的相同）"""
+    if any(value for key, value in values.items() if key != "html_file"):
+        _apply_fields(getattr(node, name), values)
+
+
+def save_snapshot(path: str, sf: SF, test_suite: Optional[TestSuite] = None) -> int:
+    """
+    把已加载的SF需求树、测试套件和DataRegistry保存为行分隔的JSON快照
+
+    每行一条记录，parent/owner等反向引用保存为id，AR关联的测试用例保存为测试套件中的下标。
+
+    Returns:
+        写入的记录数
+    """
+    start_time = time.time()
+    records: List[dict] = [{"type": "meta", "version": SNAPSHOT_VERSION,
+                            "created_at": time.strftime("%Y-%m-%d %H:%M:%S")}]
+
+    # 测试用例以对象身份映射为测试套件中的下标
+    test_cases = list(test_suite.test_cases) if test_suite else []
+    tc_index = {id(test_case): index for index, test_case in enumerate(test_cases)}
+
+    records.append(_node_record("SF", sf))
+    for ir in sf.irs:
+        records.append(_node_record("IR", ir, sf.id))
+        for sr in ir.srs:
+            records.append(_node_record("SR", sr, ir.id))
+            for ar in sr.ars:
+                record = _node_record("AR", ar, sr.id)
+                record["test_cases"] = [tc_index[id(tc)] for tc in ar.test_cases if id(tc) in tc_index]
+                records.append(record)
+
+    if test_suite is not None:
+        records.append({"type": "TestSuite", "fields": _dump_fields(test_suite)})
+        for test_case in test_cases:
+            records.append({"type": "TestCase", "fields": _dump_fields(test_case),
+                            "detail": _dump_fields(test_case.test_case_detail)})
+
+    # DataRegistry保存为 键 -> 节点id / 测试用例下标
+    records.append({
+        "type": "registry",
+        "ir_by_req_id": {key: ir.id for key, ir in data_registry.ir_by_req_id.items()},
+        "sr_by_req_id": {key: sr.id for key, sr in data_registry.sr_by_req_id.items()},
+        "ar_by_id": {key: ar.id for key, ar in data_registry.ar_by_id.items()},
+        "ar_by_req_id": {key: ar.id for key, ar in data_registry.ar_by_req_id.items()},
+        "test_case_by_number": {key: tc_index[id(tc)] for key, tc in data_registry.test_case_by_number.items()
+                                if id(tc) in tc_index}
+    })
+
+    tmp_path = f"{path}.tmp"
+    with _open(tmp_path, "w", compress=path.endswith(".gz")) as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+    os.replace(tmp_path, path)
+
+    print(f"已保存快照: {path}（{len(records)} 条记录，耗时 {time.time() - start_time:.2f} 秒）")
+    return len(records)
+
+def load_snapshot(path: str) -> Tuple[SF, TestSuite]:
+    """
+    从快照重建SF需求树、测试套件和DataRegistry（不重新解析接口原始数据）
+
+    Returns:
+        (sf, test_suite)
+    """
+    start_time = time.time()
+    sf: Optional[SF] = None
+    test_suite = TestSuite()
+    nodes: Dict[Tuple[str, str], object] = {}
+    ar_test_cases: List[Tuple[AR, List[int]]] = []
+    registry_record: dict = {}
+
+    with _open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record_type = record.get("type")
+
+            if record_type == "meta":
+                if record.get("version") != SNAPSHOT_VERSION:
+                    raise ValueError(f"快照版本不匹配: {record.get('version')}，当前版本: {SNAPSHOT_VERSION}")
+            elif record_type in _NODE_TYPES:
+                node = _NODE_TYPES[record_type]()
+                _apply_fields(node, record["fields"])
+                for name in _SUB_RECORDS:
+                    _apply_sub_record(node, name, record.get(name, {}))
+                nodes[(record_type, node.id)] = node
+
+                if record_type == "SF":
+                    sf = node
+                elif record_type == "IR":
+                    nodes[("SF", record["parent"])].add_ir(node)
+                elif record_type == "SR":
+                    nodes[("IR", record["parent"])].add_sr(node)
+                else:
+                    nodes[("SR", record["parent"])].add_ar(node)
+                    ar_test_cases.append((node, record.get("test_cases", [])))
+            elif record_type == "TestSuite":
+                _apply_fields(test_suite, record["fields"])
+            elif record_type == "TestCase":
+                test_case = TestCase()
+                _apply_fields(test_case, record["fields"])
+                _apply_fields(test_case.test_case_detail, record.get("detail", {}))
+                test_suite.test_cases.append(test_case)
+            elif record_type == "registry":
+                registry_record = record
+            else:
+                print(f"快照第 {line_no} 行记录类型未知，已跳过: {record_type}")
+
+    if sf is None:
+        raise ValueError(f"快照中没有SF记录: {path}")
+
+    test_cases = test_suite.test_cases
+    for ar, indexes in ar_test_cases:
+        ar.test_cases = [test_cases[index] for index in indexes if index < len(test_cases)]
+        # 旧版本快照中测试用例没有页面路径
+        for test_case in ar.test_cases:
+            if not test_case.html_file:
+                test_case.plan_test_case_html_paths(ar)
+
+    # 重建DataRegistry
+    for name, node_type in [("ir_by_req_id", "IR"), ("sr_by_req_id", "SR"), ("ar_by_id", "AR"), ("ar_by_req_id", "AR")]:
+        index = getattr(data_registry, name)
+        for key, node_id in registry_record.get(name, {}).items():
+            node = nodes.get((node_type, node_id))
+            if node is not None:
+                index[key] = node
+    for key, tc_index in registry_record.get("test_case_by_number", {}).items():
+        if tc_index < len(test_cases):
+            data_registry.test_case_by_number[key] = test_cases[tc_index]
+    data_registry.rebuild_indexes()
+
+    total_ars = sum(len(sr.ars) for ir in sf.irs for sr in ir.srs)
+    print(f"已加载快照: {path}（IR {len(sf.irs)} 个，AR {total_ars} 个，测试用例 {len(test_cases)} 个，"
+          f"耗时 {time.time() - start_time:.2f} 秒）")
+    return sf, test_suite
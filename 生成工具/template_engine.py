@@ -0,0 +1,345 @@
+import hashlib
+import marshal
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from config import config
+
+# 模板目录（与本模块同级的templates/）
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# 编译结果格式变化时修改，使磁盘缓存失效
+ENGINE_VERSION = "1"
+
+_TOKEN_RE = re.compile(r"(\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\})", re.S)
+_EXTENDS_RE = re.compile(r'\{%\s*extends\s+["\']([^"\']+)["\']\s*%\}')
+
+
+class TemplateError(Exception):
+    """模板语法错误"""
+    pass
+
+
+class Template:
+    """已编译的模板 - 渲染时只执行编译好的代码对象，完成变量替换"""
+    def __init__(self, name: str, code):
+        self.name = name
+        self.code = code
+
+    def render(self, context: Dict[str, Any] = None, **kwargs) -> str:
+        """用上下文渲染模板（上下文中的值可以在{{ }}和{% %}中以Python表达式使用）"""
+        namespace = dict(context or {})
+        namespace.update(kwargs)
+        namespace["_out"] = out = []
+        exec(self.code, namespace)
+        return "".join(out)
+
+
+class _Parser:
+    """把模板源码解析为节点树
+
+    节点: ("text", str) / ("expr", str) / ("if", [(cond, body)], else_body)
+          ("for", target, iter, body, else_body) / ("block", name, body)
+    """
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.tokens = self._tokenize(source)
+        self.pos = 0
+        self.extends: Optional[str] = None
+
+    @staticmethod
+    def _tokenize(source: str) -> List[Tuple[str, str]]:
+        # 与Jinja的keep_trailing_newline=False一致，去掉文件末尾的一个换行
+        if source.endswith("\n"):
+            source = source[:-1]
+
+        tokens = []
+        trim_next = False
+        for part in _TOKEN_RE.split(source):
+            if not part:
+                continue
+            if part.startswith("{{"):
+                tokens.append(("expr", part[2:-2].strip()))
+                trim_next = False
+            elif part.startswith("{%"):
+                tokens.append(("stmt", part[2:-2].strip()))
+                trim_next = True
+            elif part.startswith("{#"):
+                trim_next = True
+            else:
+                # 与Jinja的trim_blocks一致，去掉语句标签后紧跟的一个换行
+                if trim_next and part.startswith("\n"):
+                    part = part[1:]
+                trim_next = False
+                if part:
+                    tokens.append(("text", part))
+        return tokens
+
+    def parse(self) -> list:
+        body, end = self._parse_body(())
+        if end is not None:
+            raise TemplateError(f"{self.name}: 多余的 {{% {end} %}}")
+        return body
+
+    def _parse_body(self, end_keywords: tuple) -> Tuple[list, Optional[str]]:
+        """解析到end_keywords中的某个语句为止，返回(节点列表, 结束语句)"""
+        nodes = []
+        while self.pos < len(self.tokens):
+            kind, value = self.tokens[self.pos]
+            self.pos += 1
+            if kind == "text":
+                nodes.append(("text", value))
+                continue
+            if kind == "expr":
+                nodes.append(("expr", value))
+                continue
+
+            keyword = value.split(None, 1)[0]
+            if keyword in end_keywords:
+                return nodes, value
+            if keyword == "if":
+                nodes.append(self._parse_if(value[2:].strip()))
+            elif keyword == "for":
+                nodes.append(self._parse_for(value[3:].strip()))
+            elif keyword == "block":
+                block_name = value[5:].strip()
+                body, _ = self._expect(("endblock",), "block")
+                nodes.append(("block", block_name, body))
+            elif keyword == "extends":
+                match = _EXTENDS_RE.match("{% " + value + " %}")
+                if not match:
+                    raise TemplateError(f"{self.name}: extends语法错误: {value}")
+                self.extends = match.group(1)
+            else:
+                raise TemplateError(f"{self.name}: 未知语句 {{% {value} %}}")
+        return nodes, None
+
+    def _expect(self, end_keywords: tuple, opener: str) -> Tuple[list, str]:
+        body, end = self._parse_body(end_keywords)
+        if end is None:
+            raise TemplateError(f"{self.name}: {{% {opener} %}} 缺少 {{% {end_keywords[-1]} %}}")
+        return body, end
+
+    def _parse_if(self, cond: str) -> tuple:
+        branches = []
+        else_body = []
+        while True:
+            body, end = self._expect(("elif", "else", "endif"), "if")
+            branches.append((cond, body))
+            if end.startswith("elif"):
+                cond = end[4:].strip()
+                continue
+            if end == "else":
+                else_body, _ = self._expect(("endif",), "if")
+            return ("if", branches, else_body)
+
+    def _parse_for(self, header: str) -> tuple:
+        match = re.match(r"(.+?)\s+in\s+(.+)$", header, re.S)
+        if not match:
+            raise TemplateError(f"{self.name}: for语法错误: {header}")
+        body, end = self._expect(("else", "endfor"), "for")
+        else_body = []
+        if end == "else":
+            else_body, _ = self._expect(("endfor",), "for")
+        return ("for", match.group(1), match.group(2), body, else_body)
+
+
+class _CodeGenerator:
+    """把节点树生成为Python源码"""
+    def __init__(self):
+        self.lines: List[str] = []
+        self.counter = 0
+
+    def generate(self, nodes: list) -> str:
+        self.lines.append("_w = _out.append")
+        self._emit_body(nodes, 0)
+        return "\n".join(self.lines)
+
+    def _emit(self, line: str, depth: int):
+        self.lines.append("    " * depth + line)
+
+    def _emit_body(self, nodes: list, depth: int):
+        if not nodes:
+            self._emit("pass", depth)
+            return
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                self._emit(f"_w({node[1]!r})", depth)
+            elif kind == "expr":
+                self._emit(f"_w(str({node[1]}))", depth)
+            elif kind == "block":
+                self._emit_body(node[2], depth)
+            elif kind == "if":
+                for index, (cond, body) in enumerate(node[1]):
+                    self._emit(f"{'if' if index == 0 else 'elif'} {cond}:", depth)
+                    self._emit_body(body, depth + 1)
+                if node[2]:
+                    self._emit("else:", depth)
+                    self._emit_body(node[2], depth + 1)
+            elif kind == "for":
+                _, target, iterable, body, else_body = node
+                if else_body:
+                    self.counter += 1
+                    flag = f"_empty{self.counter}"
+                    self._emit(f"{flag} = True", depth)
+                    self._emit(f"for {target} in {iterable}:", depth)
+                    self._emit(f"{flag} = False", depth + 1)
+                    self._emit_body(body, depth + 1)
+                    self._emit(f"if {flag}:", depth)
+                    self._emit_body(else_body, depth + 1)
+                else:
+                    self._emit(f"for {target} in {iterable}:", depth)
+                    self._emit_body(body, depth + 1)
+
+
+def _replace_blocks(nodes: list, blocks: Dict[str, list]) -> list:
+    """用子模板的block替换父模板中的同名block"""
+    result = []
+    for node in nodes:
+        kind = node[0]
+        if kind == "block":
+            body = blocks.get(node[1], node[2])
+            result.append(("block", node[1], _replace_blocks(body, blocks)))
+        elif kind == "if":
+            branches = [(cond, _replace_blocks(body, blocks)) for cond, body in node[1]]
+            result.append(("if", branches, _replace_blocks(node[2], blocks)))
+        elif kind == "for":
+            result.append(("for", node[1], node[2], _replace_blocks(node[3], blocks), _replace_blocks(node[4], blocks)))
+        else:
+            result.append(node)
+    return result
+
+def _collect_blocks(nodes: list, blocks: Dict[str, list]):
+    """收集节点树中的所有block（包括嵌套的block）"""
+    for node in nodes:
+        if node[0] == "block":
+            blocks[node[1]] = node[2]
+            _collect_blocks(node[2], blocks)
+        elif node[0] == "if":
+            for _, body in node[1]:
+                _collect_blocks(body, blocks)
+            _collect_blocks(node[2], blocks)
+        elif node[0] == "for":
+            _collect_blocks(node[3], blocks)
+            _collect_blocks(node[4], blocks)
+
+
+class TemplateEngine:
+    """模板引擎 - 模板在首次使用时编译为Python代码对象，编译结果按源码哈希缓存到磁盘
+
+    语法（Jinja子集）:
+        {{ 表达式 }}                      输出Python表达式的值（不做HTML转义，与原f-string一致）
+        {% if 条件 %}...{% elif 条件 %}...{% else %}...{% endif %}
+        {% for 变量 in 表达式 %}...{% else %}...{% endfor %}   else在序列为空时输出
+        {% extends "layout.html" %} / {% block 名称 %}...{% endblock %}
+        {# 注释 #}
+    语句标签后紧跟的一个换行会被去掉（trim_blocks）。
+    """
+    def __init__(self, template_dir: str = None, cache_dir: str = None):
+        self.template_dir = template_dir or TEMPLATES_DIR
+        self.cache_dir = cache_dir if cache_dir is not None else config.TEMPLATE_CACHE_DIR
+        self._templates: Dict[str, Template] = {}
+        self._lock = threading.Lock()
+        self.compiled_count = 0  # 本次运行中实际编译的模板数（未命中磁盘缓存）
+
+    def _read_source(self, name: str) -> str:
+        with open(os.path.join(self.template_dir, name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _source_chain(self, name: str) -> List[Tuple[str, str]]:
+        """模板及其所有父模板的(名称, 源码)列表"""
+        chain = []
+        seen = set()
+        while name:
+            if name in seen:
+                raise TemplateError(f"模板循环继承: {name}")
+            seen.add(name)
+            source = self._read_source(name)
+            chain.append((name, source))
+            match = _EXTENDS_RE.search(source)
+            name = match.group(1) if match else None
+        return chain
+
+    def _cache_path(self, name: str, chain: List[Tuple[str, str]]) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{ENGINE_VERSION}|{sys.implementation.cache_tag}".encode("utf-8"))
+        for chain_name, source in chain:
+            digest.update(f"|{chain_name}|".encode("utf-8"))
+            digest.update(source.encode("utf-8"))
+        safe_name = name.replace("/", "_").replace("\\", "_")
+        return os.path.join(self.cache_dir, f"{safe_name}.{digest.hexdigest()[:16]}.bin")
+
+    def _compile(self, name: str, chain: List[Tuple[str, str]]):
+        """解析模板继承链并编译为代码对象"""
+        blocks: Dict[str, list] = {}
+        nodes = None
+        for chain_name, source in chain:
+            parser = _Parser(chain_name, source)
+            nodes = parser.parse()
+            # 子模板的block优先，父模板只补充子模板没有覆盖的block
+            parent_blocks: Dict[str, list] = {}
+            _collect_blocks(nodes, parent_blocks)
+            for block_name, body in parent_blocks.items():
+                blocks.setdefault(block_name, body)
+        nodes = _replace_blocks(nodes, blocks)
+
+        source = _CodeGenerator().generate(nodes)
+        return compile(source, f"<template {name}>", "exec")
+
+    def _load(self, name: str) -> Template:
+        chain = self._source_chain(name)
+        cache_path = self._cache_path(name, chain) if self.cache_dir else ""
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    return Template(name, marshal.load(f))
+            except (OSError, EOFError, ValueError, TypeError):
+                pass  # 缓存损坏时重新编译
+
+        code = self._compile(name, chain)
+        self.compiled_count += 1
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    marshal.dump(code, f)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"写入模板缓存失败: {e}")
+        return Template(name, code)
+
+    def get_template(self, name: str) -> Template:
+        """获取已编译的模板（每个模板在一个进程中只加载一次）"""
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    template = self._load(name)
+                    self._templates[name] = template
+        return template
+
+    def preload(self) -> int:
+        """加载并编译模板目录中的所有模板，返回模板数量"""
+        names = [entry for entry in sorted(os.listdir(self.template_dir)) if entry.endswith((".html", ".js"))]
+        for name in names:
+            self.get_template(name)
+        return len(names)
+
+    def render(self, name: str, context: Dict[str, Any] = None, **kwargs) -> str:
+        """渲染模板"""
+        return self.get_template(name).render(context, **kwargs)
+
+
+# 全局模板引擎实例
+template_engine = TemplateEngine()
+
+
+def render_template(name: str, context: Dict[str, Any] = None, **kwargs) -> str:
+    """使用全局模板引擎渲染模板"""
+    return template_engine.render(name, context, **kwargs)
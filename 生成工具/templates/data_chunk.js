@@ -0,0 +1,2 @@
+{# 页面按需加载的数据块：调用页面中的回调函数，payload是JSON #}
+{{ callback }}({{ chunk_id }}, {{ payload }});
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import threading
+from typing import Dict
+from config import config, calculate_relative_path
+
+# 主题目录（与本模块同级的themes/<主题名>/，每种页面一个<页面类型>.css）
+THEMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes")
+
+
+class Theme:
+    """页面主题 - 把每种页面的样式写成带内容哈希版本号的外部CSS，供页面通过<link>引用
+
+    CSS文件名形如 requirement.3f2a9c1b04.css，内容变化时文件名随之变化，
+    浏览器可以长期缓存同一版本的样式表。每种页面类型在一次运行中只写一次。
+    """
+    def __init__(self, name: str = None, assets_dir: str = None):
+        self.name = name or config.THEME_NAME
+        self.assets_dir = assets_dir or os.path.join(config.BASE_DIR_NAME, config.REQ_DIR_NAME, config.ASSETS_DIR_NAME)
+        self._asset_paths: Dict[str, str] = {}  # 页面类型 -> 已写出的CSS路径
+        self._lock = threading.Lock()
+
+    def _read_source(self, page_type: str) -> str:
+        """读取主题中某种页面的样式源文件"""
+        source_file = os.path.join(THEMES_DIR, self.name, f"{page_type}.css")
+        with open(source_file, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def asset_path(self, page_type: str) -> str:
+        """获取页面类型对应的CSS文件路径（首次调用时写出文件并清理旧版本）"""
+        path = self._asset_paths.get(page_type)
+        if path:
+            return path
+
+        with self._lock:
+            path = self._asset_paths.get(page_type)
+            if path:
+                return path
+
+            css = self._read_source(page_type)
+            version = hashlib.sha256(css.encode("utf-8")).hexdigest()[:10]
+            file_name = f"{page_type}.{version}.css"
+            path = os.path.join(self.assets_dir, file_name)
+
+            os.makedirs(self.assets_dir, exist_ok=True)
+            if not os.path.exists(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(css)
+                print(f"已生成样式文件: {path}")
+
+            # 删除同一页面类型的旧版本样式文件
+            for entry in os.listdir(self.assets_dir):
+                if entry != file_name and entry.startswith(f"{page_type}.") and entry.endswith(".css") \
+                        and entry.count(".") == 2:
+                    os.remove(os.path.join(self.assets_dir, entry))
+
+            self._asset_paths[page_type] = path
+            return path
+
+    def stylesheet_link(self, page_type: str, html_file: str) -> str:
+        """生成从html_file引用页面类型样式表的<link>标签"""
+        href = calculate_relative_path(html_file, self.asset_path(page_type))
+        return f'<link rel="stylesheet" href="{href}">'
+
+
+# 全局主题实例
+theme = Theme()
+
+
+def stylesheet_link(page_type: str, html_file: str) -> str:
+    """使用全局主题生成样式表<link>标签"""
+    return theme.stylesheet_link(page_type, html_file)